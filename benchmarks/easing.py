@@ -0,0 +1,97 @@
+# Micro-benchmark of easing functions (one value per call and arrays of values). Before it, scalar and array solvers
+# of cubic bezier are checked to give the same t (within precision) on steep and flat curves.
+# Run from the project folder: python -m benchmarks.easing (exit code 1 if the check fails)
+import argparse
+import sys
+import timeit
+
+import numpy as np
+
+from scripts.animations import timing_functions
+
+
+def measure(statement: callable, number: int, repeat: int) -> float:
+    """
+    Best time of one call (in microseconds)
+    """
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1e6
+
+
+# Control points of checked curves: CSS curves, steep ends and flat middles (slope 0 inside the curve)
+CHECKED_CURVES: tuple[tuple[float, float, float, float], ...] = (
+    (0.25, 0.1, 0.25, 1.0), (0.42, 0.0, 0.58, 1.0), (0.9, 0.0, 0.1, 1.0), (0.0, 0.0, 1.0, 1.0),
+    (1.0, 0.0, 0.0, 1.0), (0.5, -0.5, 0.5, 1.5)
+)
+
+
+def check_cubic_bezier(samples: int = 2001) -> bool:
+    """
+    Compare solve_t with solve_t_array and with exact t (found by long bisection)
+    :return: all curves are within precision
+    """
+    is_ok = True
+    x = np.linspace(0., 1., samples)
+    for points in CHECKED_CURVES:
+        curve = timing_functions.CubicBezier(*points)
+        scalar = np.array([curve.solve_t(value) for value in x])
+        array = curve.solve_t_array(x)
+
+        low, high = np.zeros_like(x), np.ones_like(x)
+        for _ in range(60):
+            middle = (low + high) / 2
+            is_over = curve.x(middle) > x
+            high = np.where(is_over, middle, high)
+            low = np.where(is_over, low, middle)
+        exact = (low + high) / 2
+
+        difference = float(np.abs(scalar - array).max())
+        error = float(np.abs(scalar - exact).max())
+        is_curve_ok = difference <= curve.precision and error <= curve.precision
+        is_ok &= is_curve_ok
+        print(f"  cubic_bezier{points!s:<26}scalar - array {difference:.1e}  error of t {error:.1e}"
+              f"{'' if is_curve_ok else '  FAILED'}")
+    return is_ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare cubic bezier easing with ease_in, ease_out, ease_in_out")
+    parser.add_argument('--number', type=int, default=20000, help="calls in one measurement")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--batch', type=int, default=1000, help="size of array for batched evaluation")
+    args = parser.parse_args()
+
+    print("Scalar and array solvers of cubic bezier:")
+    if not check_cubic_bezier():
+        sys.exit(1)
+
+    curve = timing_functions.compile_cubic_bezier(0.25, 0.1, 0.25, 1.0)  # CSS 'ease'
+    times = [i / 97 for i in range(98)]
+    batch = np.linspace(0., 1., args.batch)
+
+    scalar = {
+        'ease_in': lambda: [timing_functions.ease_in(0, 100, t) for t in times],
+        'ease_out': lambda: [timing_functions.ease_out(0, 100, t) for t in times],
+        'ease_in_out': lambda: [timing_functions.ease_in_out(0, 100, t) for t in times],
+        'cubic_bezier (compiled)': lambda: [curve(0, 100, t) for t in times],
+        'cubic_bezier (memoized)': lambda: [timing_functions.cubic_bezier(0, 100, t, 0.25, 0.1, 0.25, 1.0)
+                                            for t in times],
+    }
+    batched = {
+        'ease_in': lambda: timing_functions.ease_in(0., 100., batch),
+        'ease_out': lambda: timing_functions.ease_out(0., 100., batch),
+        'ease_in_out': lambda: timing_functions.ease_in_out_array(0., 100., batch),
+        'cubic_bezier': lambda: curve(0., 100., batch),
+    }
+
+    number = max(args.number // len(times), 1)
+    print(f"One value per call (us per call, average of {len(times)} values):")
+    for name, statement in scalar.items():
+        print(f"  {name:<26}{measure(statement, number, args.repeat) / len(times):>10.3f}")
+
+    print(f"Arrays of {args.batch} values (us per array):")
+    for name, statement in batched.items():
+        print(f"  {name:<26}{measure(statement, max(args.number // 100, 1), args.repeat):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# Soak test of GL objects: thousands of offscreen frames of the shader pipeline (like AppWindows does them)
+# with changed layers, render scale switches, frame snapshots and pipelines created again.
+# Live objects and their memory must not grow after the warmup and nothing may stay alive after the last release.
+# Run from the project folder (no window and no GPU are needed, Mesa llvmpipe is used by default):
+#   python -m benchmarks.gpu_soak                   (3000 frames, about 20 s with llvmpipe)
+#   python -m benchmarks.gpu_soak --frames 500      (quick check, ex. in CI)
+# Exit code: 0 - no growth, 1 - objects grew (or were not released), so it can be used as a leak check in CI.
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import scripts.settings as s
+from benchmarks.shader_pipeline import create_context, synthetic_layers
+from scripts.graphics.gpu_resources import GpuResourceLeak, GpuResourceTracker
+
+
+def create_pipeline(ctx: GpuResourceTracker, scale: float):
+    from scripts.app import App
+    from scripts.graphics.shader_pipeline import ShaderPipeline
+
+    return ShaderPipeline(ctx, tuple(s.SIZE), s.COLORS['background'],
+                          (App.background_blur_weights, App.background_blur_offset),
+                          (s.SHADOW_BLUR_WEIGHTS, App.shadow_blur_offset), App.shadow_gain, scale)
+
+
+def present(ctx: GpuResourceTracker, frame: pygame.Surface, size: tuple[int, int]) -> None:
+    """
+    Frame snapshot is shown like in AppWindows.present_frame (objects live only during the frame)
+    """
+    texture = ctx.texture(size, 4, pygame.image.tobytes(frame, 'RGBA', True))
+    framebuffer = ctx.framebuffer(color_attachments=[texture])
+    ctx.copy_framebuffer(ctx.fbo, framebuffer)
+    framebuffer.release()
+    texture.release()
+
+
+def soak(ctx: GpuResourceTracker, frames: int, rebuild_interval: int, scale_interval: int) -> dict[str, int]:
+    """
+    Render frames and check growth of GL objects after every frame
+    :return: live objects after the last frame (before the pipeline is released)
+    :raise GpuResourceLeak: objects grew
+    """
+    size = tuple(s.SIZE)
+    layers = synthetic_layers(size)
+    pipeline = create_pipeline(ctx, 1.)
+    widget_rect = pygame.Rect(size[0] // 2, size[1] // 3, 80, 40)
+
+    for frame in range(1, frames + 1):
+        # Changed layers: widget every frame, buttons sometimes, background rarely (like moving the window)
+        pipeline.mark_dirty('uiTex', widget_rect)
+        pipeline.mark_dirty('shadowTex', widget_rect)
+        if frame % 7 == 0:
+            pipeline.mark_dirty('buttonsTex')
+        if frame % 50 == 0:
+            pipeline.mark_dirty('backgroundTex')
+        pipeline.render(layers, ((frame % 100) / 100, 0.5), (frame % 300) / 100)
+
+        if scale_interval and frame % scale_interval == 0:  # Power mode is switched (blurs are created again)
+            pipeline.set_render_scale(0.5 if pipeline.render_scale == 1 else 1.)
+            for key in layers:
+                pipeline.mark_dirty(key)
+        if frame % 100 == 0:
+            present(ctx, layers['uiTex'], size)
+        if rebuild_interval and frame % rebuild_interval == 0:  # All objects of the old pipeline must be released
+            pipeline.release()
+            pipeline = create_pipeline(ctx, pipeline.render_scale)
+        ctx.end_frame()
+
+    end_counts = ctx.counts()
+    pipeline.release()
+    ctx.collect()
+    return end_counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Growth of GL objects in a long offscreen run")
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--warmup', type=int, default=s.GPU_RESOURCES_WARMUP)
+    parser.add_argument('--rebuild-interval', type=int, default=1000, help="create the pipeline again (0 - never)")
+    parser.add_argument('--scale-interval', type=int, default=400, help="switch render scale (0 - never)")
+    parser.add_argument('--gpu', action='store_true', help="use the default driver (not software rasterizer)")
+    args = parser.parse_args()
+
+    gl_ctx = create_context(not args.gpu)
+    print(f"renderer: {gl_ctx.info['GL_RENDERER']}")
+    fbo = gl_ctx.simple_framebuffer(tuple(s.SIZE), components=4)  # Screen of the app (not tracked)
+    fbo.use()
+    # Steady state is taken in the first half at the latest (short runs are checked too)
+    warmup = max(1, min(args.warmup, args.frames // 2))
+    ctx = GpuResourceTracker(gl_ctx, warmup, check=True)
+
+    start = time.perf_counter()
+    try:
+        end_counts = soak(ctx, args.frames, args.rebuild_interval, args.scale_interval)
+    except GpuResourceLeak as error:
+        print(f"FAILED at frame {ctx.frames}: {error}")
+        sys.exit(1)
+    seconds = time.perf_counter() - start
+
+    if ctx.baseline is None:
+        print(f"FAILED: steady state was not reached in {ctx.frames} frames")
+        sys.exit(1)
+    start_counts = ctx.baseline[0]
+    allocated, released = int(ctx.frame_allocated.sum()), int(ctx.frame_released.sum())
+    print(f"frames {ctx.frames} in {seconds:.1f} s (steady state after frame {warmup}), "
+          f"{sum(ctx.baseline[1].values()) / 2 ** 20:.1f} MB")
+    print(f"live objects: {start_counts} -> {end_counts}")
+    print(f"last {min(ctx.frames, len(ctx.frame_allocated))} frames: allocated {allocated}, released {released}")
+
+    grown = {kind: (start_counts[kind], count) for kind, count in end_counts.items() if count > start_counts[kind]}
+    if grown:  # Checked after every frame too, but the whole run is reported here
+        print(f"FAILED: live objects grew during the soak: {grown}")
+        sys.exit(1)
+    if ctx.total_count:  # Released pipeline left something
+        print(f"FAILED: objects are alive after release: {ctx.counts()}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
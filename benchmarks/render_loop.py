@@ -0,0 +1,320 @@
+# Headless benchmark of the render loop (SDL dummy video driver, no GPU): time of one call and its distribution
+# Run from the project folder:
+#   python -m benchmarks.render_loop --compare        (compare with baseline, exit code 1 on regression)
+#   python -m benchmarks.render_loop --save           (write baseline)
+# Baseline in benchmarks/baselines/render_loop.json is measured on the machine written in its 'meta'. Times depend
+# on the machine, so on another machine save a local baseline first (--baseline path --save), then compare with it.
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import scripts.settings as s
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "render_loop.json")
+CASES: dict[str, callable] = {}  # Name of the case and function which prepares it (it returns measured function)
+
+
+def case(name: str) -> callable:
+    def register(setup: callable) -> callable:
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def synthetic_wallpaper(size: tuple[int, int] = (1920, 1080)) -> pygame.Surface:
+    """
+    Wallpaper with stripes and gradient (real wallpaper is not needed)
+    """
+    x = np.arange(size[0])[:, None]
+    y = np.arange(size[1])[None, :]
+    pixels = np.zeros((size[0], size[1], 3), np.uint8)
+    pixels[..., 0] = (x * 255 // size[0]).astype(np.uint8)
+    pixels[..., 1] = (y * 255 // size[1]).astype(np.uint8)
+    pixels[..., 2] = np.where((x // 40) % 2 == 0, 200, 80).astype(np.uint8)
+    return pygame.surfarray.make_surface(pixels)
+
+
+def animate_widgets(field) -> callable:
+    """
+    Field.update with moving widgets (widget is changed again when animation ends)
+    """
+    def update() -> None:
+        if not field.is_animation_started():
+            field.change_widget(is_left=True)
+        field.update(16)
+    return update
+
+
+def clear_damage(app) -> None:
+    for damage in app.damage.values():
+        damage.clear()
+    app.screen_damage.clear()
+
+
+@case("app_linux.rendering.full")
+def app_linux_rendering_full(app) -> callable:
+    def rendering() -> None:
+        for damage in app.damage.values():
+            damage.add_all()
+        app.rendering()
+        clear_damage(app)
+    return rendering
+
+
+@case("app_linux.rendering.idle")
+def app_linux_rendering_idle(app) -> callable:
+    app.rendering()
+    clear_damage(app)
+    return app.rendering
+
+
+@case("app_linux.shaders.full")
+def app_linux_shaders_full(app) -> callable:
+    def frame() -> None:
+        for damage in app.damage.values():
+            damage.add_all()
+        app.rendering()
+        app.shaders()
+        app.screen_damage.clear()
+    return frame
+
+
+@case("app_linux.shaders.full.low_power")
+def app_linux_shaders_full_low_power(app) -> callable:
+    app.power_mode = "low"  # Blurred layers at the low power render scale
+    app.update_power_mode()
+    return app_linux_shaders_full(app)
+
+
+@case("app_linux.shaders.buttons")
+def app_linux_shaders_buttons(app) -> callable:
+    app.rendering()
+    app.shaders()
+    clear_damage(app)
+    state = {'i': 0}
+
+    def frame() -> None:
+        app.mouse_pos_ratio = ((state['i'] % 100) / 100, 0.5)  # Only buttons fade is changed
+        app.rendering()
+        app.shaders()
+        app.screen_damage.clear()
+        state['i'] += 1
+    return frame
+
+
+@case("field.update.animated")
+def field_update_animated(app) -> callable:
+    return animate_widgets(app.field)
+
+
+@case("field.update.idle")
+def field_update_idle(app) -> callable:
+    while app.field.is_animation_started():
+        app.field.update(16)
+    return lambda: app.field.update(16)
+
+
+@case("field.draw")
+def field_draw(app) -> callable:
+    ui = pygame.Surface(app.size, pygame.SRCALPHA)
+    shadow = pygame.Surface(app.size, pygame.SRCALPHA)
+    return lambda: app.field.draw(ui, shadow)
+
+
+@case("field.draw.sliding")
+def field_draw_sliding(app) -> callable:
+    ui = pygame.Surface(app.size, pygame.SRCALPHA)
+    shadow = pygame.Surface(app.size, pygame.SRCALPHA)
+    app.field.change_widget(is_left=True)
+    for _ in range(30):  # Both widgets are on the screen (frozen in the middle of the slide)
+        app.field.update(16)
+    return lambda: app.field.draw(ui, shadow)
+
+
+@case("field.button_draw")
+def field_button_draw(app) -> callable:
+    buttons = pygame.Surface(app.size, pygame.SRCALPHA)
+    return lambda: app.field.button_draw(buttons)
+
+
+@case("field.draw_wallpaper.hit")
+def field_draw_wallpaper_hit(app) -> callable:
+    screen = pygame.Surface(app.size)
+    app.field.wallpaper_cache.set_wallpaper(synthetic_wallpaper(), (1920, 1080))
+    return lambda: app.field.draw_wallpaper(screen, (300, 200), True)
+
+
+@case("field.draw_wallpaper.miss")
+def field_draw_wallpaper_miss(app) -> callable:
+    screen = pygame.Surface(app.size)
+    app.field.wallpaper_cache.set_wallpaper(synthetic_wallpaper(), (1920, 1080))
+    positions = [(x, x // 2) for x in range(0, 1400, 7)]  # More positions than the cache keeps
+    state = {'i': 0}
+
+    def draw_wallpaper() -> None:
+        app.field.draw_wallpaper(screen, positions[state['i'] % len(positions)], True)
+        state['i'] += 1
+    return draw_wallpaper
+
+
+@case("text.cached")
+def text_cached(app) -> callable:
+    from scripts.UI.text import Text
+    return lambda: Text("21°C", [255, 255, 255], 100)
+
+
+@case("text.counter")
+def text_counter(app) -> callable:
+    from scripts.UI.text import Text
+    state = {'i': 0}
+
+    def text() -> None:
+        Text(f"FPS: {state['i'] % 200}", [0, 0, 0], 20)
+        state['i'] += 1
+    return text
+
+
+@case("text.uncached")
+def text_uncached(app) -> callable:
+    from scripts.UI.text import Text
+    state = {'i': 0}
+
+    def text() -> None:
+        Text(f"{state['i']}°C", [255, 255, 255], 100)  # New text every call
+        state['i'] += 1
+    return text
+
+
+@case("widget.update.animated")
+def widget_update_animated(app) -> callable:
+    from scripts.animations.timeline import Timeline
+    from scripts.widgets.weather_widget import WeatherWidget
+    from scripts.widgets.widget import ANIMATION
+
+    timeline = Timeline()
+    widgets = [WeatherWidget("Weather", [0, 0], f"City{i}", timeline) for i in range(50)]
+    animations = [ANIMATION.OUTSIDE_TO_LEFT, ANIMATION.INSIDE_FROM_RIGHT]
+
+    def update() -> None:
+        timeline.update(16)
+        for i, widget in enumerate(widgets):
+            if not widget.is_animation_started:
+                widget.start_animation(750, animations[i % 2], start_after=i * 10)
+            widget.update(16)
+            widget.damage.clear()
+    return update
+
+
+def measure(function: callable, samples: int, warmup: int) -> dict[str, float]:
+    """
+    Time of every call (in microseconds) and its distribution
+    """
+    for _ in range(warmup):
+        function()
+    times = np.empty(samples, np.float64)
+    for i in range(samples):
+        start = time.perf_counter_ns()
+        function()
+        times[i] = time.perf_counter_ns() - start
+    times /= 1000
+    return {'mean': float(times.mean()), 'min': float(times.min()), 'p50': float(np.percentile(times, 50)),
+            'p95': float(np.percentile(times, 95)), 'p99': float(np.percentile(times, 99)),
+            'max': float(times.max()), 'samples': samples}
+
+
+def run(names: list[str], samples: int, warmup: int) -> dict:
+    with tempfile.TemporaryDirectory() as folder:
+        s.FORECAST_STORE_PATH = os.path.join(folder, "forecasts.sqlite3")  # User data is not changed
+        s.FRAME_SNAPSHOT_PATH = ""
+        s.WEATHER_API_KEY = ""  # No network
+        s.PLATFORM_POLL_INTERVAL = 0
+        s.POWER_MODE = "normal"  # Results do not depend on the power source
+
+        from scripts.animations.timeline import TIMELINE
+        from scripts.app import AppLinux
+        from scripts.UI.text import Text
+
+        results = {}
+        for name in names:
+            app = AppLinux()  # Every case starts with a new app
+            results[name] = measure(CASES[name](app), samples, warmup)
+            print(f"{name:<34}p50 {results[name]['p50']:>10.1f} us  p95 {results[name]['p95']:>10.1f} us  "
+                  f"p99 {results[name]['p99']:>10.1f} us")
+            if app.field.forecast_store is not None:
+                app.field.forecast_store.close()
+            Text.clear_cache()
+            TIMELINE.clear()  # Animations of this app are not updated with the next app
+        pygame.quit()
+
+    return {'meta': {'python': sys.version.split()[0], 'pygame': pygame.version.ver, 'platform': platform.platform(),
+                     'samples': samples, 'time': time.time()},
+            'cases': results}
+
+
+def compare(results: dict, baseline: dict, threshold: float, metrics: list[str]) -> bool:
+    """
+    Print difference with the baseline
+    :return: is any case slower than the baseline by more than threshold?
+    """
+    regression = False
+    for name, result in results['cases'].items():
+        if name not in baseline['cases']:
+            print(f"{name:<34}new case (not in baseline)")
+            continue
+        for metric in metrics:
+            old, new = baseline['cases'][name][metric], result[metric]
+            ratio = new / old if old > 0 else 1.
+            is_regression = ratio > 1 + threshold
+            regression = regression or is_regression
+            print(f"{name:<34}{metric:<5}{old:>10.1f} -> {new:>10.1f} us  {(ratio - 1) * 100:>+7.1f}%"
+                  f"{'  REGRESSION' if is_regression else ''}")
+    return regression
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark of the render loop")
+    parser.add_argument('--samples', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--filter', default="", help="run only cases which contain this text")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="path of the baseline (JSON)")
+    parser.add_argument('--save', action='store_true', help="save results as the baseline")
+    parser.add_argument('--compare', action='store_true', help="compare results with the baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown (0.2 - 20%%)")
+    parser.add_argument('--metrics', default="p50,p95", help="compared metrics (mean, min, p50, p95, p99, max)")
+    args = parser.parse_args()
+
+    if args.compare and not args.save and not os.path.isfile(args.baseline):  # Check can not pass without it
+        print(f"Missing baseline {args.baseline} (it is written with --save)")
+        sys.exit(1)
+
+    names = [name for name in CASES if args.filter in name]
+    results = run(names, args.samples, args.warmup)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline saved: {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline['meta']['platform'] != results['meta']['platform']:
+            print(f"Baseline was measured on another platform: {baseline['meta']['platform']}")
+        if compare(results, baseline, args.threshold, args.metrics.split(',')):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
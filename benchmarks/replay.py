@@ -0,0 +1,103 @@
+# Replay of a recorded session (python main.py --record session.rec.gz) without a window and without waiting:
+# every frame uses the recorded input and delta time, so the same file makes the same frames on any machine.
+# Run from the project folder:
+#   python -m benchmarks.replay session.rec.gz              (recorded delta time)
+#   python -m benchmarks.replay session.rec.gz --dt 16      (fixed timestep)
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import scripts.settings as s
+from benchmarks.render_loop import synthetic_wallpaper
+
+
+def replay(path: str, fixed_dt: int | None) -> dict:
+    """
+    Run all recorded frames
+    :return: frame times and times of every stage (in ms), hash of the last frame
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        s.FORECAST_STORE_PATH = os.path.join(folder, "forecasts.sqlite3")  # User data is not changed
+        s.FRAME_SNAPSHOT_PATH = ""
+        s.INPUT_RECORD_PATH = ""
+        s.WEATHER_API_KEY = ""  # No network (weather is the same in every run)
+        s.PLATFORM_POLL_INTERVAL = 0
+        s.POWER_MODE = "normal"  # Results do not depend on the power source
+
+        from scripts.app import AppLinux
+        from scripts.functionality.input_record import RECORDED_EVENTS, InputReplay
+        from scripts.functionality.profiler import STAGE_NAMES
+
+        events = tuple(event_type for event_type in RECORDED_EVENTS if event_type != pygame.QUIT)  # Replay ends
+        session = InputReplay(path, fixed_dt, events)
+        app = AppLinux()
+        app.field.wallpaper_cache.set_wallpaper(synthetic_wallpaper(), (1920, 1080))  # Same wallpaper everywhere
+        app.field.damage['background'].add_all()
+        app.start_replay(session)
+
+        frame_times = np.zeros(len(session), np.float64)
+        stage_times = np.zeros((len(session), len(STAGE_NAMES)), np.float64)
+        profiler = app.profiler
+        for i in range(len(session)):
+            start = time.perf_counter()
+            app.update()
+            frame_times[i] = (time.perf_counter() - start) * 1000
+            stage_times[i] = profiler.frames[(profiler.frame_index - 1) % len(profiler.frames)]
+        last_frame = hashlib.sha1(pygame.image.tobytes(app.screen, 'RGB')).hexdigest()
+
+        if app.field.forecast_store is not None:
+            app.field.forecast_store.close()
+        pygame.quit()
+
+    return {'frames': frame_times, 'stages': stage_times, 'stage_names': STAGE_NAMES, 'last_frame': last_frame}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Frame-time statistics of a recorded session")
+    parser.add_argument('path', help="recorded session (see main.py --record)")
+    parser.add_argument('--dt', type=int, default=None, help="fixed delta time of every frame (in ms)")
+    parser.add_argument('--json', default="", help="also write results to this file")
+    args = parser.parse_args()
+
+    result = replay(args.path, args.dt)
+    frames = result['frames']
+    if len(frames) == 0:
+        parser.error("record has no frames")
+    budget = 1000 / s.FPS
+    summary = {
+        'frames': len(frames),
+        'total': float(frames.sum()),
+        'frame': {name: float(np.percentile(frames, q)) for name, q in (('p50', 50), ('p95', 95), ('p99', 99))},
+        'max': float(frames.max()),
+        'over_budget': int((frames > budget).sum()),
+        'stages': {name: {'p50': float(np.percentile(result['stages'][:, i], 50)),
+                          'p95': float(np.percentile(result['stages'][:, i], 95))}
+                   for i, name in enumerate(result['stage_names']) if result['stages'][:, i].any()},
+        'last_frame': result['last_frame']
+    }
+
+    print(f"frames {summary['frames']}, total {summary['total']:.1f} ms, over {budget:.1f} ms budget: "
+          f"{summary['over_budget']}")
+    print(f"frame   p50 {summary['frame']['p50']:>8.3f} ms  p95 {summary['frame']['p95']:>8.3f} ms  "
+          f"p99 {summary['frame']['p99']:>8.3f} ms  max {summary['max']:>8.3f} ms")
+    for name, times in summary['stages'].items():
+        print(f"  {name:<16}p50 {times['p50']:>8.3f} ms  p95 {times['p95']:>8.3f} ms")
+    print(f"last frame {summary['last_frame']}")  # Same for the same record (replay is deterministic)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# Offscreen test and benchmark of the GL pipeline (composite shader, blurs and layer uploads of AppWindows).
+# Standalone context (Mesa software rasterizer by default), no window and no GPU are needed.
+# Run from the project folder:
+#   python -m benchmarks.shader_pipeline --compare        (compare with golden images, exit code 1 on difference)
+#   python -m benchmarks.shader_pipeline --save           (write golden images after an intended change of the image)
+# Golden images in benchmarks/baselines/shader_pipeline are rendered by Mesa llvmpipe (the default here). Tolerance
+# (2 of 255 in one channel, 0.1% of pixels above it) covers rounding of other llvmpipe versions. Hardware drivers
+# (--gpu) filter and blend a bit differently, compare them with a bigger tolerance (ex. --tolerance 8 --max-bad 0.02).
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import moderngl
+import pygame
+
+import scripts.settings as s
+from benchmarks.render_loop import synthetic_wallpaper
+from scripts.graphics.shader_pipeline import LAYERS, ShaderPipeline
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "baselines", "shader_pipeline")
+
+# Variants of the frame: render scale, mouse position (divided by size), mouse outside time (in seconds)
+# and layers which are changed in every frame (they are uploaded and blurred again)
+VARIANTS: dict[str, dict] = {
+    'composite': {'scale': 1., 'mouse': (0.95, 0.5), 'outside': 0., 'dirty': ()},
+    'composite.mouse_outside': {'scale': 1., 'mouse': (0.5, 0.5), 'outside': 1.5, 'dirty': ()},
+    'blur.background': {'scale': 1., 'mouse': (0.95, 0.5), 'outside': 0., 'dirty': ('backgroundTex',)},
+    'blur.shadow': {'scale': 1., 'mouse': (0.95, 0.5), 'outside': 0., 'dirty': ('shadowTex',)},
+    'full': {'scale': 1., 'mouse': (0.95, 0.5), 'outside': 0., 'dirty': LAYERS},
+    'full.half_scale': {'scale': 0.5, 'mouse': (0.95, 0.5), 'outside': 0., 'dirty': LAYERS}
+}
+
+
+def create_context(is_software: bool) -> moderngl.Context:
+    """
+    Standalone context without a window (default backend, then EGL which works without X server)
+    """
+    if is_software:
+        os.environ.setdefault('LIBGL_ALWAYS_SOFTWARE', '1')
+    error = None
+    for backend in (None, 'egl'):
+        try:
+            return moderngl.create_standalone_context(require=330, **({'backend': backend} if backend else {}))
+        except Exception as exception:  # Backend is not available here
+            error = exception
+    raise RuntimeError(f"No standalone OpenGL context: {error}")
+
+
+def synthetic_layers(size: tuple[int, int]) -> dict[str, pygame.Surface]:
+    """
+    Layers like the app draws them (shapes only, so images do not depend on fonts)
+    """
+    width, height = size
+    layers = {name: pygame.Surface(size, pygame.SRCALPHA) for name in LAYERS}  # Overlay stays empty
+    layers['backgroundTex'].blit(synthetic_wallpaper(), (0, 0), pygame.Rect((300, 200), size))
+
+    for name, color in (('uiTex', [255, 230, 0]), ('shadowTex', [0, 0, 0])):
+        offset = 3 if name == 'shadowTex' else 0
+        pygame.draw.circle(layers[name], color, [width * 0.28 + offset, height // 2 + offset], 50)
+        pygame.draw.rect(layers[name], color if offset else [255, 255, 255],
+                         [width * 0.5 + offset, height * 0.3 + offset, width * 0.3, height * 0.4], border_radius=12)
+
+    for x in (width * 0.05, width * 0.95):
+        pygame.draw.circle(layers['buttonsTex'], [255, 255, 255], [x, height // 2], 10)
+    pygame.draw.circle(layers['buttonsTex'], [255, 255, 255], [width // 2, height * 0.85], 12)
+
+    pygame.draw.line(layers['appShadowTex'], [0, 0, 0], [width * 0.025, height * 0.96], [width * 0.985, height * 0.96], 3)
+    pygame.draw.line(layers['appShadowTex'], [0, 0, 0], [width * 0.985, height * 0.96],
+                     [width * 0.985, height * 0.065], 3)
+    return layers
+
+
+def change_layers(layers: dict[str, pygame.Surface], keys: tuple[str, ...]) -> None:
+    """
+    Draw a mark into every changed layer (at its own place), so the frame shows that the layer was uploaded
+     and blurred again
+    """
+    width, height = next(iter(layers.values())).get_size()
+    for i, key in enumerate(LAYERS):
+        if key in keys:
+            pygame.draw.circle(layers[key], [60, 160, 255], [width * (0.12 + 0.14 * i), height * 0.2], 12)
+
+
+def read_frame(fbo: moderngl.Framebuffer) -> np.ndarray:
+    """
+    Pixels of the framebuffer (rows from top, RGB)
+    """
+    width, height = fbo.size
+    return np.frombuffer(fbo.read(components=3), np.uint8).reshape(height, width, 3)[::-1]
+
+
+def run_variant(ctx: moderngl.Context, name: str, samples: int) -> tuple[np.ndarray, float]:
+    """
+    Render the variant with the app pipeline
+    :return: frame after the changed layers were rendered again and time of one frame (in ms)
+    """
+    from scripts.app import App
+
+    variant = VARIANTS[name]
+    size = tuple(s.SIZE)
+    fbo = ctx.simple_framebuffer(size, components=4)
+    fbo.use()
+    pipeline = ShaderPipeline(ctx, size, s.COLORS['background'],
+                              (App.background_blur_weights, App.background_blur_offset),
+                              (s.SHADOW_BLUR_WEIGHTS, App.shadow_blur_offset), App.shadow_gain, variant['scale'])
+    layers = synthetic_layers(size)
+
+    # Same arguments as AppWindows.shaders (all layers are uploaded in the first frame), then the changed layers
+    # are uploaded and blurred again (golden frame checks this path, not only the first upload)
+    pipeline.render(layers, variant['mouse'], variant['outside'])
+    change_layers(layers, variant['dirty'])
+    for key in variant['dirty']:
+        pipeline.mark_dirty(key)
+    pipeline.render(layers, variant['mouse'], variant['outside'])
+    frame = read_frame(fbo)
+
+    start = time.perf_counter()
+    for _ in range(samples):
+        for key in variant['dirty']:
+            pipeline.mark_dirty(key)
+        pipeline.render(layers, variant['mouse'], variant['outside'])
+    ctx.finish()  # All frames are really rendered
+    frame_time = (time.perf_counter() - start) * 1000 / samples
+
+    pipeline.release()
+    fbo.release()
+    return frame, frame_time
+
+
+def compare_frame(frame: np.ndarray, golden: np.ndarray, tolerance: int) -> tuple[int, float]:
+    """
+    :return: max channel difference and fraction of pixels which differ more than tolerance
+    """
+    if frame.shape != golden.shape:
+        return 255, 1.
+    difference = np.abs(frame.astype(np.int16) - golden.astype(np.int16)).max(axis=2)
+    return int(difference.max()), float((difference > tolerance).mean())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Golden images and frame rate of the GL pipeline (offscreen)")
+    parser.add_argument('--samples', type=int, default=200)
+    parser.add_argument('--filter', default="", help="run only variants which contain this text")
+    parser.add_argument('--golden', default=GOLDEN_PATH, help="folder of golden images (PNG)")
+    parser.add_argument('--save', action='store_true', help="save frames as golden images")
+    parser.add_argument('--compare', action='store_true', help="compare frames with golden images")
+    parser.add_argument('--tolerance', type=int, default=2, help="allowed difference of one channel (0-255)")
+    parser.add_argument('--max-bad', type=float, default=0.001,
+                        help="allowed fraction of pixels which differ more than tolerance")
+    parser.add_argument('--gpu', action='store_true', help="use the default driver (not software rasterizer)")
+    args = parser.parse_args()
+
+    names = [name for name in VARIANTS if args.filter in name]
+    missing = [name for name in names if not os.path.isfile(os.path.join(args.golden, f"{name}.png"))]
+    if args.compare and not args.save and missing:  # Nothing is rendered, check can not pass without them
+        print(f"Missing golden images in {args.golden}: {', '.join(missing)} (they are written with --save)")
+        sys.exit(1)
+
+    ctx = create_context(not args.gpu)
+    print(f"renderer: {ctx.info['GL_RENDERER']}")
+
+    is_failed = False
+    for name in names:
+        frame, frame_time = run_variant(ctx, name, args.samples)
+        line = f"{name:<26}{frame_time:>8.3f} ms  {1000 / frame_time:>8.1f} fps"
+
+        path = os.path.join(args.golden, f"{name}.png")
+        if args.save:
+            os.makedirs(args.golden, exist_ok=True)
+            pygame.image.save(pygame.image.frombytes(frame.tobytes(), frame.shape[1::-1], 'RGB'), path)
+        if args.compare:
+            golden = pygame.surfarray.array3d(pygame.image.load(path)).transpose(1, 0, 2)
+            max_difference, bad = compare_frame(frame, golden, args.tolerance)
+            is_bad = bad > args.max_bad
+            is_failed |= is_bad
+            line += f"  max diff {max_difference:>3}  bad {bad * 100:6.3f}%{'  MISMATCH' if is_bad else ''}"
+        print(line)
+
+    if args.save:
+        print(f"Golden images saved: {args.golden}")
+    if is_failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
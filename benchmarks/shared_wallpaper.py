@@ -0,0 +1,107 @@
+# Benchmark of the wallpaper of several windows: every window decodes it vs launcher shares it (see scripts/launcher.py)
+# Time to the first wallpaper and memory of every window (PSS counts shared pages once for all processes, Linux only)
+# Run from the project folder: python -m benchmarks.shared_wallpaper --instances 4
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from benchmarks.render_loop import synthetic_wallpaper
+
+
+def memory() -> dict[str, float]:
+    """
+    Memory of this process (in MB, empty if /proc is not available)
+    """
+    result = {}
+    try:
+        with open("/proc/self/smaps_rollup") as file:
+            for line in file:
+                name, value = line.split(':', 1)
+                if name in ('Rss', 'Pss'):
+                    result[name.lower()] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return result
+
+
+def child(mode: str, path: str, name: str, display_size: tuple[int, int], barrier, queue) -> None:
+    """
+    Get the wallpaper like one window does and report time and memory
+    """
+    from scripts.graphics.shared_wallpaper import SharedWallpaper
+    from scripts.graphics.wallpaper_cache import WallpaperCache
+
+    cache = WallpaperCache((420, 140))
+    start = time.perf_counter()
+    if mode == "decode":
+        cache.set_wallpaper(pygame.image.load(path), display_size)
+    else:
+        shared = SharedWallpaper(name)
+        shared.poll()
+        cache.set_wallpaper(shared.image, shared.image.get_size())
+    cache.get((100, 100), True)
+    elapsed = time.perf_counter() - start
+    barrier.wait()  # All windows have the wallpaper (memory is measured at the same moment)
+    queue.put((elapsed * 1000, memory()))
+    barrier.wait()  # Shared memory is not unlinked until everybody is measured
+    if mode == "shared":
+        cache.image = None  # Mapped pixels are released before memory is closed
+        shared.close()
+
+
+def run(mode: str, instances: int, path: str, display_size: tuple[int, int]) -> list[tuple[float, dict]]:
+    from scripts.graphics.shared_wallpaper import SharedWallpaperHost
+
+    context = multiprocessing.get_context('spawn')
+    host = None
+    name = ""
+    if mode == "shared":
+        host = SharedWallpaperHost()
+        host.publish(pygame.image.load(path), display_size)
+        name = host.name
+
+    barrier = context.Barrier(instances)
+    queue = context.Queue()
+    processes = [context.Process(target=child, args=(mode, path, name, display_size, barrier, queue))
+                 for _ in range(instances)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    if host is not None:
+        host.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Decoded vs shared wallpaper of several windows")
+    parser.add_argument('--instances', type=int, default=4)
+    parser.add_argument('--size', default="3840x2160", help="size of the wallpaper file")
+    parser.add_argument('--display', default="1920x1080", help="size of the display")
+    args = parser.parse_args()
+
+    size = tuple(int(value) for value in args.size.split('x'))
+    display_size = tuple(int(value) for value in args.display.split('x'))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "wallpaper.png")
+        pygame.image.save(synthetic_wallpaper(size), path)
+
+        for mode in ("decode", "shared"):
+            results = run(mode, args.instances, path, display_size)
+            times = [elapsed for elapsed, _ in results]
+            pss = sum(memory.get('pss', 0.) for _, memory in results)
+            rss = sum(memory.get('rss', 0.) for _, memory in results)
+            print(f"{mode:<8}first wallpaper p50 {statistics.median(times):>8.1f} ms  max {max(times):>8.1f} ms  "
+                  f"PSS {pss:>8.1f} MB  RSS {rss:>8.1f} MB  ({args.instances} windows)")
+
+
+if __name__ == "__main__":
+    main()
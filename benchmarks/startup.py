@@ -0,0 +1,93 @@
+# Startup benchmark: import time, time to the first presented frame and time to the first rendered frame
+# (cold - no frame snapshot, warm - snapshot of the last run is shown first, plain - pygame imported as usual)
+# Run from the project folder: python -m benchmarks.startup
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def child(folder: str, is_plain: bool) -> None:
+    """
+    Start the app like main.py and measure every step (it is run in a new process, imports are not cached)
+    """
+    start = time.perf_counter()
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+    if not is_plain:
+        from scripts.startup import import_pygame
+        import_pygame()
+    import pygame
+    import scripts.settings as s
+    from scripts.app import create_app
+    import_time = time.perf_counter() - start
+
+    s.FORECAST_STORE_PATH = os.path.join(folder, "forecasts.sqlite3")  # User data is not changed
+    s.FRAME_SNAPSHOT_PATH = os.path.join(folder, "last_frame.bmp")
+    s.WEATHER_API_KEY = ""  # No network
+    s.PLATFORM_POLL_INTERVAL = 0
+
+    # The first time something is on the screen (snapshot or rendered frame)
+    presented: list[float] = []
+    for name in ('flip', 'update'):
+        def present(*args, function=getattr(pygame.display, name)) -> None:
+            if not presented:
+                presented.append(time.perf_counter() - start)
+            function(*args)
+        setattr(pygame.display, name, present)
+
+    app = create_app()
+    init_time = time.perf_counter() - start
+    is_snapshot_shown = bool(presented)
+    app.update()
+    first_frame_time = time.perf_counter() - start
+
+    app.save_snapshot()  # The next run starts with it
+    if app.field.forecast_store is not None:
+        app.field.forecast_store.close()
+    print(json.dumps({'import': import_time * 1000, 'init': init_time * 1000,
+                      'first_present': presented[0] * 1000, 'first_frame': first_frame_time * 1000,
+                      'snapshot': is_snapshot_shown}))
+
+
+def run(folder: str, is_plain: bool) -> dict:
+    command = [sys.executable, '-m', 'benchmarks.startup', '--child', '--folder', folder]
+    result = subprocess.run(command + (['--plain'] if is_plain else []), capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time and time to the first frame")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--folder', help=argparse.SUPPRESS)
+    parser.add_argument('--plain', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.folder, args.plain)
+        return
+
+    results: dict[str, list[dict]] = {'plain': [], 'cold': [], 'warm': []}
+    with tempfile.TemporaryDirectory() as folder:
+        snapshot_path = os.path.join(folder, "last_frame.bmp")
+        for i in range(args.runs):
+            for name in results:
+                if name != 'warm' and os.path.exists(snapshot_path):  # Start without the snapshot
+                    os.remove(snapshot_path)
+                results[name].append(run(folder, name == 'plain'))  # Warm run uses snapshot of the cold run
+
+    for name, runs in results.items():
+        medians = {key: statistics.median(result[key] for result in runs)
+                   for key in ('import', 'init', 'first_present', 'first_frame')}
+        print(f"{name:<6}import {medians['import']:>6.1f} ms  first present {medians['first_present']:>6.1f} ms  "
+              f"first frame {medians['first_frame']:>6.1f} ms  init {medians['init']:>6.1f} ms  "
+              f"snapshot shown {sum(result['snapshot'] for result in runs)}/{len(runs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Startup benchmark: time to the first meaningful frame (weather is visible) with cold and warm forecast store
+# Run from the project folder: python -m benchmarks.startup_store
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    """
+    Local weather server with fixed latency (like a real network)
+    """
+    protocol_version = "HTTP/1.1"
+    latency: float = 0.3  # In seconds
+
+    def do_GET(self) -> None:
+        time.sleep(StubWeatherHandler.latency)
+        body = json.dumps({'main': {'temp': 18.0}, 'weather': [{'description': "clear sky", 'icon': "01d"}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def child(store_path: str, url: str, max_time: float) -> None:
+    """
+    Start the app and count time until the first frame with weather (it is run in a new process)
+    """
+    start = time.perf_counter()
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+    import scripts.settings as s
+    s.FORECAST_STORE_PATH = store_path
+    s.FRAME_SNAPSHOT_PATH = ""  # Only the store is measured
+    s.WEATHER_API_URL = url
+    s.WEATHER_API_KEY = "benchmark"
+    s.PLATFORM_POLL_INTERVAL = 0
+
+    from scripts.app import AppLinux
+    app = AppLinux()
+    init_time = time.perf_counter() - start
+
+    frames = 0
+    while time.perf_counter() - start < max_time:
+        app.update()
+        frames += 1
+        if app.field.widgets[app.field.active_widget].snapshot is not None:  # Weather is visible
+            break
+    first_frame_time = time.perf_counter() - start
+
+    if app.field.forecast_store is not None:
+        app.field.forecast_store.close()  # Wait until fetched weather is written
+    print(json.dumps({'init': init_time * 1000, 'first_meaningful_frame': first_frame_time * 1000,
+                      'frames': frames}))
+
+
+def run(store_path: str, url: str, max_time: float) -> dict:
+    result = subprocess.run([sys.executable, '-m', 'benchmarks.startup_store', '--child', '--store', store_path,
+                             '--url', url, '--max-time', str(max_time)], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time to the first meaningful frame with cold and warm store")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.3, help="latency of the stub server (in seconds)")
+    parser.add_argument('--max-time', type=float, default=10)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--store', help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.store, args.url, args.max_time)
+        return
+
+    StubWeatherHandler.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubWeatherHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    results: dict[str, list[dict]] = {'cold': [], 'warm': []}
+    with tempfile.TemporaryDirectory() as folder:
+        for i in range(args.runs):
+            store_path = os.path.join(folder, f"store_{i}.sqlite3")
+            results['cold'].append(run(store_path, url, args.max_time))  # Empty store (data from network)
+            results['warm'].append(run(store_path, url, args.max_time))  # Store has data of the cold run
+    server.shutdown()
+
+    for name, runs in results.items():
+        first_frames = [result['first_meaningful_frame'] for result in runs]
+        inits = [result['init'] for result in runs]
+        print(f"{name}: first meaningful frame {statistics.median(first_frames):.1f} ms "
+              f"(min {min(first_frames):.1f}, max {max(first_frames):.1f}), "
+              f"init {statistics.median(inits):.1f} ms, runs {len(runs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# Check of the weather client against a local stub server (no network and no API key are needed):
+# keep-alive connections are reused, ETag revalidation (304) keeps the cached response and the old snapshot,
+# concurrent requests of one location are coalesced, failed requests (5xx or timeout) are repeated with backoff.
+# Run from the project folder: python -m benchmarks.weather_client (exit code 1 if a check fails)
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import scripts.settings as s
+from scripts.functionality.weather_api import WeatherClient
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Weather server which answers by location: 'Slow' - after a delay, 'Broken' - 503 for the first requests,
+     'Timeout' - longer than the client waits for the first request, others at once (with ETag)
+    """
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.lock: threading.Lock = threading.Lock()
+        self.requests: dict[str, int] = {}  # Requests by location
+        self.not_modified: int = 0  # Answers 304
+        self.connections: set[tuple[str, int]] = set()  # Client addresses (one for every TCP connection)
+        # How many first requests fail (timeout fails twice: the client tries a reused connection and a new one)
+        self.failures: dict[str, int] = {'Broken': 2, 'Timeout': 2}
+
+    def handle_error(self, request, client_address) -> None:
+        pass  # Client closed connection after its timeout
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def do_GET(self) -> None:
+        server: StubServer = self.server
+        location = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)['q'][0]
+        with server.lock:
+            server.requests[location] = server.requests.get(location, 0) + 1
+            server.connections.add(self.client_address)
+            is_failed = server.failures.get(location, 0) > 0
+            if is_failed:
+                server.failures[location] -= 1
+
+        if location == 'Slow':
+            time.sleep(0.15)  # Shorter than the client timeout
+        if is_failed and location == 'Timeout':
+            time.sleep(1)
+            return
+        if is_failed:
+            self.answer(503, b"")
+            return
+
+        etag = f'"{location}-1"'
+        if self.headers.get('If-None-Match') == etag:
+            with server.lock:
+                server.not_modified += 1
+            self.answer(304, b"", {'ETag': etag, 'Cache-Control': "max-age=0"})
+            return
+        body = json.dumps({'main': {'temp': 21.5}, 'weather': [{'description': location, 'icon': "01d"}]})
+        self.answer(200, body.encode(), {'ETag': etag, 'Cache-Control': "max-age=0",
+                                         'Content-Type': "application/json"})
+
+    def answer(self, status: int, body: bytes, headers: dict[str, str] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def wait_snapshot(client: WeatherClient, location: str, timeout: float) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if client.get_snapshot(location) is not None:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def main() -> None:
+    server = StubServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    s.WEATHER_BACKOFF_BASE = 100  # Short delays (the first retry is 50-150 ms)
+    client = WeatherClient(f"http://127.0.0.1:{server.server_address[1]}", "stub", ttl=0)
+    client.pool.timeout = 0.3
+    results: list[tuple[str, bool, str]] = []
+
+    # Keep-alive and ETag: three requests on one connection, the second and the third are answered with 304
+    url = client.url('London')
+    data = [client.fetch(url) for _ in range(3)]
+    results.append(("keep-alive connection is reused",
+                    len(server.connections) == 1 and server.requests['London'] == 3,
+                    f"{len(server.connections)} connections for {server.requests['London']} requests"))
+    results.append(("304 keeps the cached response", server.not_modified == 2 and data[0] == data[1] == data[2],
+                    f"{server.not_modified} answers 304"))
+
+    # Not modified response keeps the snapshot (with the time of the first response), listeners get it only once
+    received = []
+    client.listeners.append(received.append)
+    snapshots = [client.update('Paris', client.url('Paris')) for _ in range(3)]
+    client.listeners.remove(received.append)
+    results.append(("304 keeps the snapshot", snapshots[0] is snapshots[1] is snapshots[2] and len(received) == 1,
+                    f"{len({id(snapshot) for snapshot in snapshots})} snapshots, {len(received)} sent to listeners"))
+
+    # Coalescing: concurrent requests of one location make one HTTP request
+    futures = []
+    threads = [threading.Thread(target=lambda: futures.append(client.request('Slow'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = futures[0].result(timeout=5)
+    different = len({id(future) for future in futures})
+    results.append(("concurrent requests are coalesced",
+                    server.requests['Slow'] == 1 and different == 1 and snapshot is not None,
+                    f"{server.requests['Slow']} requests, {different} different futures"))
+
+    # Backoff: failed request is postponed and repeated by the client itself (no refresh is called)
+    for location, failures in (('Broken', 2), ('Timeout', 2)):
+        start = time.monotonic()
+        is_failed = client.request(location).result(timeout=5) is None
+        is_postponed = client.request(location) is None  # Retry time is not reached yet
+        is_done = wait_snapshot(client, location, 5)
+        seconds = time.monotonic() - start
+        requests = server.requests.get(location, 0)
+        results.append((f"request is repeated with backoff ({location.lower()})",
+                        is_failed and is_postponed and is_done and requests == failures + 1,
+                        f"{requests} requests, snapshot after {seconds:.2f} s"))
+
+    client.close()
+    server.shutdown()
+
+    for name, is_ok, details in results:
+        print(f"{'ok' if is_ok else 'FAILED':<8}{name:<48}{details}")
+    if not all(is_ok for _, is_ok, _ in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
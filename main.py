@@ -1,15 +1,28 @@
 # Weather widget for Windows
 # Python version: 3.11.2
-import os
+import argparse
 
-from scripts.app import AppWindows, AppLinux
+from scripts.startup import import_pygame
+
+import_pygame()  # Before app modules (they import pygame)
+
+import scripts.settings as s
+from scripts.app import create_app
 
 if __name__ == "__main__":
-    app = None
-    if os.name == "nt":  # Windows
-        app = AppWindows()
-    elif os.name == "posix":  # Linux (and potentially macOS)
-        app = AppLinux()
-
-    while True:
-        app.update()
+    parser = argparse.ArgumentParser(description="Weather widget")
+    parser.add_argument('--instances', type=int, default=1,
+                        help="start several windows (wallpaper is decoded once and shared between them)")
+    parser.add_argument('--record', default="", metavar="PATH",
+                        help="write input of every frame to the file (replay it with python -m benchmarks.replay)")
+    args = parser.parse_args()
+    if args.record:
+        s.INPUT_RECORD_PATH = args.record
+
+    if args.instances > 1:
+        from scripts.launcher import Launcher  # Multiprocessing and shared memory are needed only here
+        Launcher(args.instances).run()
+    else:
+        app = create_app()
+        while True:
+            app.update()
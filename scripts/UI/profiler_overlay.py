@@ -0,0 +1,99 @@
+from typing import TYPE_CHECKING
+
+import pygame
+
+from scripts import settings
+from scripts.functionality.profiler import STAGE, STAGE_NAMES, Profiler
+from scripts.UI.text import Text
+
+if TYPE_CHECKING:  # moderngl is imported only by the GL app
+    from scripts.graphics.gpu_resources import GpuResourceTracker
+
+
+class ProfilerOverlay:
+    """
+    Class ProfilerOverlay - bar graph of frame stages with percentiles (it replaces the FPS counter).
+     Rows are built again not more often than the interval, so the overlay does not change every frame.
+    """
+    row_height: int = 13
+    font_size: int = 16
+    bar_width: int = 60
+    columns: tuple[int, int, int, int, int] = (4, 100, 166, 206, 246)  # Name, bar, p50, p95, p99
+    width: int = 290
+
+    def __init__(self, profiler: Profiler, pos: tuple[int, int], fps: int,
+                 interval: int = settings.PROFILER_OVERLAY_INTERVAL) -> None:
+        self.profiler: Profiler = profiler
+        self.rect: pygame.Rect = pygame.Rect(pos, (ProfilerOverlay.width,
+                                                   ProfilerOverlay.row_height * (len(STAGE_NAMES) + 1) + 4))
+        self.frame_budget: float = 1000 / fps if fps else 1000 / 60  # Time of one frame (in ms)
+        self.interval: int = interval
+        self.is_visible: bool = False
+        self.last_time: int | None = None  # When rows were built (in ms)
+        self.header: str = ""
+        self.rows: list[tuple[str, float, str, str, str]] = []  # Name, bar ratio, p50, p95, p99
+        self.resources: GpuResourceTracker | None = None  # GL objects (shown in the last row)
+        self.resources_row: str = ""
+
+    def set_resources(self, resources: "GpuResourceTracker") -> None:
+        """
+        Show live GL objects, their memory, allocations and releases in the last frames (one more row)
+        """
+        self.resources = resources
+        self.rect.height += ProfilerOverlay.row_height
+
+    def update(self, is_visible: bool, fps: float, now: int) -> bool:
+        """
+        Show or hide the overlay and build rows again after the interval
+        :return: was the overlay changed (it must be redrawn)?
+        """
+        if is_visible != self.is_visible:
+            self.is_visible = is_visible
+            self.last_time = None
+            if is_visible:
+                self.build(fps, now)
+            return True
+        if not is_visible or (self.last_time is not None and now - self.last_time < self.interval):
+            return False
+        return self.build(fps, now)
+
+    def build(self, fps: float, now: int) -> bool:
+        """
+        :return: were rows changed?
+        """
+        self.last_time = now
+        header = f"FPS: {int(fps)}" if fps != float('inf') else "FPS: inf"
+        rows = [(name, min(p95 / self.frame_budget, 1.), f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}")
+                for name, (p50, p95, p99) in zip(STAGE_NAMES, self.profiler.percentiles().tolist())]
+        resources_row = self.resources.summary() if self.resources is not None else ""
+        is_changed = header != self.header or rows != self.rows or resources_row != self.resources_row
+        self.header, self.rows, self.resources_row = header, rows, resources_row
+        return is_changed
+
+    def draw(self, screen: pygame.Surface) -> None:
+        if not self.is_visible:
+            return
+        screen.fill([0, 0, 0, 150], self.rect)
+
+        x, y = self.rect.topleft
+        name_x, bar_x, p50_x, p95_x, p99_x = ProfilerOverlay.columns
+        for text, column in ((self.header, name_x), ("p50", p50_x), ("p95", p95_x), ("p99 ms", p99_x)):
+            Text(text, [255, 255, 255], ProfilerOverlay.font_size).print(screen, [x + column, y + 2])
+
+        for i, (name, ratio, p50, p95, p99) in enumerate(self.rows):
+            row_y = y + 2 + (i + 1) * ProfilerOverlay.row_height
+            Text(name, [255, 255, 255], ProfilerOverlay.font_size).print(screen, [x + name_x, row_y])
+            bar = pygame.Rect(x + bar_x, row_y + 2, ProfilerOverlay.bar_width, ProfilerOverlay.row_height - 4)
+            pygame.draw.rect(screen, [90, 90, 90], bar)
+            color = [80, 200, 80] if ratio < 0.5 else [230, 170, 40] if ratio < 0.9 else [230, 60, 60]
+            if i == STAGE.WAIT:  # Waiting is free time of the frame (long wait is good)
+                color = [70, 140, 230]
+            bar.width = max(round(ProfilerOverlay.bar_width * ratio), 1)
+            pygame.draw.rect(screen, color, bar)  # Part of the frame budget (p95)
+            for text, column in ((p50, p50_x), (p95, p95_x), (p99, p99_x)):
+                Text(text, [255, 255, 255], ProfilerOverlay.font_size).print(screen, [x + column, row_y])
+
+        if self.resources_row:
+            row_y = y + 2 + (len(self.rows) + 1) * ProfilerOverlay.row_height
+            Text("gpu", [255, 255, 255], ProfilerOverlay.font_size).print(screen, [x + name_x, row_y])
+            Text(self.resources_row, [255, 255, 255], ProfilerOverlay.font_size).print(screen, [x + bar_x, row_y])
@@ -1,73 +1,141 @@
 import math
 import pygame
 
-from scripts.animations import timing_functions
+from scripts.animations.timeline import EASING, TIMELINE, Timeline, Track
+from scripts.graphics.damage import Damage
+from scripts.settings import SIZE
+
+
+class ButtonShape:
+    """
+    Class ButtonShape - geometry of the button for every step of its animation (it is computed once and shared by
+     buttons with the same angle and size). Rendered buttons (sprites) are cached too.
+    """
+    step: float = 0.5  # Difference of angle between two animation steps (in degrees)
+    line_width: int = 6
+    margin: int = 5  # Space around lines in the rectangle of the button
+
+    def __init__(self, center_angle: float, min_diff: float, max_diff: float, size: float) -> None:
+        self.min_diff: float = min_diff
+        self.steps_count: int = max(round((max_diff - min_diff) / ButtonShape.step), 0) + 1
+
+        # Ends of both lines (relative to the position of the button) and rectangles (relative too) for every step
+        self.lines: list[tuple[tuple[float, float], tuple[float, float]]] = []
+        self.rects: list[pygame.Rect] = []
+        for i in range(self.steps_count):
+            diff = min_diff + i * ButtonShape.step
+            left_radians = (center_angle - diff) * math.pi / 180
+            right_radians = (center_angle + diff) * math.pi / 180
+            left = (size * math.cos(left_radians), size * math.sin(left_radians))
+            right = (size * math.cos(right_radians), size * math.sin(right_radians))
+            self.lines.append((left, right))
+
+            min_x, min_y = math.floor(min(0, left[0], right[0])), math.floor(min(0, left[1], right[1]))
+            max_x, max_y = math.ceil(max(0, left[0], right[0])), math.ceil(max(0, left[1], right[1]))
+            self.rects.append(pygame.Rect(min_x - ButtonShape.margin, min_y - ButtonShape.margin,
+                                          max_x - min_x + 2 * ButtonShape.margin + 1,
+                                          max_y - min_y + 2 * ButtonShape.margin + 1))
+
+        self.sprites: dict[tuple[int, tuple], pygame.Surface] = {}  # Rendered steps (step, color)
+
+    def index(self, diff: float) -> int:
+        """
+        Animation step of the angle
+        """
+        return min(max(round((diff - self.min_diff) / ButtonShape.step), 0), self.steps_count - 1)
+
+    def sprite(self, index: int, color: list[int, int, int]) -> pygame.Surface:
+        """
+        Rendered button (it is drawn only once for every step and color)
+        """
+        key = (index, tuple(color))
+        if key not in self.sprites:
+            rect = self.rects[index]
+            sprite = pygame.Surface(rect.size, pygame.SRCALPHA)
+            center = (-rect.x, -rect.y)
+            for end in self.lines[index]:
+                pygame.draw.line(sprite, color, center, (end[0] + center[0], end[1] + center[1]),
+                                 ButtonShape.line_width)
+            self.sprites[key] = sprite
+        return self.sprites[key]
 
 
 class SideButton:
     animation_diff: float = 20
     animation_duration: int = 250
+    shapes: dict[tuple[float, float, float], ButtonShape] = {}  # Shared geometry (center angle, center diff, size)
 
-    def __init__(self, center_angle: float, center_diff: float, size: float = 1, pos: tuple[int, int] = (0, 0)) -> None:
+    def __init__(self, center_angle: float, center_diff: float, size: float = 1, pos: tuple[int, int] = (0, 0),
+                 timeline: Timeline = TIMELINE) -> None:
         self.center_angle: float = center_angle
         self.center_diff: float = center_diff
         self.size: float = size
         self.pos: tuple[int, int] = pos
+        self.origin: tuple[int, int] = (round(pos[0]), round(pos[1]))  # Position in pixels
+
+        key = (center_angle, center_diff, size)
+        if key not in SideButton.shapes:
+            SideButton.shapes[key] = ButtonShape(center_angle, center_diff - SideButton.animation_diff,
+                                                 center_diff, size)
+        self.shape: ButtonShape = SideButton.shapes[key]
 
-        self.button: list[list[tuple[float, float]]] = []
+        self.step: int | None = None  # Current animation step of the angle between center and side lines
+        self.rect: pygame.Rect = pygame.Rect(self.origin, (0, 0))  # Area of the button
+        self.diff_track: Track = timeline.track(center_diff)  # Angle is animated by the timeline
+        self.was_animated: bool = True  # Last value of the animation must be shown too
+        self.release()  # Button opens when it appears
         self.is_clicked: bool = False
-        self.last_click_time: int = 0
+        self.damage: Damage = Damage(SIZE)  # Changed area of the button
 
     def create(self, diff: float) -> None:
-        self.button = []
-        left_radians = (self.center_angle - diff)*math.pi/180
-        right_radians = (self.center_angle + diff)*math.pi/180
-        vector1 = [[self.pos[0], self.pos[1]],
-                   [self.size*math.cos(left_radians)+self.pos[0], self.size*math.sin(left_radians)+self.pos[1]]]
-        vector2 = [[self.pos[0], self.pos[1]],
-                   [self.size*math.cos(right_radians)+self.pos[0], self.size*math.sin(right_radians)+self.pos[1]]]
-        self.button.append(vector1)
-        self.button.append(vector2)
+        step = self.shape.index(diff)
+        if step == self.step:  # Nothing to change
+            return
+        if self.step is not None:
+            self.damage.add(self.rect)  # Old place of the button
+        self.step = step
+        self.rect = self.shape.rects[step].move(self.origin)
+        self.damage.add(self.rect)  # New place of the button
+
+    def get_rect(self) -> pygame.Rect:
+        """
+        Area which is used by the drawn button (lines have 6 pixels width)
+        """
+        return self.rect.copy()
+
+    @property
+    def is_animation_started(self) -> bool:
+        return self.diff_track.is_animated
+
+    def press(self) -> None:
+        self.diff_track.animate(self.center_diff, self.center_diff - SideButton.animation_diff,
+                                SideButton.animation_duration, EASING.EASE_OUT)
+
+    def release(self) -> None:
+        self.diff_track.animate(self.center_diff - SideButton.animation_diff, self.center_diff,
+                                SideButton.animation_duration, EASING.EASE_OUT)
 
     def click_down(self, mouse_pos) -> None:
         if self.mouse_is_hover(mouse_pos):
             self.is_clicked = True
-            self.last_click_time = 0
+            self.press()
 
     def click_up(self, mouse_pos, function: callable = None) -> None:
         if self.is_clicked:
-            if self.mouse_is_hover(mouse_pos):
+            if self.mouse_is_hover(mouse_pos) and function is not None:
                 function()
-            self.last_click_time = 0
+            self.release()
             self.is_clicked = False
 
     def draw(self, screen: pygame.Surface, color: list[int, int, int]):
-        for i in range(len(self.button)):
-            pygame.draw.line(screen, color, list(self.button[i][0]), list(self.button[i][1]), 6)
+        if self.step is not None:
+            screen.blit(self.shape.sprite(self.step, color), self.rect)
 
     def mouse_is_hover(self, mouse_pos: tuple[int, int]) -> bool:
-        positions_x: tuple = self.button[0][0][0], self.button[0][1][0], self.button[1][0][0], self.button[1][1][0]
-        positions_y: tuple = self.button[0][0][1], self.button[0][1][1], self.button[1][0][1], self.button[1][1][1]
-        # Make a rectangle from the button
-        min_x, max_x = min(positions_x)-5, max(positions_x)+5
-        min_y, max_y = min(positions_y)-5, max(positions_y)+5
-        if min_x <= mouse_pos[0] <= max_x and min_y <= mouse_pos[1] <= max_y:
-            return True
-        return False
+        return self.rect.collidepoint(mouse_pos)
 
     def update(self, dt):
-        self.last_click_time += dt
-        if self.is_clicked:
-            if self.last_click_time >= SideButton.animation_duration:
-                self.create(self.center_diff-SideButton.animation_diff)
-            else:
-                self.create(timing_functions.ease_out(self.center_diff,
-                                                      self.center_diff - SideButton.animation_diff,
-                                                      self.last_click_time / SideButton.animation_duration))
-        else:
-            if self.last_click_time >= SideButton.animation_duration:
-                self.create(self.center_diff)
-            else:
-                self.create(timing_functions.ease_out(self.center_diff - SideButton.animation_diff,
-                                                      self.center_diff,
-                                                      self.last_click_time / SideButton.animation_duration))
+        is_animated = self.diff_track.is_animated
+        if is_animated or self.was_animated:  # Idle button is not changed (the last frame of animation is shown)
+            self.create(self.diff_track.value)
+        self.was_animated = is_animated
@@ -0,0 +1,85 @@
+import pygame
+
+
+class SpatialGrid:
+    """
+    Class SpatialGrid - finds interactive elements (buttons, widgets) by point or area without testing all of them.
+     The app is divided into square cells, every element is remembered in the cells which its rectangle touches.
+    """
+
+    def __init__(self, cell_size: int) -> None:
+        self.cell_size: int = cell_size
+        self.cells: dict[tuple[int, int], list] = {}  # Elements in every cell
+        self.rects: dict[object, pygame.Rect] = {}  # Rectangle of every element
+        self.spans: dict[object, tuple[int, int, int, int]] = {}  # Cells of every element (x1, y1, x2, y2)
+        self.order: dict[object, int] = {}  # Results are returned in order of insertion (ex. drawing order)
+        self.next_order: int = 0
+
+    def span(self, rect: pygame.Rect) -> tuple[int, int, int, int]:
+        return (rect.left // self.cell_size, rect.top // self.cell_size,
+                (rect.right - 1) // self.cell_size, (rect.bottom - 1) // self.cell_size)
+
+    def insert(self, item: object, rect: pygame.Rect) -> None:
+        if item in self.rects:
+            self.update(item, rect)
+            return
+        self.order[item] = self.next_order
+        self.next_order += 1
+        self.rects[item] = pygame.Rect(rect)
+        self.spans[item] = self.span(rect)
+        self.add_to_cells(item, self.spans[item])
+
+    def update(self, item: object, rect: pygame.Rect) -> None:
+        """
+        Move element (cells are changed only if the element moved to other cells)
+        """
+        self.rects[item] = pygame.Rect(rect)
+        span = self.span(rect)
+        if span != self.spans[item]:
+            self.remove_from_cells(item, self.spans[item])
+            self.add_to_cells(item, span)
+            self.spans[item] = span
+
+    def remove(self, item: object) -> None:
+        if item in self.rects:
+            self.remove_from_cells(item, self.spans.pop(item))
+            del self.rects[item]
+            del self.order[item]
+
+    def add_to_cells(self, item: object, span: tuple[int, int, int, int]) -> None:
+        for x in range(span[0], span[2] + 1):
+            for y in range(span[1], span[3] + 1):
+                self.cells.setdefault((x, y), []).append(item)
+
+    def remove_from_cells(self, item: object, span: tuple[int, int, int, int]) -> None:
+        for x in range(span[0], span[2] + 1):
+            for y in range(span[1], span[3] + 1):
+                cell = self.cells[(x, y)]
+                cell.remove(item)
+                if not cell:
+                    del self.cells[(x, y)]
+
+    def query_point(self, pos: tuple[float, float]) -> list:
+        """
+        Elements under the point (in order of insertion)
+        """
+        cell = self.cells.get((int(pos[0]) // self.cell_size, int(pos[1]) // self.cell_size), [])
+        return sorted((item for item in cell if self.rects[item].collidepoint(pos)), key=self.order.__getitem__)
+
+    def query_rect(self, rect: pygame.Rect) -> list:
+        """
+        Elements which collide with the rectangle (in order of insertion)
+        """
+        if rect.width <= 0 or rect.height <= 0:
+            return []
+        x1, y1, x2, y2 = self.span(rect)
+        found = set()
+        if (x2 - x1 + 1) * (y2 - y1 + 1) > len(self.cells):  # Big area - checking all used cells is faster
+            for (x, y), cell in self.cells.items():
+                if x1 <= x <= x2 and y1 <= y <= y2:
+                    found.update(cell)
+        else:
+            for x in range(x1, x2 + 1):
+                for y in range(y1, y2 + 1):
+                    found.update(self.cells.get((x, y), ()))
+        return sorted((item for item in found if self.rects[item].colliderect(rect)), key=self.order.__getitem__)
@@ -1,23 +1,69 @@
+from collections import OrderedDict
+
 import pygame
 
+from scripts import settings
+
 
 class Text:
     """
     Class Text - represents text in the model (this class optimizes the use of fonts and a text surface because
      pygame.font.Font is very slow)
     """
-    fonts: dict = {}  # Dictionary of fonts
+    fonts: dict[tuple[str | None, int], pygame.font.Font] = {}  # Dictionary of fonts (type, size)
+    surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()  # Rendered texts (from old to recently used)
+    surfaces_bytes: int = 0  # Memory of all rendered texts
+    max_surfaces_bytes: int = settings.TEXT_CACHE_SIZE  # Memory limit of rendered texts
+    hits: int = 0  # How many texts were taken from cache
+    misses: int = 0  # How many texts were rendered
 
     def __init__(self, text: str, color: list[int, int, int], size_font: int, type_font: str = None) -> None:
-        if size_font in Text.fonts:
-            self.font = Text.fonts[size_font]
-        else:
+        self.font = Text.get_font(size_font, type_font)
+        # Whole string is rendered at once (kerning of the font is kept), see render
+        self.text_surface: pygame.Surface = Text.render(self.font, text, color, size_font, type_font)
+        self.size: tuple[int, int] = self.text_surface.get_size()
+
+    @staticmethod
+    def get_font(size_font: int, type_font: str = None) -> pygame.font.Font:
+        key = (type_font, size_font)
+        if key not in Text.fonts:
             if type_font:
-                self.font = pygame.font.Font("fonts/" + type_font + ".ttf", size_font)
+                Text.fonts[key] = pygame.font.Font("fonts/" + type_font + ".ttf", size_font)
             else:
-                self.font = pygame.font.Font(None, size_font)
-            Text.fonts[size_font] = self.font
-        self.text_surface: pygame.Surface = self.font.render(text, True, color)
+                Text.fonts[key] = pygame.font.Font(None, size_font)
+        return Text.fonts[key]
+
+    @staticmethod
+    def render(font: pygame.font.Font, text: str, color: list[int, int, int], size_font: int,
+               type_font: str = None) -> pygame.Surface:
+        """
+        Render text (rendered texts are cached, the least recently used are removed over memory limit)
+        """
+        key = (text, tuple(color), size_font, type_font)
+        if key in Text.surfaces:
+            Text.hits += 1
+            Text.surfaces.move_to_end(key)
+            return Text.surfaces[key]
+
+        Text.misses += 1
+        surface = font.render(text, True, color)
+        Text.surfaces[key] = surface
+        Text.surfaces_bytes += surface.get_width() * surface.get_height() * surface.get_bytesize()
+        while Text.surfaces_bytes > Text.max_surfaces_bytes and len(Text.surfaces) > 1:
+            _, old_surface = Text.surfaces.popitem(last=False)
+            Text.surfaces_bytes -= old_surface.get_width() * old_surface.get_height() * old_surface.get_bytesize()
+        return surface
+
+    @staticmethod
+    def cache_info() -> dict[str, int]:
+        return {'hits': Text.hits, 'misses': Text.misses, 'surfaces': len(Text.surfaces),
+                'bytes': Text.surfaces_bytes, 'fonts': len(Text.fonts)}
+
+    @staticmethod
+    def clear_cache() -> None:
+        Text.fonts = {}
+        Text.surfaces = OrderedDict()
+        Text.surfaces_bytes = 0
 
     def print(self, screen: pygame.Surface, pos: list[float, float], center: bool = False) -> None:
         """
@@ -31,4 +77,4 @@ class Text:
         if center:
             screen.blit(self.text_surface, self.text_surface.get_rect(center=pos))
         else:
-            screen.blit(self.text_surface, pos)
\ No newline at end of file
+            screen.blit(self.text_surface, pos)
@@ -0,0 +1,216 @@
+import numpy as np
+
+from scripts.animations import timing_functions
+
+
+class EASING:  # Enum for easing functions (index in timing_functions.EASINGS)
+    LINEAR = 0
+    EASE_IN = 1
+    EASE_OUT = 2
+    EASE_IN_OUT = 3
+
+
+class Track:
+    """
+    One animated value (ex. x position of the widget). Value is stored in the timeline array.
+    """
+    __slots__ = ('timeline', 'channel')
+
+    def __init__(self, timeline: "Timeline", channel: int) -> None:
+        self.timeline: Timeline = timeline
+        self.channel: int = channel  # Index of the value in the timeline
+
+    @property
+    def value(self) -> float:
+        return float(self.timeline.values[self.channel])
+
+    @value.setter
+    def value(self, value: float) -> None:
+        self.timeline.stop(self.channel)
+        self.timeline.values[self.channel] = value
+
+    @property
+    def is_animated(self) -> bool:
+        return self.timeline.tweens_count[self.channel] > 0 or self.channel in self.timeline.chained_channels
+
+    def animate(self, start_value: float, end_value: float, duration: int, easing: int = EASING.LINEAR,
+                delay: int = 0) -> int:
+        """
+        Start animation of the value (old animations of the value are stopped)
+        :param duration: time of animation (in ms)
+        :param easing: easing function (see EASING)
+        :param delay: time before the start, the value is equal to start value (in ms)
+        :return: tween id (for chaining)
+        """
+        self.timeline.stop(self.channel)
+        return self.timeline.add(self.channel, start_value, end_value, duration, easing, delay)
+
+    def then(self, tween_id: int, start_value: float, end_value: float, duration: int,
+             easing: int = EASING.LINEAR, delay: int = 0) -> int:
+        """
+        Start animation after another animation of this timeline
+        :return: tween id (for chaining)
+        """
+        return self.timeline.chain(tween_id, self.channel, start_value, end_value, duration, easing, delay)
+
+
+class Timeline:
+    """
+    This class stores all active animations (tweens) in arrays and updates them with one vectorized call per frame.
+    Finished tweens are removed from the arrays (only running animations cost something).
+    """
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.values: np.ndarray = np.zeros(capacity, np.float64)  # Animated values (by channel)
+        self.tweens_count: np.ndarray = np.zeros(capacity, np.int32)  # How many tweens change every channel
+        self.channels_count: int = 0
+        self.free_channels: list[int] = []  # Channels of released tracks (they are used again)
+
+        # Active tweens (only first self.count items are used)
+        self.count: int = 0
+        self.ids: np.ndarray = np.zeros(capacity, np.int64)
+        self.channel: np.ndarray = np.zeros(capacity, np.int32)
+        self.start: np.ndarray = np.zeros(capacity, np.float64)
+        self.end: np.ndarray = np.zeros(capacity, np.float64)
+        self.elapsed: np.ndarray = np.zeros(capacity, np.float64)  # Negative while tween waits for start
+        self.duration: np.ndarray = np.ones(capacity, np.float64)
+        self.easing: np.ndarray = np.zeros(capacity, np.int32)
+
+        self.next_id: int = 1
+        self.chained: dict[int, list[tuple]] = {}  # Tweens which start after another tween (by its id)
+        self.chained_channels: set[int] = set()  # Channels which have waiting chained tweens
+
+    def track(self, value: float = 0) -> Track:
+        """
+        Create a new animated value
+        """
+        if self.free_channels:
+            channel = self.free_channels.pop()
+            self.values[channel] = value
+            return Track(self, channel)
+
+        if self.channels_count == len(self.values):
+            self.values = np.resize(self.values, len(self.values) * 2)
+            self.tweens_count = np.concatenate([self.tweens_count, np.zeros_like(self.tweens_count)])
+        channel = self.channels_count
+        self.channels_count += 1
+        self.values[channel] = value
+        return Track(self, channel)
+
+    def release(self, track: Track) -> None:
+        """
+        Stop animations of the track and give its channel to the next new track (old track must not be used)
+        """
+        self.stop(track.channel)
+        self.free_channels.append(track.channel)
+
+    def clear(self) -> None:
+        """
+        Remove all tracks and tweens (old tracks must not be used)
+        """
+        self.__init__(len(self.ids))
+
+    def grow(self) -> None:
+        capacity = len(self.ids) * 2
+        for name in ('ids', 'channel', 'start', 'end', 'elapsed', 'duration', 'easing'):
+            array = getattr(self, name)
+            new_array = np.ones(capacity, array.dtype) if name == 'duration' else np.zeros(capacity, array.dtype)
+            new_array[:self.count] = array[:self.count]
+            setattr(self, name, new_array)
+
+    def add(self, channel: int, start_value: float, end_value: float, duration: int, easing: int = EASING.LINEAR,
+            delay: int = 0) -> int:
+        """
+        Add tween (see Track.animate)
+        :return: tween id
+        """
+        if self.count == len(self.ids):
+            self.grow()
+
+        i = self.count
+        tween_id = self.next_id
+        self.next_id += 1
+        self.ids[i] = tween_id
+        self.channel[i] = channel
+        self.start[i] = start_value
+        self.end[i] = end_value
+        self.elapsed[i] = -delay
+        self.duration[i] = max(duration, 1)
+        self.easing[i] = easing
+        self.count += 1
+
+        self.tweens_count[channel] += 1
+        self.values[channel] = start_value
+        return tween_id
+
+    def chain(self, after: int, channel: int, start_value: float, end_value: float, duration: int,
+              easing: int = EASING.LINEAR, delay: int = 0) -> int:
+        """
+        Add tween which starts when another tween is finished
+        :param after: id of the previous tween
+        :return: tween id (it is used when tween really starts)
+        """
+        tween_id = self.next_id
+        self.next_id += 1
+        self.chained.setdefault(after, []).append((tween_id, channel, start_value, end_value, duration, easing,
+                                                   delay))
+        self.chained_channels.add(channel)
+        return tween_id
+
+    def stop(self, channel: int) -> None:
+        """
+        Stop all tweens (and waiting chained tweens) of the channel
+        """
+        if channel in self.chained_channels:
+            for after in list(self.chained.keys()):
+                self.chained[after] = [tween for tween in self.chained[after] if tween[1] != channel]
+                if not self.chained[after]:
+                    del self.chained[after]
+            self.chained_channels.discard(channel)
+
+        if self.tweens_count[channel] > 0:
+            self.remove(self.channel[:self.count] == channel)
+
+    def remove(self, mask: np.ndarray) -> None:
+        """
+        Remove tweens (mask is for active tweens)
+        """
+        np.subtract.at(self.tweens_count, self.channel[:self.count][mask], 1)
+        keep = np.flatnonzero(~mask)
+        for name in ('ids', 'channel', 'start', 'end', 'elapsed', 'duration', 'easing'):
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.count = len(keep)
+
+    def update(self, dt: int) -> None:
+        """
+        Move all tweens by delta time and write new values
+        """
+        if self.count == 0:
+            return
+
+        n = self.count
+        elapsed = self.elapsed[:n]
+        elapsed += dt
+        progress = np.clip(elapsed / self.duration[:n], 0., 1.)
+        eased = timing_functions.evaluate(self.easing[:n], progress)
+        self.values[self.channel[:n]] = self.start[:n] + (self.end[:n] - self.start[:n]) * eased
+
+        finished = elapsed >= self.duration[:n]
+        if finished.any():
+            finished_ids = self.ids[:n][finished].tolist()
+            overtime = (elapsed[finished] - self.duration[:n][finished]).tolist()  # Time after the end
+            self.remove(finished)
+            for tween_id, extra_time in zip(finished_ids, overtime):
+                self.start_chained(tween_id, extra_time)
+
+    def start_chained(self, after: int, extra_time: float) -> None:
+        for tween_id, channel, start_value, end_value, duration, easing, delay in self.chained.pop(after, []):
+            if not any(tween[1] == channel for tweens in self.chained.values() for tween in tweens):
+                self.chained_channels.discard(channel)
+            self.add(channel, start_value, end_value, duration, easing, delay)
+            self.ids[self.count - 1] = tween_id
+            self.elapsed[self.count - 1] += extra_time  # Chained tween does not lose time of the frame
+
+
+TIMELINE: Timeline = Timeline()  # Shared timeline (field updates it once per frame)
@@ -1,3 +1,9 @@
+from bisect import bisect_right
+from functools import lru_cache
+
+import numpy as np
+
+
 def linear(start_value: float, end_value: float, current_time: float) -> float:
     return start_value + (end_value - start_value) * current_time
 
@@ -17,9 +23,189 @@ def ease_in_out(start_value: float, end_value: float, current_time: float) -> fl
         return start_value + (end_value - start_value) * (1 - (-2 * current_time + 2) ** 2 / 2)
 
 
+def ease_in_out_array(start_value: float, end_value: float, current_time: np.ndarray) -> np.ndarray:
+    """
+    ease_in_out for arrays (both halves are computed, then the right one is chosen)
+    """
+    progress = np.where(current_time < 0.5, (2 * current_time) ** 2 / 2, 1 - (-2 * current_time + 2) ** 2 / 2)
+    return start_value + (end_value - start_value) * progress
+
+
+# Easing functions which work with arrays (index is used as easing id, see animations.timeline.EASING)
+EASINGS: list[callable] = [linear, ease_in, ease_out, ease_in_out_array]
+
+
+def evaluate(easing: np.ndarray, current_time: np.ndarray) -> np.ndarray:
+    """
+    Evaluate easing functions for many values at once (one call for every used easing function)
+    :param easing: easing id of every value
+    :param current_time: progress of every value (from 0 to 1)
+    :return: eased progress of every value
+    """
+    easing_ids = np.flatnonzero(np.bincount(easing))  # Used ids (np.unique imports numpy.ma on the first call)
+    if len(easing_ids) == 1:  # Everything uses the same easing
+        return EASINGS[easing_ids[0]](0., 1., current_time)
+
+    result = np.empty_like(current_time)
+    for easing_id in easing_ids:
+        mask = easing == easing_id
+        result[mask] = EASINGS[easing_id](0., 1., current_time[mask])
+    return result
+
+
+def register_easing(function: callable) -> int:
+    """
+    Add easing function which works with arrays (ex. compiled cubic bezier)
+    :return: easing id (for animations.timeline)
+    """
+    if function in EASINGS:
+        return EASINGS.index(function)
+    EASINGS.append(function)
+    return len(EASINGS) - 1
+
+
+class CubicBezier:
+    """
+    Easing curve like CSS cubic-bezier(x1, y1, x2, y2) (curve goes from (0, 0) to (1, 1)).
+    x(t) is sampled once, then for every time t is found from the table and refined by Newton-Raphson
+    (or by bisection when the curve is too flat).
+    """
+    table_size: int = 11  # Samples of x(t)
+    newton_iterations: int = 4
+    newton_min_slope: float = 0.001  # Under this slope Newton-Raphson is not stable, so bisection is used
+    precision: float = 1e-6  # Allowed error of t (if Newton-Raphson result is worse, bisection is used)
+    bisection_iterations: int = 20
+
+    def __init__(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        if not (0 <= x1 <= 1 and 0 <= x2 <= 1):
+            raise ValueError("x1 and x2 of cubic bezier must be between 0 and 1")
+        self.points: tuple[float, float, float, float] = (x1, y1, x2, y2)
+
+        # Polynomial coefficients (x(t) = ((ax * t + bx) * t + cx) * t)
+        self.cx: float = 3 * x1
+        self.bx: float = 3 * (x2 - x1) - self.cx
+        self.ax: float = 1 - self.cx - self.bx
+        self.cy: float = 3 * y1
+        self.by: float = 3 * (y2 - y1) - self.cy
+        self.ay: float = 1 - self.cy - self.by
+
+        self.step: float = 1 / (CubicBezier.table_size - 1)
+        self.table: np.ndarray = self.x(np.linspace(0, 1, CubicBezier.table_size))  # x(t) for uniform t
+        self.table_list: list[float] = self.table.tolist()
+        self.is_linear: bool = x1 == y1 and x2 == y2
+        self.easing_id: int | None = None
+
+    def x(self, t):
+        return ((self.ax * t + self.bx) * t + self.cx) * t
+
+    def y(self, t):
+        return ((self.ay * t + self.by) * t + self.cy) * t
+
+    def x_slope(self, t):
+        return (3 * self.ax * t + 2 * self.bx) * t + self.cx
+
+    def solve_t(self, x: float) -> float:
+        """
+        Find t for x (x(t) = x)
+        """
+        # Guess from the table (linear interpolation between two samples around x)
+        i = min(max(bisect_right(self.table_list, x) - 1, 0), CubicBezier.table_size - 2)
+        left, right = self.table_list[i], self.table_list[i + 1]
+        t = (i + ((x - left) / (right - left) if right != left else 0)) * self.step
+
+        if self.x_slope(t) >= CubicBezier.newton_min_slope:
+            newton_t = t
+            for _ in range(CubicBezier.newton_iterations):
+                slope = self.x_slope(newton_t)
+                if slope == 0:
+                    break
+                newton_t -= (self.x(newton_t) - x) / slope
+            # Error of t is estimated from error of x and the slope (on flat parts small error of x is big error of t)
+            if abs(self.x(newton_t) - x) < CubicBezier.precision * self.x_slope(newton_t):
+                return newton_t
+
+        # Bisection between two samples (x(t) is monotonic, so the answer is there), it stops on width of the interval
+        low, high = i * self.step, (i + 1) * self.step
+        for _ in range(CubicBezier.bisection_iterations):
+            middle = (low + high) / 2
+            if self.x(middle) > x:
+                high = middle
+            else:
+                low = middle
+        return (low + high) / 2
+
+    def solve_t_array(self, x: np.ndarray) -> np.ndarray:
+        """
+        solve_t for arrays (the same steps for all values at once)
+        """
+        i = np.clip(np.searchsorted(self.table, x, side='right') - 1, 0, CubicBezier.table_size - 2)
+        left, right = self.table[i], self.table[i + 1]
+        width = right - left
+        t = (i + np.divide(x - left, width, out=np.zeros_like(x), where=width != 0)) * self.step
+
+        newton = self.x_slope(t) >= CubicBezier.newton_min_slope
+        if newton.any():
+            tn = t[newton]
+            xn = x[newton]
+            for _ in range(CubicBezier.newton_iterations):
+                slope = self.x_slope(tn)
+                tn = tn - np.divide(self.x(tn) - xn, slope, out=np.zeros_like(tn), where=slope != 0)
+            t[newton] = tn
+            # Newton-Raphson failed (error of t is estimated from error of x and the slope like in solve_t)
+            newton[newton] = np.abs(self.x(tn) - xn) < CubicBezier.precision * self.x_slope(tn)
+
+        bisection = ~newton  # Flat curve or Newton-Raphson failed
+        if bisection.any():
+            low = i[bisection] * self.step
+            high = low + self.step
+            xb = x[bisection]
+            for _ in range(CubicBezier.bisection_iterations):
+                middle = (low + high) / 2
+                is_over = self.x(middle) > xb
+                high = np.where(is_over, middle, high)
+                low = np.where(is_over, low, middle)
+            t[bisection] = (low + high) / 2
+        return t
+
+    def __call__(self, start_value: float, end_value: float, current_time):
+        """
+        Easing function (current_time can be a number or an array)
+        """
+        if isinstance(current_time, np.ndarray):
+            current_time = np.clip(current_time, 0., 1.)
+            progress = current_time if self.is_linear else self.y(self.solve_t_array(current_time))
+        else:
+            current_time = min(max(current_time, 0.), 1.)
+            progress = current_time if self.is_linear else self.y(self.solve_t(current_time))
+        return start_value + (end_value - start_value) * progress
+
+    def register(self) -> int:
+        """
+        Easing id of the curve (for animations.timeline)
+        """
+        if self.easing_id is None:
+            self.easing_id = register_easing(self)
+        return self.easing_id
+
+
+@lru_cache(maxsize=64)
+def compile_cubic_bezier(x1: float, y1: float, x2: float, y2: float) -> CubicBezier:
+    """
+    Curve for control points (every set of points is compiled only once)
+    """
+    return CubicBezier(x1, y1, x2, y2)
+
+
 def cubic_bezier(start_value: float, end_value: float, current_time: float, p0: float, p1: float,
                  p2: float, p3: float) -> float:
-    NotImplementedError("Cubic Bezier animation is not implemented yet.")
+    """
+    Easing like CSS cubic-bezier(p0, p1, p2, p3)
+    :param p0: x of the first control point
+    :param p1: y of the first control point
+    :param p2: x of the second control point
+    :param p3: y of the second control point
+    """
+    return compile_cubic_bezier(p0, p1, p2, p3)(start_value, end_value, current_time)
 
 
 if __name__ == "__main__":
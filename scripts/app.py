@@ -1,31 +1,33 @@
-import ctypes
+import atexit
 import math
-import sys
-import moderngl
+import os
 import pygame
-import array
 
 import scripts.settings as s
 from scripts.field import Field
+from scripts.frame_scheduler import FrameScheduler, MODE
+from scripts.functionality.input_record import InputRecorder, InputReplay
+from scripts.functionality.platform_info import PLATFORM_CHANGED, PLATFORM_INFO, PlatformInfo
+from scripts.functionality.profiler import PROFILER, STAGE, Profiler
+from scripts.functionality.weather_api import WEATHER_CLIENT
+from scripts.graphics.damage import Damage
+from scripts.graphics.frame_snapshot import FrameSnapshot
+from scripts.graphics.kernels import gaussian_weights, scaled_size
+from scripts.graphics.software_compositor import CPUBlur, SoftwareCompositor
+from scripts.UI.profiler_overlay import ProfilerOverlay
 from scripts.UI.text import Text
 
 
-class RECT(ctypes.Structure):
-    """
-    This class made for storing the position of the window on the screen
-    """
-    _fields_ = [
-        ('left', ctypes.c_long),
-        ('top', ctypes.c_long),
-        ('right', ctypes.c_long),
-        ('bottom', ctypes.c_long)
-    ]
-
-
 class App:
     """
     This is the main class of the program.
     """
+    # Background blur: 7 samples with 2 pixels step in every direction (strength is split between two passes)
+    background_blur_weights: list[float] = gaussian_weights(4, 1.875, math.sqrt(s.BACKGROUND_BLUR_STRENGTH))
+    background_blur_offset: tuple[float, float] = (2 / s.SIZE[0], 2 / s.SIZE[1])
+    # Shadow: 9 samples with 0.006 step in every direction
+    shadow_blur_offset: tuple[float, float] = (0.006, 0.006)
+    shadow_gain: float = 4 * sum(s.SHADOW_BLUR_WEIGHTS)  # Sum of the old cross blur weights
 
     def __init__(self) -> None:
         # Initialize pygame and settings
@@ -34,13 +36,18 @@ class App:
         self.size = self.width, self.height = s.SIZE  # Screen size
         self.name: str = s.NAME  # App name
         self.colors: dict = s.COLORS  # App colors
-        self.fps: int = s.FPS  # FPS counter
+        self.fps: int = s.FPS  # Frame rate while something is animated
 
-        # Set pygame window
+        # Set pygame window (it shows the last frame of the previous start while everything else is prepared)
         pygame.display.set_caption(self.name)
+        self.snapshot: FrameSnapshot = FrameSnapshot(s.FRAME_SNAPSHOT_PATH, self.size)
+        self.is_snapshot_stale: bool = False  # Was a new frame shown after the last saved snapshot?
+        self.screen: pygame.Surface = self.create_window()
+        self.show_snapshot()
 
-        # Set pygame clock
+        # Set pygame clock and frame scheduler (how long to wait between frames)
         self.clock: pygame.time.Clock = pygame.time.Clock()
+        self.scheduler: FrameScheduler = FrameScheduler(self.clock, self.fps, s.IDLE_FPS)
 
         # Set input variables
         self.dt: int = 0  # Delta time (diff between two frames)
@@ -53,13 +60,56 @@ class App:
         self.mouse_outside: bool = False  # Does mouse outside app?
         self.mouse_outside_time: int = 0  # How long mouse outside app?
 
-        self.show_fps: bool = False  # Does fps visible in app?
+        self.show_fps: bool = False  # Does fps (profiler overlay) visible in app?
+
+        # Input of every frame is written to the file or read from it (see scripts/functionality/input_record.py)
+        self.recorder: InputRecorder | None = None
+        if s.INPUT_RECORD_PATH:
+            self.recorder = InputRecorder(s.INPUT_RECORD_PATH, self.size)
+            atexit.register(self.recorder.close)  # Buffered frames are written when the app is closed
+        self.replay: InputReplay | None = None  # Recorded input which replaces the real one (see start_replay)
+
+        # Time of every frame stage (overlay replaces the fps counter)
+        self.profiler: Profiler = PROFILER
+        self.overlay: ProfilerOverlay = ProfilerOverlay(self.profiler, (4, 4), self.fps)
+
+        self.is_frame_changed: bool = True  # Does the frame need to be rendered and shown?
+
+        # Cached platform queries (display size, wallpaper path, window position)
+        self.platform: PlatformInfo = PLATFORM_INFO
+        self.platform.start_polling(s.PLATFORM_POLL_INTERVAL)
+
+        # Power mode: frame rates and render scale of blurred layers (see power_preset)
+        self.power_mode: str = s.POWER_MODE  # "normal", "low" or "auto" (low power on battery)
+        self.is_low_power: bool = self.wants_low_power()
+        fps, idle_fps, self.render_scale = self.power_preset()
+        self.set_frame_rates(fps, idle_fps)
 
         self.field: Field = Field()  # Main app playground
+        self.scheduler.add_timer("weather", s.WEATHER_REFRESH_INTERVAL, self.field.refresh_weather)
+        if self.field.shared_wallpaper is not None:  # Launcher changes wallpaper of all instances
+            self.scheduler.add_timer("wallpaper", s.SHARED_WALLPAPER_POLL_INTERVAL, self.field.poll_shared_wallpaper)
+        elif s.WALLPAPER_FILE_POLL_INTERVAL > 0:  # Changed file is loaded again in background
+            self.scheduler.add_timer("wallpaper", s.WALLPAPER_FILE_POLL_INTERVAL, self.field.check_wallpaper_file)
+        if s.FRAME_SNAPSHOT_PATH and s.FRAME_SNAPSHOT_INTERVAL > 0:
+            self.scheduler.add_timer("snapshot", s.FRAME_SNAPSHOT_INTERVAL, self.save_snapshot)
+
+    def start_replay(self, replay: InputReplay) -> None:
+        """
+        Use recorded input instead of the real one (frames do not wait, every frame uses the recorded delta time)
+        """
+        self.replay = replay
 
     def input(self) -> None:
-        # Get mouse position
-        self.mouse_pos = pygame.mouse.get_pos()
+        # Get mouse position (and events and delta time of the recorded frame)
+        frame = self.replay.next_frame() if self.replay is not None else None
+        if frame is not None:
+            self.dt = frame.dt
+            self.mouse_pos = frame.mouse_pos
+            for event in frame.events:
+                pygame.event.post(event)
+        else:
+            self.mouse_pos = pygame.mouse.get_pos()
         self.mouse_pos_ratio = (self.mouse_pos[0] / self.width, self.mouse_pos[1] / self.height)
         if self.mouse_pos_ratio[0] <= 0 or self.mouse_pos_ratio[0] >= 0.997 or \
                 self.mouse_pos_ratio[1] <= 0 or self.mouse_pos_ratio[1] >= 0.992:  # If cursor so close to border
@@ -68,9 +118,21 @@ class App:
             self.mouse_outside = False
             self.mouse_outside_time = 0
 
-        for event in pygame.event.get():  # Get all events
+        events = pygame.event.get()  # Get all events
+        if self.recorder is not None:
+            self.recorder.record(self.dt, self.mouse_pos, events)
+
+        for event in events:
+            self.platform.handle_event(event)  # Window moving, display changing
+
+            if event.type == PLATFORM_CHANGED:  # Display, wallpaper or power source was changed
+                if 'display' in event.changed or 'wallpaper' in event.changed:
+                    self.field.update_wallpaper()
+                if 'power' in event.changed:
+                    self.update_power_mode()
+
             if event.type == pygame.QUIT:  # If you want to close the program...
-                close()  # Closing...
+                self.close()  # Closing...
 
             if event.type == pygame.MOUSEBUTTONDOWN:  # If mouse button down...
                 if event.button == 1:  # left click
@@ -88,14 +150,107 @@ class App:
 
             if event.type == pygame.KEYDOWN:  # If key button down...
                 if event.key == pygame.K_SPACE:  # [Space]
-                    close()  # Closing...
+                    self.close()  # Closing...
                 if event.key == pygame.K_f:  # [F]
                     self.show_fps = not self.show_fps  # Switch fps shower
+                if event.key == pygame.K_t:  # [T]
+                    self.profiler.dump_trace()  # Save last frames for offline analysis
+                if event.key == pygame.K_p:  # [P]
+                    modes = ["auto", "low", "normal"]  # Switch power mode
+                    self.power_mode = modes[(modes.index(self.power_mode) + 1) % len(modes)] \
+                        if self.power_mode in modes else "auto"
+                    self.update_power_mode()
 
         self.keys = pygame.key.get_pressed()  # Get all keys (pressed or not)
         if self.keys[pygame.K_LEFT] or self.keys[pygame.K_a]:  # If left arrow or 'a' is pressed...
             NotImplementedError("This button is not implemented yet")
 
+    def close(self) -> None:
+        """
+        Save the shown frame, write queued forecasts and close the program
+        """
+        self.save_snapshot()
+        if self.field.forecast_store is not None:
+            self.field.forecast_store.close()  # Writer thread is daemon, queued records are lost without it
+        close()
+
+    def create_window(self) -> pygame.Surface:
+        return pygame.display.set_mode(self.size, pygame.NOFRAME)
+
+    def present_frame(self, frame: pygame.Surface) -> None:
+        """
+        Show the whole frame on the screen (it is used before the render pipeline is ready)
+        """
+        self.screen.blit(frame, (0, 0))
+        pygame.display.flip()
+
+    def read_frame(self) -> pygame.Surface | None:
+        """
+        Frame which is shown on the screen now
+        """
+        return self.screen
+
+    def show_snapshot(self) -> bool:
+        """
+        Show the frame of the last start (the first rendered frame replaces it)
+        :return: was it shown?
+        """
+        frame = self.snapshot.load()
+        if frame is None:
+            return False
+        self.present_frame(frame)
+        return True
+
+    def save_snapshot(self) -> None:
+        """
+        Save the shown frame for the next start (only if it was changed after the last save)
+        """
+        if not self.is_snapshot_stale:
+            return
+        frame = self.read_frame()
+        if frame is not None and self.snapshot.save(frame):
+            self.is_snapshot_stale = False
+
+    def wants_low_power(self) -> bool:
+        if self.power_mode == "auto":
+            return self.platform.on_battery
+        return self.power_mode == "low"
+
+    def power_preset(self) -> tuple[int, int, float]:
+        """
+        Settings of the current power mode
+        :return: frame rate (active and idle) and render scale of blurred layers
+        """
+        if self.is_low_power:
+            return s.LOW_POWER_FPS, s.LOW_POWER_IDLE_FPS, min(max(s.LOW_POWER_RENDER_SCALE, 0.1), 1.)
+        return s.FPS, s.IDLE_FPS, min(max(s.RENDER_SCALE, 0.1), 1.)
+
+    def set_frame_rates(self, fps: int, idle_fps: int) -> None:
+        self.fps = fps
+        self.scheduler.active_fps = fps
+        self.scheduler.idle_fps = idle_fps
+        self.overlay.frame_budget = 1000 / fps if fps else 1000 / 60
+
+    def update_power_mode(self) -> None:
+        """
+        Apply the power mode again (power mode or power source was changed)
+        """
+        is_low_power = self.wants_low_power()
+        if is_low_power == self.is_low_power:
+            return
+        self.is_low_power = is_low_power
+        fps, idle_fps, render_scale = self.power_preset()
+        self.set_frame_rates(fps, idle_fps)
+        if render_scale != self.render_scale:
+            self.render_scale = render_scale
+            self.set_render_scale(render_scale)
+
+    def set_render_scale(self, scale: float) -> None:
+        """
+        Render blurred layers at the new scale (see subclasses)
+        """
+        pass
+
     def physics(self) -> None:
         self.field.update(self.dt)  # Update playground
 
@@ -111,26 +266,10 @@ class App:
     def shaders(self) -> None:
         pass
 
-    def refresh(self) -> None:
-        self.dt = self.clock.tick(self.fps)  # Get delta time based on FPS
-
-    def update(self) -> None:
-        pass
-
-
-class AppWindows(App):
-    """
-    This class is for Windows users
-    """
-
-    def __init__(self) -> None:
-        super().__init__()
-
-        # Set moderngl context (all pygame surfaces)
-
-        # For all screens (not drawing)
-        self.screen: pygame.Surface = pygame.display.set_mode(self.size, pygame.OPENGL | pygame.DOUBLEBUF |
-                                                              pygame.NOFRAME)
+    def create_layers(self) -> None:
+        """
+        Create surfaces of all layers (they are composed by shaders) and their changed areas
+        """
         # For background (wallpaper)
         self.background_display: pygame.Surface = pygame.Surface(self.size, pygame.SRCALPHA)
         # For UI (widgets)
@@ -141,175 +280,190 @@ class AppWindows(App):
         self.buttons_display: pygame.Surface = pygame.Surface(self.size, pygame.SRCALPHA)
         # For invisible borders (ex. when widgets change)
         self.app_shadow_display: pygame.Surface = pygame.Surface(self.size, pygame.SRCALPHA)
-        # For second shader
-        self.ctx: moderngl.Context = moderngl.create_context()
-
-        self.frames: dict = {}  # All frames for shaders
-        self.screen_pos: tuple[int, int] = (0, 0)  # Position of the window on the screen
-
-        # Set shader variables
-        self.quad_buffer = self.ctx.buffer(array.array('f', [
-            # position (x, y)  # texture (u, v)
-            -1.0, 1.0, 0.0, 0.0,  # top left
-            1.0, 1.0, 1.0, 0.0,  # top right
-            -1.0, -1.0, 0.0, 1.0,  # bottom left
-            1.0, -1.0, 1.0, 1.0,  # bottom right
-        ]))
-
-        #  Load shaders (relative path)
-        vert_shader = open(f'{sys.path[0]}/scripts/shaders/vert_shader.glsl', 'r').read()
-        first_frag_shader = open(f'{sys.path[0]}/scripts/shaders/frag_shader.glsl', 'r').read()
-        second_frag_shader = open(f'{sys.path[0]}/scripts/shaders/second_frag_shader.glsl', 'r').read()
-
-        self.first_program = self.ctx.program(
-            vertex_shader=vert_shader,
-            fragment_shader=first_frag_shader
-        )
-        self.second_program = self.ctx.program(
-            vertex_shader=vert_shader,
-            fragment_shader=second_frag_shader
-        )
-        self.render_object = self.ctx.vertex_array(
-            self.first_program,
-            [(self.quad_buffer, '2f 2f', 'vert', 'texcoord')]
-        )
-
-    def screen_pos_in_windows(self):
-        """
-        This function returns the position of the window on the screen (WORK ONLY ON WINDOWS)
-        """
-        window = pygame.display.get_wm_info()['window']
-        rect = RECT()
-        ctypes.windll.user32.GetWindowRect(window, ctypes.byref(rect))
-        self.screen_pos = (x := rect.left, y := rect.top)
-
-    def surf_to_texture(self, surf: pygame.Surface) -> moderngl.Texture:
-        """
-        Convert pygame surface to moderngl texture
-        """
-        tex = self.ctx.texture(surf.get_size(), 4)
-        tex.filter = (moderngl.NEAREST, moderngl.NEAREST)
-        tex.swizzle = 'BGRA'
-        tex.write(surf.get_view('1'))
-        return tex
-
-    def input(self):
-        super().input()
-
-    def physics(self):
-        self.screen_pos_in_windows()
-        super().physics()
-
-    def rendering(self):
-        super().rendering()
+        # For profiler overlay (it is put on the composed frame without edge fade)
+        self.overlay_display: pygame.Surface = pygame.Surface(self.size, pygame.SRCALPHA)
+
+        # All frames for shaders (texture name: surface)
+        self.frames: dict[str, pygame.Surface] = {
+            'backgroundTex': self.background_display,
+            'uiTex': self.UI_display,
+            'buttonsTex': self.buttons_display,
+            'shadowTex': self.shadow_display,
+            'appShadowTex': self.app_shadow_display,
+            'overlayTex': self.overlay_display
+        }
 
-        self.background_display.fill(self.colors['background'])  # Fill background
-        self.UI_display.fill([0, 0, 0, 0])
-        self.buttons_display.fill([0, 0, 0, 0])
-        self.shadow_display.fill([0, 0, 0, 0])
-        self.app_shadow_display.fill([0, 0, 0, 0])
+        # Changed areas of all layers (everything is changed in the first frame)
+        self.damage: dict[str, Damage] = {key: Damage(self.size, is_full=True) for key in self.frames.keys()}
 
-        self.field.draw_wallpaper(self.background_display, self.screen_pos, self.is_windowless)
-        self.field.draw(self.UI_display, self.shadow_display)
-        self.field.button_draw(self.buttons_display)
+        self.screen_pos: tuple[int, int] = (0, 0)  # Position of the window on the screen
+        self.last_screen_state: tuple = ()  # Screen position and borders of the last drawn wallpaper
 
+        # Invisible borders never change, so they are drawn only once
         pygame.draw.line(self.app_shadow_display, [0, 0, 0], [self.width * 0.025, self.height * 0.96],
                          [self.width * 0.985, self.height * 0.96], 3)
         pygame.draw.line(self.app_shadow_display, [0, 0, 0], [self.width * 0.985, self.height * 0.96],
                          [self.width * 0.985, self.height * 0.065], 3)
 
-        if self.show_fps:
-            fps_text = f"FPS: {int(self.clock.get_fps())}"
-            Text(fps_text, [0, 0, 0], 20).print(self.UI_display, [self.width - 130, self.height - 21],
-                                                False)  # FPS counter
-
-    def shaders(self):
-        super().shaders()
-
-        self.frames = {
-            'backgroundTex': self.surf_to_texture(self.background_display),
-            'uiTex': self.surf_to_texture(self.UI_display),
-            'buttonsTex': self.surf_to_texture(self.buttons_display),
-            'shadowTex': self.surf_to_texture(self.shadow_display),
-            'appShadowTex': self.surf_to_texture(self.app_shadow_display)
-        }
-
-        # First shader
-        for i, (key, value) in enumerate(self.frames.items()):
-            value.use(i + 1)
-            self.first_program[key] = i + 1
-
-        self.first_program['backgroundColor'] = (
-            s.COLORS['background'][0] / 255,
-            s.COLORS['background'][1] / 255,
-            s.COLORS['background'][2] / 255
-        )
-        self.first_program['resolution'] = (self.width, self.height)
-        self.first_program['mousePos'] = self.mouse_pos_ratio
-        self.first_program['mouseOutsideTime'] = self.mouse_outside_time / 1000
-
-        self.render_object.render(moderngl.TRIANGLE_STRIP)
-
-        # Second shader (Not implemented yet)
-        self.frame2_tex1 = self.surf_to_texture(self.UI_display)
-        self.frame2_tex1.use(0)
-        self.second_program['uiTex'] = 0
-
-    def refresh(self):
-        pygame.display.flip()  # Update screen
-
-        for value in self.frames.values():  # Release all textures (if not, memory leak, computer lagging!!!)
-            value.release()
+    def screen_pos_in_windows(self) -> None:
+        """
+        This function returns the position of the window on the screen (asked once, then tracked by move events)
+        """
+        self.screen_pos = self.platform.window_pos
+        if (self.screen_pos, self.is_windowless) != self.last_screen_state:  # Window was moved
+            self.last_screen_state = (self.screen_pos, self.is_windowless)
+            self.field.damage['background'].add_all()
 
-        self.frame2_tex1.release()
+    def draw_layers(self) -> None:
+        """
+        Redraw changed areas of the layers (see create_layers)
+        """
+        # Collect changed areas from the field
+        self.damage['backgroundTex'].merge(self.field.damage['background'])
+        self.damage['uiTex'].merge(self.field.damage['widgets'])
+        self.damage['shadowTex'].merge(self.field.damage['widgets'])
+        self.damage['buttonsTex'].merge(self.field.damage['buttons'])
+        for damage in self.field.damage.values():
+            damage.clear()
+
+        if self.overlay.update(self.show_fps, self.clock.get_fps(), pygame.time.get_ticks()):
+            self.damage['overlayTex'].add(self.overlay.rect)
+
+        # Clear and redraw only changed areas (empty clip - nothing will be drawn)
+        for key, surf in self.frames.items():
+            rect = self.damage[key].rect
+            surf.set_clip(rect if rect is not None else pygame.Rect(0, 0, 0, 0))
+            if rect is not None:
+                surf.fill(self.colors['background'] if key == 'backgroundTex' else [0, 0, 0, 0], rect)
+
+        if self.damage['backgroundTex'].changed:
+            self.field.draw_wallpaper(self.background_display, self.screen_pos, self.is_windowless)
+        if self.damage['uiTex'].changed or self.damage['shadowTex'].changed:
+            self.field.draw(self.UI_display, self.shadow_display)
+        if self.damage['buttonsTex'].changed:
+            self.field.button_draw(self.buttons_display)
+
+        if self.damage['overlayTex'].changed:
+            self.overlay.draw(self.overlay_display)  # Profiler (fps counter)
+
+        for surf in self.frames.values():
+            surf.set_clip(None)
+
+    def frame_mode(self) -> int:
+        """
+        What the app is doing now (it decides frame rate of the next frame)
+        """
+        if self.field.is_animation_started() or \
+                (self.mouse_outside and self.mouse_outside_time < s.MOUSE_FADE_TIME):  # Buttons are fading
+            return MODE.ACTIVE
+        if not self.mouse_outside or self.left_click_pressed or self.show_fps:  # User can interact
+            return MODE.IDLE
+        return MODE.SLEEP
 
-        super().refresh()
+    def refresh(self) -> None:
+        if self.is_frame_changed:
+            self.is_snapshot_stale = True
+        if self.replay is not None:  # Delta time is recorded (see input)
+            return
+        with self.profiler.section(STAGE.WAIT):
+            self.dt = self.scheduler.wait(self.frame_mode())  # Get delta time based on frame mode
 
     def update(self) -> None:
-        """
-        Main update function of the program.
-        This function is called every frame
-        """
-        super().update()
-        self.input()
-        self.physics()
-        self.rendering()
-        self.shaders()
-        self.refresh()
+        pass
 
 
 class AppLinux(App):
     """
-    This class is for Linux (and potentially macOS) users
+    This class is for Linux (and potentially macOS) users (layers are composed on CPU, no GL is needed)
     """
 
     def __init__(self) -> None:
         super().__init__()
 
-        self.screen: pygame.Surface = pygame.display.set_mode(self.size, pygame.NOFRAME)
+        self.create_layers()
+
+        self.screen_damage: Damage = Damage(self.size, is_full=True)  # Changed area of the screen
+        self.shader_state: tuple = ()  # Compositor arguments of the last composed frame
+
+        # Software version of frag_shader.glsl (blurred layers are cached)
+        self.create_compositor()
+
+    def create_compositor(self) -> None:
+        """
+        Blurred layers are rendered at the render scale (compositor scales them up with linear filtering)
+        """
+        size = scaled_size(self.size, self.render_scale)
+        background_blur = CPUBlur(size, App.background_blur_weights, App.background_blur_offset)
+        shadow_blur = CPUBlur(size, s.SHADOW_BLUR_WEIGHTS, App.shadow_blur_offset)
+        # How far shadow blur spreads changes (in screen pixels, scaling spreads them by two pixels more)
+        margin = 2 if size != tuple(self.size) else 0
+        self.shadow_radius: tuple[int, int] = (math.ceil((shadow_blur.radius[0] + margin) * self.width / size[0]),
+                                               math.ceil((shadow_blur.radius[1] + margin) * self.height / size[1]))
+        self.compositor: SoftwareCompositor = SoftwareCompositor(self.size, self.colors['background'],
+                                                                 background_blur, shadow_blur, App.shadow_gain)
+
+    def set_render_scale(self, scale: float) -> None:
+        self.create_compositor()
+        for damage in self.damage.values():  # New compositor has no cached layers
+            damage.add_all()
 
     def input(self):
         super().input()
 
     def physics(self):
+        self.screen_pos_in_windows()
         super().physics()
 
     def rendering(self):
         super().rendering()
 
-        self.screen.fill(self.colors['background'])  # Fill background
-        self.field.draw(self.screen, self.screen)
-        self.field.button_draw(self.screen)
+        self.draw_layers()
+
+        # Changed areas of the screen (blurred layers change more than was drawn)
+        if self.damage['backgroundTex'].changed:
+            self.screen_damage.add_all()
+        if self.damage['shadowTex'].changed:
+            self.screen_damage.add(self.damage['shadowTex'].rect.inflate(self.shadow_radius[0] * 2,
+                                                                         self.shadow_radius[1] * 2))
+        for key in ('uiTex', 'buttonsTex', 'appShadowTex', 'overlayTex'):
+            self.screen_damage.merge(self.damage[key])
+
+        # Buttons fade depends on mouse (mouse outside time is clamped like in shader)
+        shader_state = (self.mouse_pos_ratio, min(max(self.mouse_outside_time / 1000, 1), 100))
+        if shader_state != self.shader_state:
+            for button in self.field.buttons:
+                self.screen_damage.add(button.get_rect())
+            self.shader_state = shader_state
 
-        if self.show_fps:
-            fps_text = f"FPS: {int(self.clock.get_fps())}" if self.clock.get_fps() != math.inf else "FPS: inf"
-            Text(fps_text, [0, 0, 0], 20).print(self.screen, [self.width - 70, self.height - 21], False)  # FPS counter
+        self.is_frame_changed = self.screen_damage.changed
 
     def shaders(self):
-        super().shaders()  # Shaders are not implemented on Linux
+        super().shaders()
+
+        if not self.is_frame_changed:  # Last frame is still on the screen
+            return
+
+        # Blur only changed layers (compositor keeps the last results)
+        if self.damage['backgroundTex'].changed:
+            self.compositor.set_background(self.background_display)
+        if self.damage['shadowTex'].changed:
+            self.compositor.set_shadow(self.shadow_display)
+        if self.damage['appShadowTex'].changed:
+            self.compositor.set_app_shadow(self.app_shadow_display)
+
+        self.compositor.compose(self.screen, self.UI_display, self.buttons_display,
+                                [button.get_rect() for button in self.field.buttons], self.mouse_pos_ratio,
+                                self.mouse_outside_time / 1000, self.screen_damage.rect)
+        # Overlay is put on the composed area (like the last mix in shader, it is not faded)
+        self.screen.blit(self.overlay_display, self.screen_damage.rect, self.screen_damage.rect)
+
+        for damage in self.damage.values():
+            damage.clear()
 
     def refresh(self):
-        pygame.display.update()
+        if self.is_frame_changed:
+            pygame.display.update(self.screen_damage.rect)  # Update only changed area
+            self.screen_damage.clear()
 
         super().refresh()
 
@@ -319,10 +473,27 @@ class AppLinux(App):
         This function is called every frame
         """
         super().update()
-        self.input()
-        self.physics()
-        self.rendering()
-        self.refresh()
+        with self.profiler.section(STAGE.INPUT):
+            self.input()
+        with self.profiler.section(STAGE.PHYSICS):
+            self.physics()
+        with self.profiler.section(STAGE.RENDERING):
+            self.rendering()
+        with self.profiler.section(STAGE.SHADERS):
+            self.shaders()
+        with self.profiler.section(STAGE.REFRESH):
+            self.refresh()
+        self.profiler.end_frame()
+
+
+def create_app() -> App:
+    """
+    App for the current operating system
+    """
+    if os.name == "nt":  # Windows
+        from scripts.app_windows import AppWindows  # GL modules are imported only by the GL app
+        return AppWindows()
+    return AppLinux()  # Linux (and potentially macOS)
 
 
 def close() -> None:
@@ -331,6 +502,8 @@ def close() -> None:
     :return:
     """
 
+    PLATFORM_INFO.stop_polling()
+    WEATHER_CLIENT.close()
     pygame.quit()
-    Text.FONTS = {}
+    Text.clear_cache()
     exit()
@@ -0,0 +1,123 @@
+import moderngl
+import pygame
+
+import scripts.settings as s
+from scripts.app import App
+from scripts.functionality.profiler import STAGE
+from scripts.graphics.gpu_resources import GpuResourceTracker
+from scripts.graphics.shader_pipeline import ShaderPipeline
+
+
+class AppWindows(App):
+    """
+    This class is for Windows users
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.create_layers()
+
+        self.shader_state: tuple = ()  # Shader uniforms of the last rendered frame
+
+        # Layers are composed by shaders (see scripts/graphics/shader_pipeline.py)
+        self.pipeline: ShaderPipeline = ShaderPipeline(
+            self.ctx, self.size, self.colors['background'], (App.background_blur_weights, App.background_blur_offset),
+            (s.SHADOW_BLUR_WEIGHTS, App.shadow_blur_offset), App.shadow_gain, self.render_scale
+        )
+        self.overlay.set_resources(self.gpu_resources)
+
+    def create_window(self) -> pygame.Surface:
+        # For all screens (not drawing)
+        screen = pygame.display.set_mode(self.size, pygame.OPENGL | pygame.DOUBLEBUF | pygame.NOFRAME)
+        # Set moderngl context (all pygame surfaces), GL objects are counted by the tracker which wraps it
+        self.gpu_resources: GpuResourceTracker = GpuResourceTracker(moderngl.create_context())
+        self.ctx: GpuResourceTracker = self.gpu_resources
+        return screen
+
+    def present_frame(self, frame: pygame.Surface) -> None:
+        # Frame is copied to the screen framebuffer (no shader is needed, so it works before programs are compiled)
+        texture = self.ctx.texture(self.size, 4, pygame.image.tobytes(frame, 'RGBA', True))
+        framebuffer = self.ctx.framebuffer(color_attachments=[texture])
+        self.ctx.copy_framebuffer(self.ctx.fbo, framebuffer)
+        pygame.display.flip()
+        framebuffer.release()
+        texture.release()
+
+    def read_frame(self) -> pygame.Surface | None:
+        # Shown frame is rendered again into the back buffer (it is not flipped) and read back
+        self.is_frame_changed = True
+        self.shaders()
+        return pygame.image.frombytes(self.ctx.fbo.read(self.size, 3), self.size, 'RGB', True)
+
+    def set_render_scale(self, scale: float) -> None:
+        self.pipeline.set_render_scale(scale)
+        self.gpu_resources.rebase()  # Blurs have a new size
+        for damage in self.damage.values():  # Layers are uploaded and blurred again (shadow is drawn with widgets)
+            damage.add_all()
+
+    def surf_to_texture(self, name: str, surf: pygame.Surface) -> moderngl.Texture:
+        """
+        Write pygame surface to the pooled moderngl texture (only if surface was changed)
+        """
+        with self.profiler.section(STAGE.SURF_TO_TEXTURE):
+            self.pipeline.texture_pool.upload(name, surf)
+        return self.pipeline.texture_pool.textures[name]
+
+    def input(self):
+        super().input()
+
+    def physics(self):
+        self.screen_pos_in_windows()
+        super().physics()
+
+    def rendering(self):
+        super().rendering()
+
+        self.draw_layers()
+
+        for key in self.frames.keys():
+            if self.damage[key].changed:
+                self.pipeline.mark_dirty(key, self.damage[key].rect)
+
+        # Shader result depends on layers and mouse (mouse outside time is clamped in shader)
+        shader_state = (self.mouse_pos_ratio, min(max(self.mouse_outside_time / 1000, 1), 100))
+        self.is_frame_changed = any(damage.changed for damage in self.damage.values()) or \
+            shader_state != self.shader_state
+        self.shader_state = shader_state
+
+        for damage in self.damage.values():
+            damage.clear()
+
+    def shaders(self):
+        super().shaders()
+
+        if not self.is_frame_changed:  # Last frame is still on the screen
+            return
+
+        self.pipeline.render(self.frames, self.mouse_pos_ratio, self.mouse_outside_time / 1000, self.surf_to_texture)
+
+    def refresh(self):
+        if self.is_frame_changed:
+            pygame.display.flip()  # Update screen (textures live in the pool, nothing to release)
+
+        super().refresh()
+
+    def update(self) -> None:
+        """
+        Main update function of the program.
+        This function is called every frame
+        """
+        super().update()
+        with self.profiler.section(STAGE.INPUT):
+            self.input()
+        with self.profiler.section(STAGE.PHYSICS):
+            self.physics()
+        with self.profiler.section(STAGE.RENDERING):
+            self.rendering()
+        with self.profiler.section(STAGE.SHADERS):
+            self.shaders()
+        with self.profiler.section(STAGE.REFRESH):
+            self.refresh()
+        self.profiler.end_frame()
+        self.gpu_resources.end_frame()
@@ -1,109 +1,169 @@
-import subprocess
+import atexit
+import sqlite3
+from typing import TYPE_CHECKING
 
 import pygame.draw
 
 from scripts import settings
+from scripts.animations.timeline import EASING, TIMELINE, Timeline, Track
+from scripts.functionality.forecast_store import ForecastStore
+from scripts.functionality.platform_info import CURRENT_OS, OS, PLATFORM_INFO
+from scripts.functionality.profiler import PROFILER, STAGE
+from scripts.functionality.weather_api import WEATHER_CLIENT
+from scripts.graphics.damage import Damage
+from scripts.graphics.wallpaper_cache import WallpaperCache
+from scripts.graphics.wallpaper_loader import WallpaperLoader
 from scripts.UI.side_buttons import SideButton
+from scripts.UI.spatial_grid import SpatialGrid
 from scripts.UI.text import Text
 from scripts.settings import SIZE
 
-import ctypes
-import os
+from scripts.widgets.carousel import WidgetCarousel, WidgetDescriptor
+from scripts.widgets.widget import ANIMATION, Widget
 
-from scripts.widgets.weather_widget import WeatherWidget
-from scripts.widgets.widget import ANIMATION
+if TYPE_CHECKING:
+    from scripts.graphics.shared_wallpaper import SharedWallpaper
 
 
 def get_wallpaper_path() -> str:
-    if os.name == "nt":  # If we are not on Windows, we can't get the path to the wallpaper
-        SPI_GETDESKWALLPAPER = 0x0073
-        buffer = ctypes.create_unicode_buffer(260)  # Maximum length of the path is 260 characters
-        ctypes.windll.user32.SystemParametersInfoW(SPI_GETDESKWALLPAPER, len(buffer), buffer, 0)
-        return buffer.value
-    elif os.name == "posix":  # macOS (eventually Linux)
-        try:
-            if subprocess.run(['uname'], capture_output=True, text=True).stdout.strip() == "Darwin":
-                script = """
-                    tell application "System Events"
-                        tell current desktop
-                            set wallpaperPath to picture as text
-                        end tell
-                    end tell
-                    """
-                result = subprocess.run(
-                    ['osascript', '-e', script],
-                    capture_output=True, text=True
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip().replace(":", "/").replace("Macintosh HD", "")
-        except Exception as e:
-            return f"Error retrieving wallpaper path on macOS: {e}"
-
-    return ""  # If the OS is neither Windows nor macOS or in case of an error
+    """
+    This function returns the path to the wallpaper (cached, see PlatformInfo)
+    """
+    return PLATFORM_INFO.wallpaper_path
 
 
 def get_display_size() -> tuple[int, int]:
     """
-    This function returns the size of the display (width, height)
+    This function returns the size of the display (width, height) (cached, see PlatformInfo)
     """
-    if os.name == "nt":  # Windows
-        return ctypes.windll.user32.GetSystemMetrics(0), ctypes.windll.user32.GetSystemMetrics(1)
-    elif os.name == "posix":  # macOS (eventually Linux)
-        try:
-            if subprocess.run(['uname'], capture_output=True, text=True).stdout.strip() == "Darwin":
-                import Quartz
-                main_monitor = Quartz.CGDisplayBounds(Quartz.CGMainDisplayID())
-                width = int(main_monitor.size.width)
-                height = int(main_monitor.size.height)
-                return width, height
-        except Exception as e:
-            raise Exception(f"Error retrieving display size on macOS: {e}")
-
-    return 0, 0  # If the OS is neither Windows nor macOS or in case of an error
+    return PLATFORM_INFO.display_size
 
 
 class Field:
 
-    def __init__(self) -> None:
-        self.wallpaper = None
+    def __init__(self, timeline: Timeline = TIMELINE) -> None:
+        self.timeline: Timeline = timeline  # All animations of the field
+        # Changed areas of the field layers (app reads and clears them every frame)
+        self.damage: dict[str, Damage] = {
+            'background': Damage(SIZE, is_full=True),  # Wallpaper
+            'widgets': Damage(SIZE, is_full=True),  # Widgets and their shadows
+            'buttons': Damage(SIZE, is_full=True)  # Side buttons
+        }
+
+        self.wallpaper = None  # Wallpaper prescaled to the display size
+        self.display_size: tuple[int, int] = (0, 0)
+        self.wallpaper_cache: WallpaperCache = WallpaperCache(SIZE, settings.WALLPAPER_CACHE_SIZE)
+        self.wallpaper_loader: WallpaperLoader = WallpaperLoader(SIZE)  # Wallpaper is decoded in background
+        self.drawn_wallpaper: pygame.Surface | None = None  # Last drawn crop of the wallpaper
+        self.fade_from: pygame.Surface | None = None  # Crop of the old wallpaper (new one fades in over it)
+        self.fade_track: Track = self.timeline.track(1)  # How much the new wallpaper is visible
+        # Wallpaper decoded by the launcher (every instance maps the same pixels, see scripts/launcher.py)
+        self.shared_wallpaper: SharedWallpaper | None = None
+        if settings.SHARED_WALLPAPER_NAME:
+            from scripts.graphics.shared_wallpaper import SharedWallpaper  # Shared memory is used only by launcher
+            self.shared_wallpaper = SharedWallpaper(settings.SHARED_WALLPAPER_NAME)
+            atexit.register(self.close_shared_wallpaper)  # Mapped pixels are released before memory is closed
         self.update_wallpaper()
 
-        self.left_button = SideButton(0, 60, 20, (SIZE[0] * 0.05, SIZE[1] // 2))
+        self.left_button = SideButton(0, 60, 20, (SIZE[0] * 0.05, SIZE[1] // 2), self.timeline)
         self.left_button.create(60)
-        self.right_button = SideButton(180, 60, 20, (SIZE[0] * 0.95, SIZE[1] // 2))
+        self.right_button = SideButton(180, 60, 20, (SIZE[0] * 0.95, SIZE[1] // 2), self.timeline)
         self.right_button.create(60)
-        self.bottom_button = SideButton(90, 80, 30, (SIZE[0] // 2, SIZE[1] * 0.85))
+        self.bottom_button = SideButton(90, 80, 30, (SIZE[0] // 2, SIZE[1] * 0.85), self.timeline)
         self.bottom_button.create(80)
 
-        self.widgets = [WeatherWidget("Weather", [0, 0]), WeatherWidget("Weather", [500, 0])]
-        self.active_widget = 0
-
-    def update_wallpaper(self) -> None:
-        if os.name == "nt":
-            self.wallpaper = pygame.image.load(get_wallpaper_path())
-
-    def draw_wallpaper(self, screen: pygame.Surface, screen_pos: tuple[int, int], is_windowless: bool) -> None:
-        display_size = get_display_size()
-        wallpaper_width, wallpaper_height = self.wallpaper.get_size()
-        window_width, window_height = settings.SIZE
+        self.buttons = [self.left_button, self.right_button, self.bottom_button]
+        self.button_actions: dict[SideButton, callable] = {  # What buttons do after click
+            self.left_button: lambda: self.change_widget(is_left=True),
+            self.right_button: lambda: self.change_widget(is_left=False),
+            self.bottom_button: lambda: None
+        }
+        self.pressed_buttons: list[SideButton] = []  # Buttons which wait for mouse up
 
-        pos_x = screen_pos[0] * wallpaper_width / display_size[0]
-        pos_y = screen_pos[1] * wallpaper_height / display_size[1]
+        # Buttons and widgets are found by position with the grid (not by testing all of them)
+        self.grid: SpatialGrid = SpatialGrid(settings.HIT_GRID_CELL_SIZE)
+        for button in self.buttons:
+            self.grid.insert(button, button.get_rect())
 
-        wallpaper_width = wallpaper_width * window_width / display_size[0]
-        wallpaper_height = wallpaper_height * window_height / display_size[1]
+        # Last known weather is shown in the first frame, new weather is saved in background
+        try:
+            self.forecast_store: ForecastStore | None = ForecastStore()
+            for snapshot in self.forecast_store.load_latest(settings.WEATHER_LOCATIONS).values():
+                WEATHER_CLIENT.set_snapshot(snapshot)
+            WEATHER_CLIENT.listeners.append(self.forecast_store.save)
+        except (sqlite3.Error, OSError):  # Widget works without store
+            self.forecast_store = None
+
+        # Widgets are created when they are shown (only visible widgets cost something)
+        descriptors = [WidgetDescriptor("Weather", location) for location in settings.WEATHER_LOCATIONS]
+        self.widgets = WidgetCarousel(descriptors, settings.WIDGET_CACHE_SIZE, self.timeline)
+        self.active_widget = 0
+        self.grid.insert(self.widgets[self.active_widget], self.widgets[self.active_widget].get_rect())
+        self.refresh_weather()
 
-        if not is_windowless:
-            pos_y += 30 * wallpaper_height / window_height
-            pos_x += 10 * wallpaper_width / window_width
+    def update_wallpaper(self) -> None:
+        """
+        Load the wallpaper again (it returns immediately, the old wallpaper is shown until the new one is decoded)
+        """
+        if self.shared_wallpaper is not None:
+            self.poll_shared_wallpaper()
+            return
+        if CURRENT_OS == OS.WINDOWS:
+            self.display_size = get_display_size()
+            self.wallpaper_loader.load(get_wallpaper_path(), self.display_size)
+
+    def check_wallpaper_file(self) -> None:
+        """
+        Load the wallpaper again if its file was changed (path, modification time or size)
+        """
+        if self.shared_wallpaper is None and CURRENT_OS == OS.WINDOWS and \
+                self.wallpaper_loader.is_file_changed(get_wallpaper_path()):
+            self.update_wallpaper()
+
+    def show_wallpaper(self) -> None:
+        """
+        New wallpaper was set to the cache, it fades in over the old one
+        """
+        self.wallpaper = self.wallpaper_cache.image
+        self.fade_from = self.drawn_wallpaper
+        if self.fade_from is not None:
+            self.fade_track.animate(0, 1, settings.WALLPAPER_FADE_DURATION, EASING.EASE_IN_OUT)
+        self.damage['background'].add_all()
+
+    def poll_shared_wallpaper(self) -> None:
+        """
+        Take the new wallpaper of the launcher (it is already stretched over the display, so it is not decoded
+         or scaled here)
+        """
+        if self.shared_wallpaper.poll():
+            self.display_size = self.shared_wallpaper.image.get_size()
+            self.wallpaper_cache.set_wallpaper(self.shared_wallpaper.image, self.display_size)
+            self.show_wallpaper()
+
+    def close_shared_wallpaper(self) -> None:
+        """
+        Forget surfaces which use pixels of the launcher and close the shared memory
+        """
+        self.wallpaper = None
+        self.wallpaper_cache.image = None
+        self.drawn_wallpaper = self.fade_from = None
+        self.shared_wallpaper.close()
 
-        try:
-            wallpaper = self.wallpaper.subsurface(pygame.Rect(pos_x, pos_y, wallpaper_width, wallpaper_height))
-            wallpaper = pygame.transform.scale(wallpaper, [window_width, window_height])
-        except ValueError:
-            wallpaper = pygame.transform.scale(self.wallpaper, [window_width, window_height])
+    def refresh_weather(self) -> None:
+        """
+        Request new weather for all widgets (it does not wait for the answer)
+        """
+        WEATHER_CLIENT.refresh(settings.WEATHER_LOCATIONS)
 
-        screen.blit(wallpaper, [0, 0])  # Draw wallpaper on screen
+    def draw_wallpaper(self, screen: pygame.Surface, screen_pos: tuple[int, int], is_windowless: bool) -> None:
+        with PROFILER.section(STAGE.DRAW_WALLPAPER):
+            wallpaper = self.wallpaper_cache.get(screen_pos, is_windowless)  # Crop is made only once for every position
+            if wallpaper is not None:
+                screen.blit(wallpaper, [0, 0])  # Draw wallpaper on screen
+                self.drawn_wallpaper = wallpaper
+            if self.fade_from is not None:  # Old wallpaper disappears (crop is not in the cache, alpha can be changed)
+                self.fade_from.set_alpha(round((1 - self.fade_track.value) * 255))
+                screen.blit(self.fade_from, [0, 0])
 
     def change_widget(self, is_left: bool) -> None:
         if is_left:
@@ -118,28 +178,64 @@ class Field:
         self.active_widget = next_widget
 
     def draw(self, screen: pygame.Surface, shadow_screen: pygame.Surface) -> None:
-        for widget in self.widgets:
-            widget.draw(screen, shadow_screen)
+        for item in self.grid.query_rect(screen.get_clip()):  # Only this area is redrawn
+            if isinstance(item, Widget):
+                item.draw(screen, shadow_screen)
 
     def button_draw(self, screen: pygame.Surface) -> None:
-        self.left_button.draw(screen, [255, 255, 255])
-        self.right_button.draw(screen, [255, 255, 255])
-        self.bottom_button.draw(screen, [255, 255, 255])
+        for item in self.grid.query_rect(screen.get_clip()):
+            if isinstance(item, SideButton):
+                item.draw(screen, [255, 255, 255])
 
     def update(self, dt) -> None:
-        self.left_button.update(dt)
-        self.right_button.update(dt)
-        self.bottom_button.update(dt)
-
-        for widget in self.widgets:
+        self.timeline.update(dt)  # All animations at once
+
+        loaded = self.wallpaper_loader.take()
+        if loaded is not None:  # Decoded wallpaper replaces the old one (between frames, so it is never half-drawn)
+            self.wallpaper_cache.set_prescaled(loaded.image, loaded.fallback)
+            self.show_wallpaper()
+        if self.fade_from is not None:
+            self.damage['background'].add_all()
+            if not self.fade_track.is_animated:  # Last frame of the fade shows only the new wallpaper
+                self.fade_from = None
+
+        for button in self.buttons:
+            button.update(dt)
+            if button.damage.changed:  # Button was changed, so its area in the grid too
+                self.grid.update(button, button.get_rect())
+                self.damage['buttons'].merge(button.damage)
+                button.damage.clear()
+
+        for widget in self.widgets.visible():  # Off-screen widgets are not updated
             widget.update(dt)
+            if widget.damage.changed:
+                self.grid.insert(widget, widget.get_rect())
+                self.damage['widgets'].merge(widget.damage)
+                widget.damage.clear()
+        for widget in self.widgets.trim():  # Released widgets are created again when they are shown
+            self.grid.remove(widget)
+
+    def is_animation_started(self) -> bool:
+        """
+        Is any widget, button or wallpaper animated now?
+        """
+        return self.fade_track.is_animated or any(button.is_animation_started for button in self.buttons) or \
+            any(widget.is_animation_started for widget in self.widgets.created())
+
+    def items_at(self, mouse_pos) -> list:
+        """
+        Buttons and widgets under the mouse
+        """
+        return self.grid.query_point(mouse_pos)
 
     def click_down(self, mouse_pos) -> None:
-        self.left_button.click_down(mouse_pos)
-        self.right_button.click_down(mouse_pos)
-        self.bottom_button.click_down(mouse_pos)
+        for item in self.items_at(mouse_pos):
+            if isinstance(item, SideButton):
+                item.click_down(mouse_pos)
+                if item.is_clicked and item not in self.pressed_buttons:
+                    self.pressed_buttons.append(item)
 
     def click_up(self, mouse_pos) -> None:
-        self.left_button.click_up(mouse_pos, lambda: self.change_widget(is_left=True))
-        self.right_button.click_up(mouse_pos, lambda: self.change_widget(is_left=False))
-        self.bottom_button.click_up(mouse_pos, lambda: None)
+        for button in self.pressed_buttons:  # Released buttons (mouse can be outside them now)
+            button.click_up(mouse_pos, self.button_actions.get(button))
+        self.pressed_buttons = []
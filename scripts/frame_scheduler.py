@@ -0,0 +1,130 @@
+from collections import deque
+
+import pygame
+
+
+class MODE:  # Enum for frame modes
+    ACTIVE = 0  # Something is animated (high frame rate)
+    IDLE = 1  # User can interact with the app (low frame rate, events wake up earlier)
+    SLEEP = 2  # Nothing is changed (wait for events or timers only)
+
+
+class WAKE:  # Enum for wake-up reasons
+    FRAME = "frame"  # Deadline of the active frame
+    IDLE = "idle"  # Deadline of the idle frame
+    EVENT = "event"  # Pygame event
+    TIMER = "timer"  # Timer (ex. data refresh)
+
+
+class FrameScheduler:
+    """
+    This class decides how long the app waits between two frames.
+    It keeps a history of the frames (deadline and wake-up reason) to check how much the app works.
+    """
+
+    def __init__(self, clock: pygame.time.Clock, active_fps: int, idle_fps: int, history_size: int = 300) -> None:
+        self.clock: pygame.time.Clock = clock
+        self.active_fps: int = active_fps  # Frame rate in active mode (0 - unlimited)
+        self.idle_fps: int = idle_fps  # Frame rate in idle mode
+
+        self.timers: dict[str, list] = {}  # All timers (name: [interval, next time, callback])
+        self.last_frame_time: int = pygame.time.get_ticks()  # When the last frame was started (in ms)
+        self.mode: int = MODE.ACTIVE  # Mode of the last frame
+        self.deadline: int | None = None  # Deadline of the last frame (None - no deadline)
+        self.wake_reason: str = WAKE.FRAME  # Why the last frame was started
+        # Last frames (start time, mode, deadline, wake-up reason, delta time)
+        self.history: deque[tuple[int, int, int | None, str, int]] = deque(maxlen=history_size)
+
+    @staticmethod
+    def frame_time(fps: int) -> int:
+        """
+        Minimal time of one frame (in ms)
+        """
+        return 1000 // fps if fps > 0 else 0
+
+    def add_timer(self, name: str, interval: int, callback: callable = None) -> None:
+        """
+        Add timer which wakes up the app (even in sleep mode)
+        :param name: timer name (it is used as a wake-up reason)
+        :param interval: time between two calls (in ms)
+        :param callback: function which is called in the main loop
+        """
+        self.timers[name] = [interval, pygame.time.get_ticks() + interval, callback]
+
+    def remove_timer(self, name: str) -> None:
+        self.timers.pop(name, None)
+
+    def next_timer_time(self) -> int | None:
+        if not self.timers:
+            return None
+        return min(timer[1] for timer in self.timers.values())
+
+    def run_timers(self) -> list[str]:
+        """
+        Call all timers which time has come
+        :return: names of the called timers
+        """
+        now = pygame.time.get_ticks()
+        called = []
+        for name, timer in list(self.timers.items()):
+            if timer[1] <= now:
+                timer[1] = now + timer[0]
+                called.append(name)
+                if timer[2] is not None:
+                    timer[2]()
+        return called
+
+    def wait(self, mode: int) -> int:
+        """
+        Wait for the next frame
+        :param mode: what the app is doing now (see MODE)
+        :return: delta time (diff between two frames in ms)
+        """
+        min_deadline = self.last_frame_time + self.frame_time(self.active_fps)  # Never faster than active mode
+        if mode == MODE.ACTIVE:
+            deadline = min_deadline
+        elif mode == MODE.IDLE:
+            deadline = self.last_frame_time + self.frame_time(self.idle_fps)
+        else:
+            deadline = None
+
+        timer_time = self.next_timer_time()
+        if timer_time is not None:
+            deadline = timer_time if deadline is None else min(deadline, timer_time)
+
+        now = pygame.time.get_ticks()
+        if now < min_deadline:
+            pygame.time.wait(min_deadline - now)
+
+        reason = WAKE.FRAME if mode == MODE.ACTIVE else WAKE.IDLE
+        if mode != MODE.ACTIVE:
+            now = pygame.time.get_ticks()
+            if deadline is None or deadline > now:
+                # Sleep until event comes (timeout 0 means no timeout)
+                event = pygame.event.wait(deadline - now if deadline is not None else 0)
+                if event.type != pygame.NOEVENT:
+                    reason = f"{WAKE.EVENT}:{pygame.event.event_name(event.type)}"
+                    # Return event back to the queue (input will read it in the right order)
+                    for event in [event] + pygame.event.get():
+                        pygame.event.post(event)
+
+        called = self.run_timers()
+        if called and not reason.startswith(WAKE.EVENT):
+            reason = f"{WAKE.TIMER}:{','.join(called)}"
+
+        dt = self.clock.tick()  # Time since the last frame (without limit, limit is above)
+        self.last_frame_time = pygame.time.get_ticks()
+        self.mode = mode
+        self.deadline = deadline
+        self.wake_reason = reason
+        self.history.append((self.last_frame_time, mode, deadline, reason, dt))
+        return dt
+
+    def stats(self) -> dict[str, int]:
+        """
+        How many frames were started for every wake-up reason (from history)
+        """
+        result: dict[str, int] = {}
+        for frame in self.history:
+            result[frame[3]] = result.get(frame[3], 0) + 1
+        return result
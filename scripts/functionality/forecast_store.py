@@ -0,0 +1,145 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from scripts import settings
+from scripts.functionality.weather_api import WeatherSnapshot
+
+SCHEMA_VERSION = 1  # Version of the tables (store is created again if it is different)
+RECORD_VERSION = 1  # Version of one record (records with unknown version are skipped)
+
+
+class ForecastStore:
+    """
+    This class keeps the last known weather on the disk (SQLite), so the first frame shows data immediately.
+    Reading is done once at startup, writing is done in the background thread after every fetch.
+    """
+
+    def __init__(self, path: str = settings.FORECAST_STORE_PATH, retention: int = settings.FORECAST_STORE_RETENTION,
+                 max_age: float = settings.FORECAST_STORE_MAX_AGE) -> None:
+        self.path: str = path
+        self.retention: int = retention  # How many records are kept for one location
+        self.max_age: float = max_age  # Older records are removed (in seconds)
+
+        self.queue: queue.Queue = queue.Queue()  # Snapshots which wait for writing (None - stop writer)
+        self.writer: threading.Thread | None = None  # Writer is started on the first save
+        self.lock: threading.Lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = self.connect()
+        self.create_tables(connection)
+        connection.close()
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")  # Reader never waits for writer
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @staticmethod
+    def create_tables(connection: sqlite3.Connection) -> None:
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            connection.execute("DROP TABLE IF EXISTS forecasts")  # Old data is only a cache, so it can be lost
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS forecasts (
+                location TEXT NOT NULL,
+                time REAL NOT NULL,
+                version INTEGER NOT NULL,
+                temperature REAL NOT NULL,
+                description TEXT NOT NULL,
+                icon TEXT NOT NULL,
+                PRIMARY KEY (location, time)
+            ) WITHOUT ROWID
+        """)
+        connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        connection.commit()
+
+    def load_latest(self, locations: list[str]) -> dict[str, WeatherSnapshot]:
+        """
+        Read the last known weather of every location (it is called once at startup)
+        """
+        connection = self.connect()
+        snapshots = {}
+        try:
+            for location in locations:
+                row = connection.execute(
+                    "SELECT time, temperature, description, icon FROM forecasts "
+                    "WHERE location = ? AND version = ? ORDER BY time DESC LIMIT 1",
+                    (location, RECORD_VERSION)
+                ).fetchone()
+                if row is not None:
+                    snapshots[location] = WeatherSnapshot(location, row[1], row[2], row[3], row[0])
+        finally:
+            connection.close()
+        return snapshots
+
+    def history(self, location: str) -> list[WeatherSnapshot]:
+        """
+        All stored records of the location (from old to new)
+        """
+        connection = self.connect()
+        try:
+            rows = connection.execute(
+                "SELECT time, temperature, description, icon FROM forecasts "
+                "WHERE location = ? AND version = ? ORDER BY time",
+                (location, RECORD_VERSION)
+            ).fetchall()
+        finally:
+            connection.close()
+        return [WeatherSnapshot(location, row[1], row[2], row[3], row[0]) for row in rows]
+
+    def save(self, snapshot: WeatherSnapshot) -> None:
+        """
+        Write snapshot in the background (it returns immediately)
+        """
+        with self.lock:
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_loop, name="forecast-store", daemon=True)
+                self.writer.start()
+        self.queue.put(snapshot)
+
+    def write_loop(self) -> None:
+        connection = self.connect()
+        try:
+            while True:
+                snapshot = self.queue.get()
+                if snapshot is None:
+                    break
+                snapshots = [snapshot]
+                while not self.queue.empty():  # Write everything what came in one transaction
+                    snapshot = self.queue.get()
+                    if snapshot is None:
+                        self.write(connection, snapshots)
+                        return
+                    snapshots.append(snapshot)
+                self.write(connection, snapshots)
+        finally:
+            connection.close()
+
+    def write(self, connection: sqlite3.Connection, snapshots: list[WeatherSnapshot]) -> None:
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO forecasts VALUES (?, ?, ?, ?, ?, ?)",
+                [(snapshot.location, snapshot.received_time, RECORD_VERSION, snapshot.temperature,
+                  snapshot.description, snapshot.icon) for snapshot in snapshots]
+            )
+            # Bounded retention (old records and too many records are removed)
+            connection.execute("DELETE FROM forecasts WHERE time < ?", (time.time() - self.max_age,))
+            for location in {snapshot.location for snapshot in snapshots}:
+                connection.execute(
+                    "DELETE FROM forecasts WHERE location = ? AND time NOT IN "
+                    "(SELECT time FROM forecasts WHERE location = ? ORDER BY time DESC LIMIT ?)",
+                    (location, location, self.retention)
+                )
+
+    def close(self) -> None:
+        """
+        Stop writer (everything what was saved before is written)
+        """
+        with self.lock:
+            if self.writer is not None:
+                self.queue.put(None)
+                self.writer.join()
+                self.writer = None
@@ -0,0 +1,110 @@
+import gzip
+import json
+
+import pygame
+
+# User input which is recorded (events made by the app itself, ex. weather or wallpaper updates, are not recorded)
+RECORDED_EVENTS: tuple[int, ...] = (
+    pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL, pygame.KEYDOWN, pygame.KEYUP,
+    pygame.WINDOWMOVED, pygame.WINDOWENTER, pygame.WINDOWLEAVE, pygame.QUIT
+)
+RECORD_VERSION = 1  # Version of the file format
+
+
+def event_attributes(event: pygame.event.Event) -> dict:
+    """
+    Attributes of the event which can be written to the file (numbers, strings and their tuples)
+    """
+    attributes = {}
+    for name, value in event.dict.items():
+        if isinstance(value, (bool, int, float, str)):
+            attributes[name] = value
+        elif isinstance(value, (tuple, list)) and all(isinstance(item, (int, float)) for item in value):
+            attributes[name] = list(value)
+    return attributes
+
+
+class InputFrame:
+    """
+    Input of one frame (events are ready to be posted)
+    """
+    __slots__ = ('dt', 'mouse_pos', 'events')
+
+    def __init__(self, dt: int, mouse_pos: tuple[int, int], events: list[pygame.event.Event]) -> None:
+        self.dt: int = dt  # Delta time which was used by the frame (in ms)
+        self.mouse_pos: tuple[int, int] = mouse_pos
+        self.events: list[pygame.event.Event] = events
+
+
+class InputRecorder:
+    """
+    This class writes input of every frame to the file: delta time, mouse position and user events.
+    File is gzipped JSON lines (header, then one short line per frame), so a long session stays small.
+    """
+
+    def __init__(self, path: str, size: tuple[int, int]) -> None:
+        self.path: str = path
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+        self.frames: int = 0
+        self.write({'version': RECORD_VERSION, 'size': list(size), 'pygame': pygame.version.ver})
+
+    def write(self, line) -> None:
+        self.file.write(json.dumps(line, separators=(',', ':')))
+        self.file.write('\n')
+
+    def record(self, dt: int, mouse_pos: tuple[int, int], events: list[pygame.event.Event]) -> None:
+        """
+        Write input of the frame
+        :param dt: delta time of the frame (in ms)
+        :param events: all events of the frame (only user input is written, see RECORDED_EVENTS)
+        """
+        self.write([dt, mouse_pos[0], mouse_pos[1],
+                    [[event.type, event_attributes(event)] for event in events if event.type in RECORDED_EVENTS]])
+        self.frames += 1
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.file.close()
+
+
+class InputReplay:
+    """
+    This class reads the recorded input and gives it back frame by frame. Replay does not depend on real time:
+     every frame uses the recorded delta time (or the fixed one), so the same file always makes the same frames.
+    """
+
+    def __init__(self, path: str, fixed_dt: int | None = None, events: tuple[int, ...] = RECORDED_EVENTS) -> None:
+        """
+        :param fixed_dt: delta time of every frame (None - recorded delta time)
+        :param events: types of events which are replayed (ex. without QUIT replay never closes the app)
+        """
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        self.header: dict = json.loads(lines[0])
+        if self.header.get('version') != RECORD_VERSION:
+            raise ValueError(f"Unsupported input record version: {self.header.get('version')}")
+
+        self.frames: list[InputFrame] = []
+        for line in lines[1:]:
+            dt, x, y, recorded = json.loads(line)
+            self.frames.append(InputFrame(dt if fixed_dt is None else fixed_dt, (x, y),
+                                          [pygame.event.Event(event_type, attributes)
+                                           for event_type, attributes in recorded if event_type in events]))
+        self.index: int = 0  # Next frame
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.index >= len(self.frames)
+
+    def next_frame(self) -> InputFrame | None:
+        """
+        Input of the next frame (None when the record is over)
+        """
+        if self.is_finished:
+            return None
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
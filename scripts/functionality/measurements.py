@@ -1,4 +1,196 @@
+import numpy as np
 
-# Example...
-def convert_farenheit_to_celsius(farenheit):
-    NotImplementedError("This function is not implemented yet")
+
+class TEMPERATURE:  # Enum for temperature units (values are symbols which are shown)
+    CELSIUS = "°C"
+    FAHRENHEIT = "°F"
+    KELVIN = "K"
+
+
+class SPEED:  # Enum for speed units
+    METERS_PER_SECOND = "m/s"
+    KILOMETERS_PER_HOUR = "km/h"
+    MILES_PER_HOUR = "mph"
+
+
+class PRESSURE:  # Enum for pressure units
+    HECTOPASCAL = "hPa"
+    INCH_OF_MERCURY = "inHg"
+
+
+# Every unit as scale and offset to the base unit (base = value * scale + offset), base units are °C, m/s and hPa
+UNITS: dict[str, tuple[float, float]] = {
+    TEMPERATURE.CELSIUS: (1., 0.),
+    TEMPERATURE.FAHRENHEIT: (5 / 9, -32 * 5 / 9),
+    TEMPERATURE.KELVIN: (1., -273.15),
+    SPEED.METERS_PER_SECOND: (1., 0.),
+    SPEED.KILOMETERS_PER_HOUR: (1 / 3.6, 0.),
+    SPEED.MILES_PER_HOUR: (0.44704, 0.),
+    PRESSURE.HECTOPASCAL: (1., 0.),
+    PRESSURE.INCH_OF_MERCURY: (33.8639, 0.)
+}
+
+
+def convert(values: np.ndarray | float, from_unit: str, to_unit: str) -> np.ndarray | float:
+    """
+    Convert values between units of one quantity (whole array at once, it is one multiply and one add)
+    :param values: array (or one number)
+    :param from_unit: unit of values (see TEMPERATURE, SPEED and PRESSURE)
+    """
+    if from_unit == to_unit:
+        return values
+    from_scale, from_offset = UNITS[from_unit]
+    to_scale, to_offset = UNITS[to_unit]
+    return values * (from_scale / to_scale) + (from_offset - to_offset) / to_scale
+
+
+def convert_farenheit_to_celsius(farenheit: np.ndarray | float) -> np.ndarray | float:
+    return convert(farenheit, TEMPERATURE.FAHRENHEIT, TEMPERATURE.CELSIUS)
+
+
+class ForecastPoint:
+    """
+    One moment of the series (it reads values from the columns, nothing is copied)
+    """
+    __slots__ = ('series', 'index')
+
+    def __init__(self, series: "ForecastSeries", index: int) -> None:
+        self.series: ForecastSeries = series
+        self.index: int = index
+
+    @property
+    def time(self) -> float:
+        return float(self.series.time[self.index])
+
+    @property
+    def temperature(self) -> float:
+        return float(self.series.temperature[self.index])
+
+    @property
+    def wind(self) -> float:
+        return float(self.series.wind[self.index])
+
+    @property
+    def pressure(self) -> float:
+        return float(self.series.pressure[self.index])
+
+    @property
+    def humidity(self) -> float:
+        return float(self.series.humidity[self.index])
+
+
+class ForecastSeries:
+    """
+    Class ForecastSeries - weather of one location in time (one contiguous NumPy column for every quantity).
+    Values are stored in base units (°C, m/s, hPa, %), unknown values are NaN. Whole series is converted,
+     interpolated and resampled at once, so widgets prepare display values only when new data comes.
+    """
+    __slots__ = ('time', 'temperature', 'wind', 'pressure', 'humidity')
+    columns: tuple[str, ...] = ('temperature', 'wind', 'pressure', 'humidity')  # Columns with values
+
+    def __init__(self, time: np.ndarray, temperature: np.ndarray | None = None, wind: np.ndarray | None = None,
+                 pressure: np.ndarray | None = None, humidity: np.ndarray | None = None) -> None:
+        """
+        :param time: unix time of every point (points are sorted by it)
+        :param temperature: in °C (None - unknown)
+        :param wind: wind speed in m/s
+        :param pressure: in hPa
+        :param humidity: in %
+        """
+        self.time: np.ndarray = np.ascontiguousarray(time, np.float64)
+        order = None if np.all(self.time[1:] >= self.time[:-1]) else np.argsort(self.time, kind='stable')
+        if order is not None:
+            self.time = self.time[order]
+
+        for name, values in zip(ForecastSeries.columns, (temperature, wind, pressure, humidity)):
+            if values is None:
+                column = np.full(len(self.time), np.nan, np.float32)
+            else:
+                column = np.ascontiguousarray(values, np.float32)
+                if order is not None:
+                    column = column[order]
+            setattr(self, name, column)
+
+    @staticmethod
+    def from_response(data: dict) -> "ForecastSeries":
+        """
+        Create series from openweathermap 'forecast' response (metric units)
+        """
+        items = data.get('list') or []
+        count = len(items)
+        mains = [item.get('main') or {} for item in items]
+        winds = [item.get('wind') or {} for item in items]
+        return ForecastSeries(
+            np.fromiter((item['dt'] for item in items), np.float64, count),
+            np.fromiter((main.get('temp', np.nan) for main in mains), np.float32, count),
+            np.fromiter((wind.get('speed', np.nan) for wind in winds), np.float32, count),
+            np.fromiter((main.get('pressure', np.nan) for main in mains), np.float32, count),
+            np.fromiter((main.get('humidity', np.nan) for main in mains), np.float32, count)
+        )
+
+    @staticmethod
+    def from_snapshots(snapshots: list) -> "ForecastSeries":
+        """
+        Create series from weather snapshots (ex. history of ForecastStore, only temperature is known)
+        """
+        return ForecastSeries(np.fromiter((snapshot.received_time for snapshot in snapshots), np.float64),
+                              np.fromiter((snapshot.temperature for snapshot in snapshots), np.float32))
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, index: int) -> ForecastPoint:
+        if index < 0:
+            index += len(self.time)
+        if not 0 <= index < len(self.time):
+            raise IndexError("Forecast point index out of range")
+        return ForecastPoint(self, index)
+
+    def temperature_in(self, unit: str) -> np.ndarray:
+        return convert(self.temperature, TEMPERATURE.CELSIUS, unit)
+
+    def wind_in(self, unit: str) -> np.ndarray:
+        return convert(self.wind, SPEED.METERS_PER_SECOND, unit)
+
+    def pressure_in(self, unit: str) -> np.ndarray:
+        return convert(self.pressure, PRESSURE.HECTOPASCAL, unit)
+
+    def between(self, start: float, end: float) -> "ForecastSeries":
+        """
+        Points from start to end time (columns are views of this series)
+        """
+        first = np.searchsorted(self.time, start, side='left')
+        last = np.searchsorted(self.time, end, side='right')
+        return ForecastSeries(self.time[first:last], *(getattr(self, name)[first:last]
+                                                       for name in ForecastSeries.columns))
+
+    def interpolate(self, times: np.ndarray) -> "ForecastSeries":
+        """
+        Values at other moments (linear interpolation between known values, outside the series values of the first
+         and the last points are used, NaN values are skipped)
+        """
+        times = np.asarray(times, np.float64)
+        columns = []
+        for name in ForecastSeries.columns:
+            values = getattr(self, name)
+            known = ~np.isnan(values)
+            if not known.any():
+                columns.append(np.full(len(times), np.nan, np.float32))
+            elif known.all():
+                columns.append(np.interp(times, self.time, values))
+            else:
+                columns.append(np.interp(times, self.time[known], values[known]))
+        return ForecastSeries(times, *columns)
+
+    def resample(self, count: int, start: float | None = None, end: float | None = None) -> "ForecastSeries":
+        """
+        Evenly spaced points (ex. hourly data to points of the chart)
+        :param count: number of points
+        :param start: time of the first point (None - start of the series)
+        :param end: time of the last point (None - end of the series)
+        """
+        if len(self.time) == 0:
+            return ForecastSeries(np.zeros(0))
+        start = self.time[0] if start is None else start
+        end = self.time[-1] if end is None else end
+        return self.interpolate(np.linspace(start, end, count))
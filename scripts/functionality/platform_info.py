@@ -0,0 +1,280 @@
+import ctypes
+import glob
+import platform
+import subprocess
+import threading
+
+import pygame
+
+
+class OS:  # Enum for operating systems (values of platform.system())
+    WINDOWS = "Windows"
+    MACOS = "Darwin"
+    LINUX = "Linux"
+
+
+CURRENT_OS: str = platform.system()  # Resolved only once (no subprocess)
+
+PLATFORM_CHANGED: int = pygame.event.custom_type()  # Event which is posted when display, wallpaper or power is changed
+
+
+class RECT(ctypes.Structure):
+    """
+    This class made for storing the position of the window on the screen
+    """
+    _fields_ = [
+        ('left', ctypes.c_long),
+        ('top', ctypes.c_long),
+        ('right', ctypes.c_long),
+        ('bottom', ctypes.c_long)
+    ]
+
+
+class SYSTEM_POWER_STATUS(ctypes.Structure):
+    """
+    This class is filled by GetSystemPowerStatus (Windows)
+    """
+    _fields_ = [
+        ('ACLineStatus', ctypes.c_ubyte),  # 0 - battery, 1 - AC, 255 - unknown
+        ('BatteryFlag', ctypes.c_ubyte),
+        ('BatteryLifePercent', ctypes.c_ubyte),
+        ('SystemStatusFlag', ctypes.c_ubyte),
+        ('BatteryLifeTime', ctypes.c_ulong),
+        ('BatteryFullLifeTime', ctypes.c_ulong)
+    ]
+
+
+class WindowsBackend:
+    """
+    Platform queries for Windows (user32 calls)
+    """
+
+    def display_size(self) -> tuple[int, int]:
+        return ctypes.windll.user32.GetSystemMetrics(0), ctypes.windll.user32.GetSystemMetrics(1)
+
+    def wallpaper_path(self) -> str:
+        SPI_GETDESKWALLPAPER = 0x0073
+        buffer = ctypes.create_unicode_buffer(260)  # Maximum length of the path is 260 characters
+        ctypes.windll.user32.SystemParametersInfoW(SPI_GETDESKWALLPAPER, len(buffer), buffer, 0)
+        return buffer.value
+
+    def window_pos(self) -> tuple[int, int]:
+        window = pygame.display.get_wm_info()['window']
+        rect = RECT()
+        ctypes.windll.user32.GetWindowRect(window, ctypes.byref(rect))
+        return rect.left, rect.top
+
+    def on_battery(self) -> bool:
+        status = SYSTEM_POWER_STATUS()
+        if not ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(status)):
+            return False
+        return status.ACLineStatus == 0
+
+
+class MacOSBackend:
+    """
+    Platform queries for macOS (Quartz and AppleScript)
+    """
+
+    def display_size(self) -> tuple[int, int]:
+        try:
+            import Quartz
+            main_monitor = Quartz.CGDisplayBounds(Quartz.CGMainDisplayID())
+            return int(main_monitor.size.width), int(main_monitor.size.height)
+        except Exception as e:
+            raise Exception(f"Error retrieving display size on macOS: {e}")
+
+    def wallpaper_path(self) -> str:
+        script = """
+            tell application "System Events"
+                tell current desktop
+                    set wallpaperPath to picture as text
+                end tell
+            end tell
+            """
+        try:
+            result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True)
+            if result.returncode == 0:
+                return result.stdout.strip().replace(":", "/").replace("Macintosh HD", "")
+        except Exception as e:
+            return f"Error retrieving wallpaper path on macOS: {e}"
+        return ""
+
+    def window_pos(self) -> tuple[int, int]:
+        return 0, 0  # Only move events are used on macOS
+
+    def on_battery(self) -> bool:
+        try:
+            result = subprocess.run(['pmset', '-g', 'batt'], capture_output=True, text=True)
+        except OSError:
+            return False
+        return "Battery Power" in result.stdout
+
+
+class LinuxBackend:
+    """
+    Stub platform queries for Linux (values can be set by hand, ex. for headless tests)
+    """
+
+    def __init__(self, display_size: tuple[int, int] = (0, 0), wallpaper_path: str = "",
+                 window_pos: tuple[int, int] = (0, 0), on_battery: bool | None = None) -> None:
+        self.display_size_value: tuple[int, int] = display_size
+        self.wallpaper_path_value: str = wallpaper_path
+        self.window_pos_value: tuple[int, int] = window_pos
+        self.on_battery_value: bool | None = on_battery  # None - read from the power supply (sysfs)
+        self.queries: int = 0  # How many times platform was asked
+
+    def display_size(self) -> tuple[int, int]:
+        self.queries += 1
+        return self.display_size_value
+
+    def wallpaper_path(self) -> str:
+        self.queries += 1
+        return self.wallpaper_path_value
+
+    def window_pos(self) -> tuple[int, int]:
+        self.queries += 1
+        return self.window_pos_value
+
+    def on_battery(self) -> bool:
+        self.queries += 1
+        if self.on_battery_value is not None:
+            return self.on_battery_value
+        # Computer is on battery if it has a mains adapter and the adapter is offline
+        adapters = [path for path in glob.glob("/sys/class/power_supply/*")
+                    if read_text(f"{path}/type") == "Mains"]
+        return bool(adapters) and all(read_text(f"{path}/online") == "0" for path in adapters)
+
+
+def read_text(path: str) -> str:
+    """
+    Content of the small text file (ex. sysfs value), empty if it can not be read
+    """
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return ""
+
+
+def create_backend():
+    """
+    Backend for the current operating system
+    """
+    if CURRENT_OS == OS.WINDOWS:
+        return WindowsBackend()
+    elif CURRENT_OS == OS.MACOS:
+        return MacOSBackend()
+    return LinuxBackend()
+
+
+class PlatformInfo:
+    """
+    This class caches display size, wallpaper path, window position and power source.
+    Values are asked from the backend only once and then changed by events (window moving, display changing)
+    or by slow polling in the background thread (never inside the frame).
+    """
+
+    def __init__(self, backend=None) -> None:
+        self.backend = backend if backend is not None else create_backend()
+        self.lock: threading.Lock = threading.Lock()
+
+        self._display_size: tuple[int, int] | None = None
+        self._wallpaper_path: str | None = None
+        self._window_pos: tuple[int, int] | None = None
+        self._on_battery: bool | None = None
+
+        self.poll_thread: threading.Thread | None = None
+        self.poll_interval: int = 0  # Time between two polls (in ms, 0 - no polling)
+        self.poll_stop: threading.Event = threading.Event()  # Set when polling must end (wakes up the thread)
+
+    @property
+    def display_size(self) -> tuple[int, int]:
+        if self._display_size is None:
+            self._display_size = self.backend.display_size()
+        return self._display_size
+
+    @property
+    def wallpaper_path(self) -> str:
+        if self._wallpaper_path is None:
+            self._wallpaper_path = self.backend.wallpaper_path()
+        return self._wallpaper_path
+
+    @property
+    def window_pos(self) -> tuple[int, int]:
+        if self._window_pos is None:  # Asked only once, then it is changed by move events
+            self._window_pos = self.backend.window_pos()
+        return self._window_pos
+
+    @property
+    def on_battery(self) -> bool:
+        if self._on_battery is None:
+            self._on_battery = self.backend.on_battery()
+        return self._on_battery
+
+    def refresh(self) -> list[str]:
+        """
+        Ask backend again for display size, wallpaper path and power source
+        :return: names of changed values ('display', 'wallpaper', 'power')
+        """
+        display_size = self.backend.display_size()
+        wallpaper_path = self.backend.wallpaper_path()
+        on_battery = self.backend.on_battery()
+
+        changed = []
+        with self.lock:
+            if self._display_size is not None and display_size != self._display_size:
+                changed.append('display')
+            if self._wallpaper_path is not None and wallpaper_path != self._wallpaper_path:
+                changed.append('wallpaper')
+            if self._on_battery is not None and on_battery != self._on_battery:
+                changed.append('power')
+            self._display_size = display_size
+            self._wallpaper_path = wallpaper_path
+            self._on_battery = on_battery
+        return changed
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        """
+        Update cached values from pygame events
+        """
+        if event.type == pygame.WINDOWMOVED:
+            self._window_pos = (event.x, event.y)
+        elif event.type == pygame.WINDOWDISPLAYCHANGED:
+            changed = self.refresh()
+            if changed:
+                pygame.event.post(pygame.event.Event(PLATFORM_CHANGED, changed=changed))
+
+    def start_polling(self, interval: int) -> None:
+        """
+        Start slow polling of display size and wallpaper path in the background thread
+        :param interval: time between two polls (in ms, 0 - no polling)
+        """
+        if interval <= 0:
+            self.stop_polling()
+            return
+        self.poll_interval = interval  # Running thread uses the new interval after its current wait
+        if self.poll_thread is not None and self.poll_thread.is_alive():
+            return
+
+        self.poll_stop.clear()
+        self.poll_thread = threading.Thread(target=self.poll, daemon=True)
+        self.poll_thread.start()
+
+    def stop_polling(self) -> None:
+        """
+        Stop polling and wait until the thread ends (it can be started again after it)
+        """
+        self.poll_stop.set()
+        if self.poll_thread is not None and self.poll_thread is not threading.current_thread():
+            self.poll_thread.join()
+        self.poll_thread = None
+
+    def poll(self) -> None:
+        while not self.poll_stop.wait(self.poll_interval / 1000):  # Sleeps the interval or ends on stop
+            changed = self.refresh()
+            if changed and pygame.display.get_init():  # Wake up the main loop
+                pygame.event.post(pygame.event.Event(PLATFORM_CHANGED, changed=changed))
+
+
+PLATFORM_INFO: PlatformInfo = PlatformInfo()  # Shared platform info (values are asked on first use)
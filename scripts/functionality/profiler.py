@@ -0,0 +1,127 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from scripts import settings
+
+
+class STAGE:  # Enum for profiled stages (index in STAGE_NAMES)
+    INPUT = 0
+    PHYSICS = 1
+    RENDERING = 2
+    SHADERS = 3
+    REFRESH = 4
+    WAIT = 5  # Waiting for the next frame (part of refresh)
+    DRAW_WALLPAPER = 6  # Part of rendering
+    SURF_TO_TEXTURE = 7  # Part of shaders
+
+
+STAGE_NAMES: list[str] = ["input", "physics", "rendering", "shaders", "refresh", "wait", "draw_wallpaper",
+                          "surf_to_texture"]
+
+
+class Section:
+    """
+    Measured part of the frame (with profiler.section(STAGE.INPUT): ...). Sections are created once and used again,
+     so measuring does not create objects.
+    """
+    __slots__ = ('profiler', 'stage', 'start')
+
+    def __init__(self, profiler: "Profiler", stage: int) -> None:
+        self.profiler: Profiler = profiler
+        self.stage: int = stage
+        self.start: int = 0  # Start time (in ns, 0 - not measured)
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns() if self.profiler.enabled else 0
+
+    def __exit__(self, *args) -> None:
+        if self.start:
+            self.profiler.record(self.stage, self.start, time.perf_counter_ns())
+
+
+class Profiler:
+    """
+    This class measures time of every stage of the frame. Times are written to fixed-size ring buffers:
+     time of every stage in the last frames (for percentiles) and the last sections (for the trace file).
+    """
+
+    def __init__(self, history_size: int = settings.PROFILER_HISTORY, events_size: int = settings.PROFILER_EVENTS,
+                 enabled: bool = settings.PROFILER_ENABLED) -> None:
+        self.enabled: bool = enabled
+        self.origin: int = time.perf_counter_ns()  # Times in the trace are counted from this moment
+
+        # Time of every stage in the last frames (in ms)
+        self.frames: np.ndarray = np.zeros((history_size, len(STAGE_NAMES)), np.float64)
+        self.frame_index: int = 0  # Where the next frame is written
+        self.frames_count: int = 0
+        self.current: np.ndarray = np.zeros(len(STAGE_NAMES), np.float64)  # Stages of the current frame
+
+        # Last measured sections (stage, start and duration in ns)
+        self.event_stage: np.ndarray = np.zeros(events_size, np.int8)
+        self.event_start: np.ndarray = np.zeros(events_size, np.int64)
+        self.event_duration: np.ndarray = np.zeros(events_size, np.int64)
+        self.event_index: int = 0
+        self.events_count: int = 0
+
+        self.sections: list[Section] = [Section(self, stage) for stage in range(len(STAGE_NAMES))]
+
+    def section(self, stage: int) -> Section:
+        return self.sections[stage]
+
+    def record(self, stage: int, start: int, end: int) -> None:
+        self.current[stage] += (end - start) / 1e6
+
+        i = self.event_index
+        self.event_stage[i] = stage
+        self.event_start[i] = start - self.origin
+        self.event_duration[i] = end - start
+        self.event_index = (i + 1) % len(self.event_stage)
+        self.events_count = min(self.events_count + 1, len(self.event_stage))
+
+    def end_frame(self) -> None:
+        """
+        Save times of the current frame (it is called at the end of every frame)
+        """
+        if not self.enabled:
+            return
+        self.frames[self.frame_index] = self.current
+        self.current.fill(0)
+        self.frame_index = (self.frame_index + 1) % len(self.frames)
+        self.frames_count = min(self.frames_count + 1, len(self.frames))
+
+    def percentiles(self, q: tuple[float, ...] = (50, 95, 99)) -> np.ndarray:
+        """
+        Percentiles of every stage time in the last frames (in ms)
+        :return: array (stage, percentile)
+        """
+        if self.frames_count == 0:
+            return np.zeros((len(STAGE_NAMES), len(q)), np.float64)
+        return np.percentile(self.frames[:self.frames_count], q, axis=0).T
+
+    def trace_events(self) -> list[dict]:
+        """
+        Last sections in Chrome trace format (complete events, times in microseconds)
+        """
+        start = self.event_index - self.events_count
+        order = np.arange(start, self.event_index) % len(self.event_stage)  # From old to new
+        events = [{'name': "process_name", 'ph': "M", 'pid': os.getpid(), 'tid': 0, 'args': {'name': settings.NAME}}]
+        for stage, start_time, duration in zip(self.event_stage[order].tolist(), self.event_start[order].tolist(),
+                                               self.event_duration[order].tolist()):
+            events.append({'name': STAGE_NAMES[stage], 'cat': "frame", 'ph': "X", 'pid': os.getpid(), 'tid': 0,
+                           'ts': start_time / 1000, 'dur': duration / 1000})
+        return events
+
+    def dump_trace(self, path: str = settings.PROFILER_TRACE_PATH) -> str:
+        """
+        Write the last sections to the trace file (open it in chrome://tracing or Perfetto)
+        :return: path of the file
+        """
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': "ms"}, file)
+        return path
+
+
+PROFILER: Profiler = Profiler()  # Shared profiler (app, field and other parts measure their stages)
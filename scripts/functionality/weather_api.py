@@ -0,0 +1,378 @@
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pygame
+
+from scripts import settings
+from scripts.functionality.measurements import ForecastSeries
+
+WEATHER_UPDATED: int = pygame.event.custom_type()  # Event which is posted when a new snapshot is ready
+
+
+class WeatherAPIError(Exception):
+    """
+    Error of the weather server (bad status or bad response)
+    """
+
+
+class WeatherSnapshot:
+    """
+    This class stores the last known weather of one location (it is never changed after creating)
+    """
+    __slots__ = ('location', 'temperature', 'description', 'icon', 'received_time')
+
+    def __init__(self, location: str, temperature: float, description: str = "", icon: str = "",
+                 received_time: float = 0) -> None:
+        self.location: str = location
+        self.temperature: float = temperature  # In °C
+        self.description: str = description
+        self.icon: str = icon
+        self.received_time: float = received_time  # When data was received (unix time)
+
+    @staticmethod
+    def from_response(location: str, data: dict) -> "WeatherSnapshot":
+        """
+        Create snapshot from openweathermap 'weather' response
+        """
+        weather = data.get('weather') or [{}]
+        return WeatherSnapshot(location, float(data['main']['temp']), weather[0].get('description', ""),
+                               weather[0].get('icon', ""), time.time())
+
+
+class ConnectionPool:
+    """
+    This class keeps opened (keep-alive) HTTP connections for every host
+    """
+
+    def __init__(self, max_idle: int = 4, timeout: float = 10) -> None:
+        self.max_idle: int = max_idle  # How many idle connections are kept for one host
+        self.timeout: float = timeout  # Timeout of connection (in seconds)
+        self.idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self.lock: threading.Lock = threading.Lock()
+
+    def acquire(self, scheme: str, host: str, port: int) -> tuple[http.client.HTTPConnection, bool]:
+        """
+        Get connection for the host
+        :return: connection and was it reused?
+        """
+        with self.lock:
+            connections = self.idle.get((scheme, host, port))
+            if connections:
+                return connections.pop(), True
+
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout), False
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def release(self, scheme: str, host: str, port: int, connection: http.client.HTTPConnection) -> None:
+        """
+        Return connection to the pool (it will be reused by the next request)
+        """
+        with self.lock:
+            connections = self.idle.setdefault((scheme, host, port), [])
+            if len(connections) < self.max_idle:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def close(self) -> None:
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle = {}
+
+
+class CacheEntry:
+    """
+    Cached HTTP response (with validators for conditional requests)
+    """
+    __slots__ = ('data', 'etag', 'last_modified', 'expires')
+
+    def __init__(self, data: dict, etag: str | None, last_modified: str | None, expires: float) -> None:
+        self.data: dict = data
+        self.etag: str | None = etag
+        self.last_modified: str | None = last_modified
+        self.expires: float = expires  # Until this time response is fresh (monotonic time)
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+
+def cache_time(headers: http.client.HTTPMessage, default_ttl: float) -> float | None:
+    """
+    How long the response is fresh (from Cache-Control header)
+    :return: time in seconds (None - response must not be stored)
+    """
+    directives = [directive.strip().lower() for directive in (headers.get('Cache-Control') or "").split(',')]
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0  # Stored, but always revalidated
+    for directive in directives:
+        if directive.startswith('max-age='):
+            try:
+                return max(0., float(directive[len('max-age='):]))
+            except ValueError:
+                break
+    return default_ttl
+
+
+class WeatherClient:
+    """
+    This class gets weather data in worker threads (the frame loop never waits for the network).
+    Widgets read the last snapshot with get_snapshot (it never blocks).
+    """
+
+    def __init__(self, base_url: str = settings.WEATHER_API_URL, api_key: str = settings.WEATHER_API_KEY,
+                 ttl: float = settings.WEATHER_CACHE_TTL, workers: int = 2) -> None:
+        self.base_url: str = base_url.rstrip('/')
+        self.api_key: str = api_key
+        self.ttl: float = ttl  # Default time of fresh response (in seconds), if server says nothing
+
+        self.pool: ConnectionPool = ConnectionPool()
+        self.executor: ThreadPoolExecutor | None = None  # Workers are started on the first request
+        self.workers: int = workers
+        self.lock: threading.Lock = threading.Lock()
+
+        self.cache: dict[str, CacheEntry] = {}  # Responses by url
+        self.in_flight: dict[str, Future] = {}  # Requests which are running now (by url)
+        self.snapshots: dict[str, WeatherSnapshot] = {}  # Last weather by location
+        self.forecasts: dict[str, ForecastSeries] = {}  # Last forecast by location
+        # Response data from which the current snapshot or forecast was made (by url). Cached responses (fresh
+        # or 304) return the same data object, then the old snapshot is kept (widgets and listeners skip it)
+        self.responses: dict[str, dict] = {}
+        self.failures: dict[str, int] = {}  # How many times request failed in a row (by location)
+        self.retry_time: dict[str, float] = {}  # Not earlier than this time request is repeated (by location)
+        self.retry_timers: dict[str, threading.Timer] = {}  # Delayed repeat of the failed request (by location)
+        self.listeners: list[callable] = []  # Functions which get every new snapshot (called in the worker)
+
+    def url(self, location: str) -> str:
+        query = urllib.parse.urlencode({'q': location, 'units': 'metric', 'appid': self.api_key})
+        return f"{self.base_url}/weather?{query}"
+
+    def forecast_url(self, location: str) -> str:
+        query = urllib.parse.urlencode({'q': location, 'units': 'metric', 'appid': self.api_key})
+        return f"{self.base_url}/forecast?{query}"
+
+    def get_forecast(self, location: str) -> ForecastSeries | None:
+        """
+        Last known forecast of the location (None if it is unknown yet)
+        """
+        return self.forecasts.get(location)
+
+    def get_snapshot(self, location: str) -> WeatherSnapshot | None:
+        """
+        Last known weather of the location (None if it is unknown yet)
+        """
+        return self.snapshots.get(location)
+
+    def set_snapshot(self, snapshot: WeatherSnapshot) -> None:
+        """
+        Set weather from another source (ex. from the disk)
+        """
+        with self.lock:
+            self.snapshots[snapshot.location] = snapshot
+            self.responses.pop(self.url(snapshot.location), None)
+
+    def request(self, location: str) -> Future | None:
+        """
+        Start getting weather for the location in the worker (duplicate requests are coalesced)
+        :return: future with snapshot (None if request is postponed after failures)
+        """
+        if time.monotonic() < self.retry_time.get(location, 0):
+            return None
+
+        return self.submit(self.url(location), self.update, location)
+
+    def request_forecast(self, location: str) -> Future | None:
+        """
+        Start getting forecast for the location in the worker (duplicate requests are coalesced)
+        :return: future with forecast (None if request is postponed after failures)
+        """
+        if time.monotonic() < self.retry_time.get(location, 0):
+            return None
+        return self.submit(self.forecast_url(location), self.update_forecast, location)
+
+    def submit(self, url: str, function: callable, location: str) -> Future:
+        """
+        Run function(location, url) in the worker (only one request of the url runs at once)
+        """
+        with self.lock:
+            if url in self.in_flight:
+                return self.in_flight[url]
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="weather")
+            future = self.executor.submit(function, location, url)
+            self.in_flight[url] = future
+        future.add_done_callback(lambda _: self.finish(url))
+        return future
+
+    def refresh(self, locations: list[str]) -> None:
+        """
+        Request weather for all locations (it returns immediately)
+        """
+        if not self.api_key:  # Server will not answer without key
+            return
+        for location in locations:
+            self.request(location)
+            if settings.WEATHER_FORECAST_POINTS > 0:  # Forecast is requested only if it is shown
+                self.request_forecast(location)
+
+    def finish(self, url: str) -> None:
+        with self.lock:
+            self.in_flight.pop(url, None)
+
+    def update(self, location: str, url: str) -> WeatherSnapshot | None:
+        """
+        Get weather and save snapshot (it is called in the worker)
+        """
+        try:
+            data = self.fetch(url)
+            with self.lock:
+                snapshot = self.snapshots.get(location)
+                is_cached = snapshot is not None and self.responses.get(url) is data  # Response was not changed
+            if not is_cached:
+                snapshot = WeatherSnapshot.from_response(location, data)
+        except (OSError, http.client.HTTPException, WeatherAPIError, ValueError, KeyError):
+            failures = self.failures.get(location, 0) + 1
+            self.failures[location] = failures
+            # Exponential backoff with jitter (requests of many widgets are not synchronized), the next refresh
+            # repeats the request anyway, so the delay is never longer than the refresh interval
+            delay = min(settings.WEATHER_BACKOFF_MAX, settings.WEATHER_BACKOFF_BASE * 2 ** (failures - 1))
+            delay = min(delay * random.uniform(0.5, 1.5), settings.WEATHER_REFRESH_INTERVAL) / 1000
+            self.retry_time[location] = time.monotonic() + delay
+            self.schedule_retry(location, delay)
+            return None
+
+        self.failures.pop(location, None)
+        self.retry_time.pop(location, None)
+        self.cancel_retry(location)
+        if is_cached:  # Same snapshot (with time of the original response), nothing to save or redraw
+            return snapshot
+        with self.lock:
+            changed = self.snapshots.get(location) is None or \
+                self.snapshots[location].temperature != snapshot.temperature or \
+                self.snapshots[location].description != snapshot.description
+            self.snapshots[location] = snapshot
+            self.responses[url] = data
+        for listener in self.listeners:
+            listener(snapshot)
+        if changed and pygame.display.get_init():  # Wake up the main loop
+            pygame.event.post(pygame.event.Event(WEATHER_UPDATED, location=location))
+        return snapshot
+
+    def schedule_retry(self, location: str, delay: float) -> None:
+        """
+        Repeat the failed request after the delay (in seconds)
+        """
+        timer = threading.Timer(delay, self.retry, (location,))
+        timer.daemon = True
+        with self.lock:
+            old_timer = self.retry_timers.get(location)
+            self.retry_timers[location] = timer
+        if old_timer is not None:
+            old_timer.cancel()
+        timer.start()
+
+    def cancel_retry(self, location: str) -> None:
+        with self.lock:
+            timer = self.retry_timers.pop(location, None)
+        if timer is not None:
+            timer.cancel()
+
+    def retry(self, location: str) -> None:
+        with self.lock:
+            self.retry_timers.pop(location, None)
+            if self.executor is None:  # Client was closed
+                return
+        self.submit(self.url(location), self.update, location)
+
+    def update_forecast(self, location: str, url: str) -> ForecastSeries | None:
+        """
+        Get forecast and convert it to columns (it is called in the worker, so widgets only read arrays)
+        """
+        try:
+            data = self.fetch(url)
+            with self.lock:
+                if location in self.forecasts and self.responses.get(url) is data:  # Response was not changed
+                    return self.forecasts[location]
+            forecast = ForecastSeries.from_response(data)
+        except (OSError, http.client.HTTPException, WeatherAPIError, ValueError, KeyError, TypeError):
+            return None  # Forecast is requested again with the next refresh
+
+        with self.lock:
+            self.forecasts[location] = forecast
+            self.responses[url] = data
+        if pygame.display.get_init():  # Wake up the main loop
+            pygame.event.post(pygame.event.Event(WEATHER_UPDATED, location=location))
+        return forecast
+
+    def fetch(self, url: str) -> dict:
+        """
+        GET json with HTTP cache (fresh responses are not requested, old ones are revalidated with ETag)
+        """
+        entry = self.cache.get(url)
+        if entry is not None and entry.is_fresh():
+            return entry.data
+
+        headers = {'Accept': 'application/json', 'Connection': 'keep-alive'}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        parts = urllib.parse.urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+        for attempt in range(2):  # Reused connection can be closed by server, then one more try
+            connection, is_reused = self.pool.acquire(parts.scheme, parts.hostname, port)
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if is_reused and attempt == 0:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self.pool.release(parts.scheme, parts.hostname, port, connection)
+            break
+
+        ttl = cache_time(response.headers, self.ttl)
+        if response.status == 304 and entry is not None:  # Not modified
+            entry.expires = time.monotonic() + (ttl or 0)
+            return entry.data
+        if response.status != 200:
+            raise WeatherAPIError(f"Weather server returned {response.status}")
+
+        data = json.loads(body)
+        if ttl is not None:
+            self.cache[url] = CacheEntry(data, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                         time.monotonic() + ttl)
+        else:
+            self.cache.pop(url, None)
+        return data
+
+    def close(self) -> None:
+        with self.lock:
+            timers, self.retry_timers = list(self.retry_timers.values()), {}
+        for timer in timers:
+            timer.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.pool.close()
+
+
+WEATHER_CLIENT: WeatherClient = WeatherClient()  # Shared weather client (workers start on the first request)
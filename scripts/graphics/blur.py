@@ -0,0 +1,66 @@
+import moderngl
+
+MAX_STEPS = 8  # Size of weights array in blur shader
+
+
+class SeparableBlur:
+    """
+    This class blurs a texture in two passes (horizontal, then vertical) into offscreen framebuffers.
+    Result stays in the texture until the next render, so not changed layers are never blurred again.
+    """
+
+    def __init__(self, ctx: moderngl.Context, program: moderngl.Program, quad_buffer: moderngl.Buffer,
+                 size: tuple[int, int], weights: list[float], offset: tuple[float, float], unit: int) -> None:
+        """
+        :param program: blur program (see blur_frag_shader.glsl)
+        :param size: size of the result texture (it can be smaller than the source, composite shader upscales it)
+        :param weights: weights of one side of the kernel (max 8)
+        :param offset: offset between two samples (in uvs, x for horizontal pass and y for vertical pass)
+        :param unit: texture unit of the result texture (unit + 1 is used for the intermediate texture)
+        """
+        self.ctx: moderngl.Context = ctx
+        self.program: moderngl.Program = program
+        self.weights: list[float] = (list(weights) + [0.] * MAX_STEPS)[:MAX_STEPS]
+        self.steps: int = min(len(weights), MAX_STEPS)
+        self.offset: tuple[float, float] = offset
+        self.unit: int = unit
+
+        self.render_object = ctx.vertex_array(program, [(quad_buffer, '2f 2f', 'vert', 'texcoord')])
+
+        # After horizontal pass
+        self.horizontal_tex: moderngl.Texture = ctx.texture(size, 4)
+        self.horizontal_tex.filter = (moderngl.LINEAR, moderngl.LINEAR)
+        self.horizontal_tex.repeat_x = self.horizontal_tex.repeat_y = False
+        self.horizontal_fbo: moderngl.Framebuffer = ctx.framebuffer(color_attachments=[self.horizontal_tex])
+
+        # Result (after vertical pass)
+        self.texture: moderngl.Texture = ctx.texture(size, 4)
+        self.texture.filter = (moderngl.LINEAR, moderngl.LINEAR)
+        self.texture.repeat_x = self.texture.repeat_y = False
+        self.fbo: moderngl.Framebuffer = ctx.framebuffer(color_attachments=[self.texture])
+
+    def render(self, source_unit: int) -> None:
+        """
+        Blur texture which is bound to source unit (result is bound to self.unit)
+        """
+        target = self.ctx.fbo  # Framebuffer which was used before blur
+        self.program['weights'] = self.weights
+        self.program['steps'] = self.steps
+
+        self.horizontal_fbo.use()
+        self.program['sourceTex'] = source_unit
+        self.program['direction'] = (self.offset[0], 0.)
+        self.render_object.render(moderngl.TRIANGLE_STRIP)
+
+        self.fbo.use()
+        self.horizontal_tex.use(self.unit + 1)
+        self.program['sourceTex'] = self.unit + 1
+        self.program['direction'] = (0., self.offset[1])
+        self.render_object.render(moderngl.TRIANGLE_STRIP)
+
+        target.use()
+        self.texture.use(self.unit)
+
+    def release(self) -> None:
+        for resource in (self.render_object, self.horizontal_fbo, self.horizontal_tex, self.fbo, self.texture):
+            resource.release()
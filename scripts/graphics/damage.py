@@ -0,0 +1,43 @@
+import pygame
+
+
+class Damage:
+    """
+    This class collects the changed (dirty) area of one layer between two frames
+    """
+
+    def __init__(self, size: tuple[int, int], is_full: bool = False) -> None:
+        self.bounds: pygame.Rect = pygame.Rect((0, 0), size)  # Area of the whole layer
+        self.rect: pygame.Rect | None = self.bounds.copy() if is_full else None  # Dirty rectangle
+
+    @property
+    def changed(self) -> bool:
+        """
+        Was something changed on the layer?
+        """
+        return self.rect is not None
+
+    def add(self, rect: pygame.Rect) -> None:
+        """
+        Add changed rectangle (it is clipped by the layer bounds)
+        """
+        rect = self.bounds.clip(rect)
+        if rect.width <= 0 or rect.height <= 0:  # Outside the layer
+            return
+        self.rect = rect if self.rect is None else self.rect.union(rect)
+
+    def add_all(self) -> None:
+        """
+        Mark the whole layer as changed
+        """
+        self.rect = self.bounds.copy()
+
+    def merge(self, other: "Damage") -> None:
+        """
+        Add changed area of another damage
+        """
+        if other.rect is not None:
+            self.add(other.rect)
+
+    def clear(self) -> None:
+        self.rect = None
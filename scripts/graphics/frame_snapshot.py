@@ -0,0 +1,48 @@
+import os
+
+import pygame
+
+
+class FrameSnapshot:
+    """
+    This class keeps the last shown frame on disk. The next start shows it as soon as the window is opened, while
+     layers, shaders and blurs are still being prepared (the first rendered frame replaces it).
+    Frame is saved as BMP (pygame reads and writes it without image libraries and without decoding work).
+    """
+
+    def __init__(self, path: str, size: tuple[int, int]) -> None:
+        """
+        :param path: file of the snapshot ("" - snapshots are disabled)
+        :param size: window size (snapshot of another size is not shown)
+        """
+        self.path: str = path
+        self.size: tuple[int, int] = tuple(size)
+
+    def load(self) -> pygame.Surface | None:
+        """
+        Last saved frame (None if there is no file, it is broken or it has another size)
+        """
+        if not self.path or not os.path.isfile(self.path):
+            return None
+        try:
+            image = pygame.image.load(self.path)
+        except (pygame.error, OSError):
+            return None
+        return image if image.get_size() == self.size else None
+
+    def save(self, frame: pygame.Surface) -> bool:
+        """
+        Write the frame (whole file is replaced at once, so the next start never reads a half-written frame)
+        :return: was the frame saved?
+        """
+        if not self.path or frame.get_size() != self.size:
+            return False
+        temp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(temp_path, 'wb') as file:
+                pygame.image.save(frame, file, "frame.bmp")
+            os.replace(temp_path, self.path)
+        except (pygame.error, OSError):  # Widget works without snapshot
+            return False
+        return True
@@ -0,0 +1,168 @@
+import moderngl
+import numpy as np
+
+import scripts.settings as s
+
+# Tracked kinds of GL objects (depth renderbuffers are counted as renderbuffers)
+RESOURCE_KINDS: tuple[str, ...] = ('texture', 'buffer', 'program', 'framebuffer', 'renderbuffer', 'vertex_array')
+
+DTYPE_SIZES: dict[str, int] = {'f1': 1, 'u1': 1, 'i1': 1, 'f2': 2, 'u2': 2, 'i2': 2, 'f4': 4, 'u4': 4, 'i4': 4}
+
+
+def resource_bytes(kind: str, resource) -> int:
+    """
+    Estimated GPU memory of the object (without driver overhead and mipmaps). Programs, framebuffers and vertex arrays
+     own no big memory (attachments are counted as textures or renderbuffers)
+    """
+    if kind == 'buffer':
+        return resource.size
+    if kind in ('texture', 'renderbuffer'):
+        return resource.width * resource.height * resource.components * DTYPE_SIZES.get(resource.dtype, 4) * \
+            max(resource.samples, 1)
+    return 0
+
+
+class GpuResourceLeak(Exception):
+    """
+    GL objects grow while the app is in steady state (something is allocated every frame and never released)
+    """
+
+
+class GpuResourceTracker:
+    """
+    This class wraps moderngl context and counts GL objects which are created through it: live objects and their
+     memory by kind, allocations and releases of every frame (ring buffers like in Profiler). Everything else
+     is passed to the context, so the tracker is used instead of the context.
+    In check mode it raises GpuResourceLeak when live objects grow after the warmup (see end_frame).
+    """
+
+    def __init__(self, ctx: moderngl.Context, warmup: int = s.GPU_RESOURCES_WARMUP,
+                 check: bool = s.GPU_RESOURCES_CHECK, history_size: int = s.PROFILER_HISTORY) -> None:
+        """
+        :param warmup: frames after which the number and memory of live objects must not grow
+        :param check: raise GpuResourceLeak on growth (debug mode)
+        :param history_size: how many last frames keep their allocations and releases
+        """
+        self.ctx: moderngl.Context = ctx
+        self.warmup: int = warmup
+        self.check: bool = check
+
+        self.live: dict[str, list] = {kind: [] for kind in RESOURCE_KINDS}  # Objects which were not released yet
+        self.live_bytes: dict[str, int] = {kind: 0 for kind in RESOURCE_KINDS}
+
+        # Allocations and releases of the current frame and of the last frames (frame, kind)
+        self.allocated: np.ndarray = np.zeros(len(RESOURCE_KINDS), np.int64)
+        self.released: np.ndarray = np.zeros(len(RESOURCE_KINDS), np.int64)
+        self.frame_allocated: np.ndarray = np.zeros((history_size, len(RESOURCE_KINDS)), np.int64)
+        self.frame_released: np.ndarray = np.zeros((history_size, len(RESOURCE_KINDS)), np.int64)
+        self.frame_index: int = 0  # Where the next frame is written
+        self.frames: int = 0  # All ended frames
+
+        self.baseline: tuple[dict[str, int], dict[str, int]] | None = None  # Live counts and memory after the warmup
+
+    def __getattr__(self, name: str):
+        return getattr(self.ctx, name)
+
+    def track(self, kind: str, resource):
+        self.live[kind].append(resource)
+        self.live_bytes[kind] += resource_bytes(kind, resource)
+        self.allocated[RESOURCE_KINDS.index(kind)] += 1
+        return resource
+
+    def texture(self, *args, **kwargs) -> moderngl.Texture:
+        return self.track('texture', self.ctx.texture(*args, **kwargs))
+
+    def buffer(self, *args, **kwargs) -> moderngl.Buffer:
+        return self.track('buffer', self.ctx.buffer(*args, **kwargs))
+
+    def program(self, *args, **kwargs) -> moderngl.Program:
+        return self.track('program', self.ctx.program(*args, **kwargs))
+
+    def framebuffer(self, *args, **kwargs) -> moderngl.Framebuffer:
+        return self.track('framebuffer', self.ctx.framebuffer(*args, **kwargs))
+
+    def renderbuffer(self, *args, **kwargs) -> moderngl.Renderbuffer:
+        return self.track('renderbuffer', self.ctx.renderbuffer(*args, **kwargs))
+
+    def depth_renderbuffer(self, *args, **kwargs) -> moderngl.Renderbuffer:
+        return self.track('renderbuffer', self.ctx.depth_renderbuffer(*args, **kwargs))
+
+    def vertex_array(self, *args, **kwargs) -> moderngl.VertexArray:
+        return self.track('vertex_array', self.ctx.vertex_array(*args, **kwargs))
+
+    def simple_framebuffer(self, size: tuple[int, int], components: int = 4, samples: int = 0,
+                           dtype: str = 'f1') -> moderngl.Framebuffer:
+        # Same as moderngl (attachments are created through the tracker)
+        return self.framebuffer(self.renderbuffer(size, components, samples=samples, dtype=dtype),
+                                self.depth_renderbuffer(size, samples=samples))
+
+    def collect(self) -> None:
+        """
+        Forget released objects (moderngl replaces their GL object with InvalidObject)
+        """
+        for i, kind in enumerate(RESOURCE_KINDS):
+            resources = self.live[kind]
+            alive = [resource for resource in resources if not isinstance(resource.mglo, moderngl.InvalidObject)]
+            if len(alive) != len(resources):
+                self.released[i] += len(resources) - len(alive)
+                self.live[kind] = alive
+                self.live_bytes[kind] = sum(resource_bytes(kind, resource) for resource in alive)
+
+    def counts(self) -> dict[str, int]:
+        return {kind: len(resources) for kind, resources in self.live.items()}
+
+    @property
+    def total_count(self) -> int:
+        return sum(len(resources) for resources in self.live.values())
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.live_bytes.values())
+
+    def recent(self) -> tuple[int, int]:
+        """
+        Allocations and releases in the last frames (both are 0 in steady state)
+        """
+        frames = min(self.frames, len(self.frame_allocated))
+        return int(self.frame_allocated[:frames].sum()), int(self.frame_released[:frames].sum())
+
+    def end_frame(self) -> None:
+        """
+        Save allocations and releases of the current frame (it is called at the end of every frame)
+        """
+        self.collect()
+        self.frame_allocated[self.frame_index] = self.allocated
+        self.frame_released[self.frame_index] = self.released
+        self.allocated.fill(0)
+        self.released.fill(0)
+        self.frame_index = (self.frame_index + 1) % len(self.frame_allocated)
+        self.frames += 1
+
+        if self.baseline is None and self.frames >= self.warmup:
+            self.rebase()
+        elif self.check:
+            self.check_growth()
+
+    def rebase(self) -> None:
+        """
+        Take the current live objects as steady state (ex. after resources were created again in a new size)
+        """
+        self.collect()
+        self.baseline = (self.counts(), dict(self.live_bytes))
+
+    def check_growth(self) -> None:
+        """
+        :raise GpuResourceLeak: there are more live objects (or more memory) than in steady state
+        """
+        if self.baseline is None:
+            return
+        counts, memory = self.baseline
+        grown = [f"{kind} {counts[kind]} -> {len(self.live[kind])} ({memory[kind]} -> {self.live_bytes[kind]} bytes)"
+                 for kind in RESOURCE_KINDS
+                 if len(self.live[kind]) > counts[kind] or self.live_bytes[kind] > memory[kind]]
+        if grown:
+            raise GpuResourceLeak(f"GL objects grew after frame {self.warmup}: " + ", ".join(grown))
+
+    def summary(self) -> str:
+        allocated, released = self.recent()
+        return f"{self.total_count} obj {self.total_bytes / 2 ** 20:.1f} MB +{allocated} -{released}"
@@ -0,0 +1,20 @@
+import math
+
+
+def gaussian_weights(steps: int, sigma: float, total: float = 1) -> list[float]:
+    """
+    Weights of one side of the gaussian kernel (weights[0] is for the center)
+    :param steps: how many weights (kernel has 2 * steps - 1 samples)
+    :param sigma: sigma of gaussian (in samples)
+    :param total: sum of all weights of the kernel
+    """
+    weights = [math.exp(-0.5 * (i / sigma) ** 2) for i in range(steps)]
+    weights_sum = weights[0] + 2 * sum(weights[1:])
+    return [weight * total / weights_sum for weight in weights]
+
+
+def scaled_size(size: tuple[int, int], scale: float) -> tuple[int, int]:
+    """
+    Size of the layer which is rendered at the render scale (at least one pixel)
+    """
+    return max(round(size[0] * scale), 1), max(round(size[1] * scale), 1)
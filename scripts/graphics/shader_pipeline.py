@@ -0,0 +1,175 @@
+import array
+import sys
+
+import moderngl
+import pygame
+
+from scripts.graphics.blur import SeparableBlur
+from scripts.graphics.kernels import scaled_size
+from scripts.graphics.texture_pool import TexturePool
+
+# Layers of the composite shader (texture name in frag_shader.glsl) in the order of their texture units
+LAYERS: tuple[str, ...] = ('backgroundTex', 'uiTex', 'buttonsTex', 'shadowTex', 'appShadowTex', 'overlayTex')
+BLUR_UNITS: tuple[int, int] = (len(LAYERS) + 1, len(LAYERS) + 3)  # Background and shadow blur (two units for each)
+
+
+def read_shader(name: str) -> str:
+    with open(f'{sys.path[0]}/scripts/shaders/{name}', 'r') as file:
+        return file.read()
+
+
+class ShaderPipeline:
+    """
+    This class composes layers on GPU: layers are uploaded to pooled textures, background and shadow are blurred
+     (only when they change) and the composite shader (frag_shader.glsl) mixes everything into the current framebuffer.
+    It works with any moderngl context (window of the app or standalone context of benchmarks/shader_pipeline.py).
+    """
+
+    def __init__(self, ctx: moderngl.Context, size: tuple[int, int], background_color: tuple[int, int, int],
+                 background_blur: tuple[list[float], tuple[float, float]],
+                 shadow_blur: tuple[list[float], tuple[float, float]], shadow_gain: float,
+                 render_scale: float = 1.) -> None:
+        """
+        :param background_color: color under transparent background (0-255)
+        :param background_blur: weights and offset of the background blur (see SeparableBlur)
+        :param shadow_blur: weights and offset of the shadow blur
+        :param shadow_gain: strength of the blurred shadow
+        :param render_scale: scale of blurred layers (see set_render_scale)
+        """
+        self.ctx: moderngl.Context = ctx
+        self.size: tuple[int, int] = tuple(size)
+        self.background_blur_kernel: tuple[list[float], tuple[float, float]] = background_blur
+        self.shadow_blur_kernel: tuple[list[float], tuple[float, float]] = shadow_blur
+        self.render_scale: float = render_scale
+
+        # Set shader variables
+        self.quad_buffer = self.ctx.buffer(array.array('f', [
+            # position (x, y)  # texture (u, v)
+            -1.0, 1.0, 0.0, 0.0,  # top left
+            1.0, 1.0, 1.0, 0.0,  # top right
+            -1.0, -1.0, 0.0, 1.0,  # bottom left
+            1.0, -1.0, 1.0, 1.0,  # bottom right
+        ]))
+
+        #  Load shaders (relative path, second shader is compiled when it is used, see second_program)
+        self.vert_shader: str = read_shader('vert_shader.glsl')
+        self.first_program = self.ctx.program(
+            vertex_shader=self.vert_shader,
+            fragment_shader=read_shader('frag_shader.glsl')
+        )
+        self._second_program: moderngl.Program | None = None
+        self.blur_program = self.ctx.program(
+            vertex_shader=self.vert_shader,
+            fragment_shader=read_shader('blur_frag_shader.glsl')
+        )
+        self.render_object = self.ctx.vertex_array(
+            self.first_program,
+            [(self.quad_buffer, '2f 2f', 'vert', 'texcoord')]
+        )
+
+        # Textures are allocated once and stay on fixed units (0 is for second shader)
+        self.texture_pool: TexturePool = TexturePool(self.ctx)
+        for i, key in enumerate(LAYERS):
+            self.texture_pool.add(key, self.size, i + 1)
+            if key in self.first_program:  # Shadow is used only by its blur
+                self.first_program[key] = i + 1
+
+        # Blurred background and shadow (they are blurred again only when their layers change)
+        self.create_blurs()
+        self.first_program['shadowGain'] = shadow_gain
+        self.first_program['backgroundColor'] = tuple(channel / 255 for channel in background_color[:3])
+
+    @property
+    def second_program(self) -> moderngl.Program:
+        """
+        Second shader (Not implemented yet) is compiled and gets its texture only when it is used for the first time
+        """
+        if self._second_program is None:
+            self._second_program = self.ctx.program(
+                vertex_shader=self.vert_shader,
+                fragment_shader=read_shader('second_frag_shader.glsl')
+            )
+            self.texture_pool.add('frame2_tex1', self.size, 0)
+            self._second_program['uiTex'] = 0
+        return self._second_program
+
+    def create_blurs(self) -> None:
+        """
+        Blurred layers are rendered at the render scale (composite shader scales them up with linear filtering)
+        """
+        size = scaled_size(self.size, self.render_scale)
+        self.background_blur: SeparableBlur = SeparableBlur(
+            self.ctx, self.blur_program, self.quad_buffer, size, *self.background_blur_kernel, BLUR_UNITS[0]
+        )
+        self.shadow_blur: SeparableBlur = SeparableBlur(
+            self.ctx, self.blur_program, self.quad_buffer, size, *self.shadow_blur_kernel, BLUR_UNITS[1]
+        )
+        self.first_program['backgroundBlurTex'] = self.background_blur.unit
+        self.first_program['shadowBlurTex'] = self.shadow_blur.unit
+
+        # Smaller blur reads the layer between its pixels (linear filtering keeps every pixel in the result)
+        for key in ('backgroundTex', 'shadowTex'):
+            self.texture_pool.textures[key].filter = (moderngl.LINEAR, moderngl.LINEAR) if self.render_scale < 1 \
+                else (moderngl.NEAREST, moderngl.NEAREST)
+
+    def set_render_scale(self, scale: float) -> None:
+        """
+        Render blurred layers at the new scale (layers must be uploaded again, see mark_dirty)
+        """
+        self.render_scale = scale
+        self.background_blur.release()
+        self.shadow_blur.release()
+        self.create_blurs()
+
+    def mark_dirty(self, name: str, rect: pygame.Rect | None = None) -> None:
+        """
+        Say that the layer was changed (it is uploaded and blurred in the next render)
+        """
+        self.texture_pool.mark_dirty(name, rect)
+        if name == 'uiTex' and self._second_program is not None:
+            self.texture_pool.mark_dirty('frame2_tex1', rect)
+
+    def render(self, layers: dict[str, pygame.Surface], mouse_pos: tuple[float, float],
+               mouse_outside_time: float, upload: callable = None) -> None:
+        """
+        Compose the frame into the current framebuffer
+        :param layers: surface of every layer (only dirty ones are uploaded)
+        :param mouse_pos: mouse position divided by width and height
+        :param mouse_outside_time: how long mouse is outside (in seconds)
+        :param upload: function which uploads one layer (name, surface), ex. measured by profiler
+        """
+        upload = upload if upload is not None else self.texture_pool.upload
+
+        # Upload changed layers (textures and their units are fixed, see __init__)
+        dirty = set(self.texture_pool.dirty.keys())
+        for key, surf in layers.items():
+            upload(key, surf)
+        self.texture_pool.use()
+
+        # Blur only changed layers (composite shader samples the last results)
+        if 'backgroundTex' in dirty:
+            self.background_blur.render(self.texture_pool.units['backgroundTex'])
+        if 'shadowTex' in dirty:
+            self.shadow_blur.render(self.texture_pool.units['shadowTex'])
+
+        # First shader
+        self.first_program['mousePos'] = mouse_pos
+        self.first_program['mouseOutsideTime'] = mouse_outside_time
+
+        self.render_object.render(moderngl.TRIANGLE_STRIP)
+
+        # Second shader (Not implemented yet, its texture exists only after the program is compiled)
+        if self._second_program is not None:
+            upload('frame2_tex1', layers['uiTex'])
+
+    def release(self) -> None:
+        """
+        Free all GPU resources of the pipeline (it must not be used after it)
+        """
+        self.background_blur.release()
+        self.shadow_blur.release()
+        self.texture_pool.release()
+        programs = [self.first_program, self.blur_program] + \
+            ([self._second_program] if self._second_program is not None else [])
+        for resource in [self.render_object, self.quad_buffer] + programs:
+            resource.release()
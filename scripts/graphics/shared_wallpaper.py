@@ -0,0 +1,131 @@
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+import pygame
+
+from scripts.graphics.wallpaper_cache import WallpaperCache
+
+HEADER: struct.Struct = struct.Struct('qii')  # Generation of the wallpaper, width, height
+PIXEL_FORMAT: str = "RGBX"  # 4 bytes per pixel (rows are aligned, blits are fast)
+
+
+def block_name(name: str, generation: int) -> str:
+    """
+    Name of the shared memory block with pixels of one wallpaper generation
+    """
+    return f"{name}_{generation}"
+
+
+def attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Map the existing block without registering it in the resource tracker (on POSIX the tracker would unlink
+     blocks of the launcher when the instance ends). Unregistering after attach is not used: spawned instances share
+     the tracker of the launcher, so it would forget the registration of the launcher itself.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedWallpaperHost:
+    """
+    This class decodes the wallpaper once (in the launcher) and publishes its pixels in shared memory.
+    Header block tells instances which generation is the last one. Every new wallpaper gets a new block,
+     so instances never see half-written pixels (old block is unlinked, mapped copies stay valid).
+    """
+
+    def __init__(self, name: str | None = None) -> None:
+        self.header: shared_memory.SharedMemory = shared_memory.SharedMemory(name, create=True, size=HEADER.size)
+        self.name: str = self.header.name  # Instances attach to the wallpaper by this name
+        HEADER.pack_into(self.header.buf, 0, 0, 0, 0)  # Generation 0 - no wallpaper yet
+        self.generation: int = 0
+        self.block: shared_memory.SharedMemory | None = None  # Pixels of the last generation
+
+    def publish(self, wallpaper: pygame.Surface, display_size: tuple[int, int]) -> None:
+        """
+        Share a new wallpaper (it is stretched over the display once, instances only crop it)
+        :param wallpaper: decoded wallpaper (any size)
+        """
+        image = WallpaperCache.prescale(wallpaper, display_size)
+        width, height = image.get_size()
+        pixels = pygame.image.tobytes(image, PIXEL_FORMAT)
+
+        generation = self.generation + 1
+        block = shared_memory.SharedMemory(block_name(self.name, generation), create=True, size=len(pixels))
+        block.buf[:len(pixels)] = pixels
+        HEADER.pack_into(self.header.buf, 0, generation, width, height)  # Pixels are ready, instances can map them
+
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+        self.block = block
+        self.generation = generation
+
+    def close(self) -> None:
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+        self.header.close()
+        self.header.unlink()
+
+
+class SharedWallpaper:
+    """
+    This class maps the wallpaper of the launcher (see SharedWallpaperHost) as a pygame surface without copying.
+    Instances poll only the header (a few bytes), pixels are mapped when a new generation appears.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.header: shared_memory.SharedMemory = attach(name)
+        self.generation: int = 0  # Generation of the mapped wallpaper (0 - nothing is mapped)
+        self.block: shared_memory.SharedMemory | None = None
+        self.image: pygame.Surface | None = None  # Wallpaper prescaled to the display size (pixels are shared)
+        self.retired: list[shared_memory.SharedMemory] = []  # Old blocks which are still used by surfaces
+
+    def poll(self) -> bool:
+        """
+        Map the new wallpaper if the launcher published it
+        :return: was the wallpaper changed?
+        """
+        self.close_retired()
+        generation, width, height = HEADER.unpack_from(self.header.buf, 0)
+        if generation == self.generation:
+            return False
+        try:
+            block = attach(block_name(self.name, generation))
+        except FileNotFoundError:  # Launcher has already published the next one (it is mapped on the next poll)
+            return False
+
+        if self.block is not None:
+            self.retired.append(self.block)
+        self.block = block
+        self.generation = generation
+        self.image = pygame.image.frombuffer(block.buf[:width * height * 4], (width, height), PIXEL_FORMAT)
+        return True
+
+    def close_retired(self) -> None:
+        """
+        Close old blocks (block can be closed only when no surface uses its pixels)
+        """
+        for block in self.retired[:]:
+            try:
+                block.close()
+                self.retired.remove(block)
+            except BufferError:  # Old surface is still alive
+                pass
+
+    def close(self) -> None:
+        self.image = None
+        if self.block is not None:
+            self.retired.append(self.block)
+            self.block = None
+        self.close_retired()
+        self.header.close()
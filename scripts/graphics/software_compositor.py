@@ -0,0 +1,250 @@
+import functools
+import math
+
+import numpy as np
+import pygame
+
+
+def smooth_step(edge0: float, edge1: float, x: np.ndarray) -> np.ndarray:
+    """
+    GLSL smoothstep
+    """
+    t = np.clip((x - edge0) / (edge1 - edge0), 0., 1.)
+    return t * t * (3. - 2. * t)
+
+
+def surface_to_array(surface: pygame.Surface, rect: pygame.Rect | None = None) -> np.ndarray:
+    """
+    RGBA of the surface (or its part) as float array (channel, y, x) with values from 0 to 1.
+    Channels are separated planes, so operations with alpha do not broadcast over short rows.
+    """
+    if rect is not None:
+        surface = surface.subsurface(rect)
+    array = np.empty((4, surface.get_height(), surface.get_width()), np.float32)
+    array[:3] = pygame.surfarray.pixels3d(surface).transpose(2, 1, 0)
+    array[3] = pygame.surfarray.pixels_alpha(surface).T
+    array *= 1 / 255
+    return array
+
+
+@functools.lru_cache(maxsize=8)
+def interpolation_matrix(old: int, new: int, transposed: bool = False) -> np.ndarray:
+    """
+    Linear interpolation from old to new number of pixels (clamped to the edge) as matrix (new, old)
+    :param transposed: matrix (old, new) for rows of pixels (it is contiguous too)
+    """
+    position = (np.arange(new, dtype=np.float64) + 0.5) * old / new - 0.5
+    first = np.floor(position)
+    mix = position - first
+    first = first.astype(np.intp)
+    matrix = np.zeros((new, old), np.float32)
+    np.add.at(matrix, (np.arange(new), np.clip(first, 0, old - 1)), 1 - mix)
+    np.add.at(matrix, (np.arange(new), np.clip(first + 1, 0, old - 1)), mix)
+    return np.ascontiguousarray(matrix.T) if transposed else matrix
+
+
+def resize(array: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    """
+    Scale the image (channel, y, x) with linear filtering clamped to the edge (like sampling of a smaller
+     texture with GL_LINEAR in the composite shader). Every pixel mixes only two pixels in every direction,
+     but matrix products are faster than gathers.
+    :param size: new size (width, height)
+    """
+    channels, height, width = array.shape
+    rows = (array.reshape(channels * height, width) @ interpolation_matrix(width, size[0], True))  # All rows at once
+    rows = rows.reshape(channels, height, size[0])
+    columns = interpolation_matrix(height, size[1])
+    result = np.empty((channels, size[1], size[0]), np.float32)
+    for channel in range(channels):
+        np.matmul(columns, rows[channel], out=result[channel])
+    return result
+
+
+class CPUBlur:
+    """
+    This class blurs an array in two passes (horizontal, then vertical) like SeparableBlur and blur_frag_shader.glsl.
+    First pass reads the layer texture (nearest pixel, texture repeats), second pass reads the intermediate texture
+     (linear filtering, clamped to the edge). Every sample is the same shift for all pixels, so samples are slices
+     of the padded array (shifts and mixes are computed once).
+    """
+
+    def __init__(self, size: tuple[int, int], weights: list[float], offset: tuple[float, float]) -> None:
+        """
+        :param weights: weights of one side of the kernel (weights[0] is for the center)
+        :param offset: offset between two samples (in uvs, x for horizontal pass and y for vertical pass)
+        """
+        self.size: tuple[int, int] = tuple(size)
+
+        # Horizontal pass: weight of every shift (sample reads the nearest pixel)
+        horizontal: dict[int, float] = {}
+        for i, weight in enumerate(weights[1:], 1):
+            for shift in (i * offset[0] * size[0], -i * offset[0] * size[0]):
+                nearest = math.floor(0.5 + shift)
+                horizontal[nearest] = horizontal.get(nearest, 0.) + weight
+
+        # Vertical pass: weight of every shift (sample mixes two pixels)
+        vertical: dict[int, float] = {}
+        for i, weight in enumerate(weights[1:], 1):
+            for shift in (i * offset[1] * size[1], -i * offset[1] * size[1]):
+                first = math.floor(shift)
+                mix = shift - first
+                vertical[first] = vertical.get(first, 0.) + weight * (1 - mix)
+                if mix > 0:
+                    vertical[first + 1] = vertical.get(first + 1, 0.) + weight * mix
+
+        # Center is the first sample (it does not need padding), other samples are (shift, weight)
+        self.horizontal_center: float = weights[0] + horizontal.pop(0, 0.)
+        self.vertical_center: float = weights[0] + vertical.pop(0, 0.)
+        self.horizontal: list[tuple[int, float]] = sorted(horizontal.items())
+        self.vertical: list[tuple[int, float]] = sorted(vertical.items())
+
+        # How far the blur spreads one pixel (in pixels)
+        self.radius: tuple[int, int] = (max([abs(shift) for shift, _ in self.horizontal], default=0),
+                                        max([abs(shift) for shift, _ in self.vertical], default=0))
+
+    def render(self, array: np.ndarray) -> np.ndarray:
+        """
+        :param array: image (channel, y, x)
+        """
+        width, height = self.size
+        pad_x, pad_y = self.radius
+
+        sample = np.empty_like(array)  # Weighted sample (it is used again for every shift)
+
+        padded = np.concatenate([array[..., -pad_x:], array, array[..., :pad_x]], axis=2) if pad_x else array
+        horizontal = array * self.horizontal_center
+        for shift, weight in self.horizontal:
+            np.multiply(padded[..., pad_x + shift:pad_x + shift + width], weight, out=sample)
+            horizontal += sample
+
+        padded = np.pad(horizontal, ((0, 0), (pad_y, pad_y), (0, 0)), mode='edge')  # Texture is clamped
+        result = horizontal * self.vertical_center
+        for shift, weight in self.vertical:
+            np.multiply(padded[:, pad_y + shift:pad_y + shift + height], weight, out=sample)
+            result += sample
+        return result
+
+
+class SoftwareCompositor:
+    """
+    This class composes app layers on CPU (NumPy) like frag_shader.glsl: background blur, blurred text shadow,
+     edge fade of widgets, mouse fade of buttons and app shadow. Blurred layers, masks and layers which do not
+     depend on widgets are cached, so only changed areas of the screen are composed every frame.
+    Blurs can be smaller than the screen (render scale): layers are scaled down before the blur and the result
+     is scaled up like a texture with linear filtering.
+    """
+    inside_rect: tuple[float, float, float, float] = (0.02, 0.05, 0.96, 0.90)  # Blurred part of the background (uvs)
+
+    def __init__(self, size: tuple[int, int], background_color: tuple[int, int, int], background_blur: CPUBlur,
+                 shadow_blur: CPUBlur, shadow_gain: float) -> None:
+        self.size: tuple[int, int] = tuple(size)
+        self.background_color: np.ndarray = (np.array(background_color, np.float32) / 255)[:, None, None]
+        self.background_blur: CPUBlur = background_blur
+        self.shadow_blur: CPUBlur = shadow_blur
+        self.shadow_gain: float = shadow_gain
+
+        # Coordinates of pixel centers (uvs)
+        self.u: np.ndarray = ((np.arange(size[0], dtype=np.float32) + 0.5) / size[0])[None, :]
+        self.v: np.ndarray = ((np.arange(size[1], dtype=np.float32) + 0.5) / size[1])[:, None]
+
+        # Precomputed masks (edge fade of widgets and blurred part of the background)
+        self.edge_fade: np.ndarray = smooth_step(0.05, 0.2, self.u) * smooth_step(0.95, 0.8, self.u)
+        x, y, width, height = SoftwareCompositor.inside_rect
+        self.inside: np.ndarray = (np.abs(self.u - (x + width / 2)) <= width / 2) & \
+            (np.abs(self.v - (y + height / 2)) <= height / 2)
+
+        # Cached layers (they are computed again only when their surfaces change)
+        self.background: np.ndarray = np.zeros((4, size[1], size[0]), np.float32)  # After blur (color1)
+        self.shadow: np.ndarray = np.zeros((4, size[1], size[0]), np.float32)  # After blur, alpha is faded (color4)
+        self.app_shadow: np.ndarray = np.zeros((4, size[1], size[0]), np.float32)  # With its alpha (color5)
+
+        # Cached intermediates: background with shadow (it is under widgets) and layers over buttons
+        #  (app shadow and background color) as color * over_scale + over_offset
+        self.under: np.ndarray = np.zeros((3, size[1], size[0]), np.float32)
+        self.over_scale: np.ndarray = np.zeros((size[1], size[0]), np.float32)
+        self.over_offset: np.ndarray = np.zeros((3, size[1], size[0]), np.float32)
+        self.is_under_changed: bool = True
+        self.is_over_changed: bool = True
+
+    def blur(self, blur: CPUBlur, surface: pygame.Surface) -> np.ndarray:
+        """
+        Blur the layer at the size of the blur (result has the screen size)
+        """
+        if blur.size == self.size:
+            return blur.render(surface_to_array(surface))
+        return resize(blur.render(surface_to_array(pygame.transform.smoothscale(surface, blur.size))), self.size)
+
+    def set_background(self, surface: pygame.Surface) -> None:
+        background = surface_to_array(surface)
+        blurred = self.background_blur.render(background) if self.background_blur.size == self.size else \
+            self.blur(self.background_blur, surface)
+        blurred = blurred * 0.95 + 0.5 * 0.05  # Mixing pixel with 5% of gray color
+        blurred /= blurred[3]
+        self.background = np.where(self.inside, blurred, background)
+        self.is_under_changed = self.is_over_changed = True
+
+    def set_shadow(self, surface: pygame.Surface) -> None:
+        shadow = self.blur(self.shadow_blur, surface)
+        shadow *= self.shadow_gain
+        shadow[3] *= 0.25 * self.edge_fade
+        self.shadow = shadow
+        self.is_under_changed = True
+
+    def set_app_shadow(self, surface: pygame.Surface) -> None:
+        app_shadow = surface_to_array(surface)
+        app_shadow[3] *= 0.05
+        self.app_shadow = app_shadow
+        self.is_over_changed = True
+
+    def update_cache(self) -> None:
+        if self.is_under_changed:
+            background = self.background[:3]
+            self.under = background + (self.shadow[:3] - background) * self.shadow[3]
+            self.is_under_changed = False
+        if self.is_over_changed:
+            app_shadow_alpha, background_alpha = self.app_shadow[3], self.background[3]
+            self.over_scale = (1. - app_shadow_alpha) * background_alpha
+            self.over_offset = self.app_shadow[:3] * (app_shadow_alpha * background_alpha) + \
+                self.background_color * (1. - background_alpha)
+            self.is_over_changed = False
+
+    def compose(self, target: pygame.Surface, ui: pygame.Surface, buttons: pygame.Surface,
+                buttons_rects: list[pygame.Rect], mouse_pos: tuple[float, float], mouse_outside_time: float,
+                rect: pygame.Rect) -> None:
+        """
+        Compose the area of the screen
+        :param buttons_rects: areas of buttons (buttons layer is empty outside them)
+        :param mouse_pos: mouse position divided by width and height
+        :param mouse_outside_time: how long mouse is outside the app (in seconds)
+        """
+        rect = rect.clip(target.get_rect())
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        self.update_cache()
+        x, y = slice(rect.left, rect.right), slice(rect.top, rect.bottom)
+
+        widgets = surface_to_array(ui, rect)
+        alpha = widgets[3] * self.edge_fade[:, x]
+        color = self.under[:, y, x] + (widgets[:3] - self.under[:, y, x]) * alpha
+
+        # Buttons fade when mouse is far from them (they are invisible when mouse is outside for a long time)
+        time = min(max(mouse_outside_time, 1.), 100.)
+        for button_rect in buttons_rects:
+            button_rect = button_rect.clip(rect)
+            if button_rect.width <= 0 or button_rect.height <= 0:
+                continue
+            button = surface_to_array(buttons, button_rect)
+            bx, by = slice(button_rect.left, button_rect.right), slice(button_rect.top, button_rect.bottom)
+            distance = np.sqrt((self.u[:, bx] - mouse_pos[0]) ** 2 + (self.v[by] - mouse_pos[1]) ** 2)
+            alpha = np.where(button[3] < 0.1, 0., np.clip(1. - distance * 1.5 * time * time, 0., 0.75))
+            part = color[:, button_rect.top - rect.top:button_rect.bottom - rect.top,
+                         button_rect.left - rect.left:button_rect.right - rect.left]
+            part += (button[:3] - part) * alpha
+
+        color *= self.over_scale[y, x]  # App shadow and background color
+        color += self.over_offset[:, y, x]
+
+        color = np.clip(color, 0., 1.)
+        color *= 255
+        color += 0.5
+        pygame.surfarray.pixels3d(target)[x, y] = color.astype(np.uint8).transpose(2, 1, 0)
@@ -0,0 +1,95 @@
+import moderngl
+import pygame
+
+
+class TexturePool:
+    """
+    This class keeps moderngl textures alive between frames (no allocation per frame) and uploads a texture only
+    when the pygame surface behind it was changed. Uploads go through two pixel buffers per texture (one is written
+    by CPU while the driver still reads another one), so CPU never waits for GPU.
+    """
+
+    def __init__(self, ctx: moderngl.Context) -> None:
+        self.ctx: moderngl.Context = ctx
+
+        self.textures: dict[str, moderngl.Texture] = {}  # All textures by name
+        self.units: dict[str, int] = {}  # Texture unit of every texture (fixed)
+        self.pixel_buffers: dict[str, list[moderngl.Buffer]] = {}  # Two pixel buffers for every texture
+        self.buffer_index: dict[str, int] = {}  # Which pixel buffer will be used for the next upload
+        self.dirty: dict[str, pygame.Rect] = {}  # Textures which must be uploaded again (with changed area)
+
+    def add(self, name: str, size: tuple[int, int], unit: int) -> moderngl.Texture:
+        """
+        Allocate texture (and its pixel buffers) once and bind it to the fixed texture unit
+        :param name: texture name (ex. uniform name in shader)
+        :param size: texture size (width, height)
+        :param unit: texture unit
+        :return: texture
+        """
+        tex = self.ctx.texture(size, 4)
+        tex.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        tex.swizzle = 'BGRA'
+        tex.use(unit)
+
+        byte_size = size[0] * size[1] * 4
+        self.textures[name] = tex
+        self.units[name] = unit
+        self.pixel_buffers[name] = [self.ctx.buffer(reserve=byte_size, dynamic=True) for _ in range(2)]
+        self.buffer_index[name] = 0
+        self.dirty[name] = pygame.Rect((0, 0), size)  # First upload is always needed
+        return tex
+
+    def mark_dirty(self, name: str, rect: pygame.Rect | None = None) -> None:
+        """
+        Say that surface behind texture was changed
+        :param name: texture name
+        :param rect: changed area (None - whole texture)
+        """
+        if rect is None:
+            rect = pygame.Rect((0, 0), self.textures[name].size)
+        self.dirty[name] = self.dirty[name].union(rect) if name in self.dirty else rect.copy()
+
+    def upload(self, name: str, surf: pygame.Surface) -> bool:
+        """
+        Write surface to the texture (only if it was marked as dirty)
+        :return: was texture uploaded?
+        """
+        if name not in self.dirty:
+            return False
+        rect = self.dirty.pop(name)
+
+        buffers = self.pixel_buffers[name]
+        buffer = buffers[self.buffer_index[name]]
+        self.buffer_index[name] = (self.buffer_index[name] + 1) % len(buffers)
+
+        buffer.orphan()  # Driver gives a new memory if old one is still in use (no waiting)
+        if rect.size == surf.get_size():
+            buffer.write(surf.get_view('1'))
+        else:  # Only changed area is sent
+            buffer.write(surf.subsurface(rect).copy().get_view('1'))
+        # Copy from pixel buffer to texture (on GPU side)
+        self.textures[name].write(buffer, viewport=(rect.x, rect.y, rect.width, rect.height))
+        return True
+
+    def use(self) -> None:
+        """
+        Bind all textures to their units
+        """
+        for name, tex in self.textures.items():
+            tex.use(self.units[name])
+
+    def release(self) -> None:
+        """
+        Release all textures and pixel buffers
+        """
+        for tex in self.textures.values():
+            tex.release()
+        for buffers in self.pixel_buffers.values():
+            for buffer in buffers:
+                buffer.release()
+
+        self.textures = {}
+        self.units = {}
+        self.pixel_buffers = {}
+        self.buffer_index = {}
+        self.dirty = {}
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class WallpaperCache:
+    """
+    This class keeps the wallpaper prescaled to the display size and remembers last window-sized crops of it,
+    so moving the window never rescales the full-resolution image
+    """
+
+    def __init__(self, window_size: tuple[int, int], max_crops: int = 32) -> None:
+        self.window_size: tuple[int, int] = tuple(window_size)  # Size of one crop
+        self.max_crops: int = max_crops  # How many crops are remembered
+
+        self.image: pygame.Surface | None = None  # Wallpaper prescaled to the display size
+        self.fallback: pygame.Surface | None = None  # Whole wallpaper scaled to the window (if crop is outside)
+        self.identity: int = 0  # Changes every time when a new wallpaper is set
+        self.crops: OrderedDict[tuple, pygame.Surface] = OrderedDict()  # Crops (from old to recently used)
+
+        self.hits: int = 0  # How many crops were taken from cache
+        self.misses: int = 0  # How many crops were made
+
+    @staticmethod
+    def build_mip_chain(image: pygame.Surface, size: tuple[int, int]) -> list[pygame.Surface]:
+        """
+        Halve image while it is at least two times bigger than size (smooth scaling with small steps keeps
+        quality and every step is cheaper than the previous one)
+        :return: all levels (from the original image to the smallest one)
+        """
+        if image.get_bitsize() < 24:  # Smooth scale works only with 24 and 32 bits images
+            converted = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+            converted.blit(image, [0, 0])
+            image = converted
+
+        chain = [image]
+        while chain[-1].get_width() >= size[0] * 2 and chain[-1].get_height() >= size[1] * 2:
+            width, height = chain[-1].get_size()
+            chain.append(pygame.transform.smoothscale(chain[-1], [width // 2, height // 2]))
+        return chain
+
+    @staticmethod
+    def prescale(wallpaper: pygame.Surface, display_size: tuple[int, int]) -> pygame.Surface:
+        """
+        Stretch the wallpaper over the display (image which already has the display size is not changed)
+        :param display_size: size of the display (wallpaper size is used if it is unknown)
+        """
+        if display_size[0] <= 0 or display_size[1] <= 0:  # Display size is unknown
+            display_size = wallpaper.get_size()
+
+        image = WallpaperCache.build_mip_chain(wallpaper, display_size)[-1]
+        if image.get_size() != tuple(display_size):
+            image = pygame.transform.smoothscale(image, display_size)
+        return image
+
+    def set_wallpaper(self, wallpaper: pygame.Surface, display_size: tuple[int, int]) -> None:
+        """
+        Set a new wallpaper (old crops are forgotten)
+        :param wallpaper: decoded wallpaper (any size)
+        :param display_size: size of the display (wallpaper is stretched over it)
+        """
+        image = self.prescale(wallpaper, display_size)
+        self.set_prescaled(image, pygame.transform.smoothscale(image, self.window_size))
+
+    def set_prescaled(self, image: pygame.Surface, fallback: pygame.Surface) -> None:
+        """
+        Set a new wallpaper which is already scaled (ex. by WallpaperLoader in the worker)
+        :param image: wallpaper with the display size
+        :param fallback: whole wallpaper with the window size
+        """
+        self.image = image
+        self.fallback = fallback
+        self.identity += 1
+        self.crops.clear()
+
+    def get(self, screen_pos: tuple[int, int], is_windowless: bool) -> pygame.Surface | None:
+        """
+        Get a part of the wallpaper behind the window
+        :param screen_pos: position of the window on the screen
+        :param is_windowless: does the app have borders?
+        :return: window-sized surface (None if there is no wallpaper)
+        """
+        if self.image is None:
+            return None
+
+        key = (tuple(screen_pos), is_windowless, self.identity)
+        if key in self.crops:
+            self.hits += 1
+            self.crops.move_to_end(key)
+            return self.crops[key]
+
+        self.misses += 1
+        pos_x, pos_y = screen_pos
+        if not is_windowless:  # Skip window borders
+            pos_x += 10
+            pos_y += 30
+
+        rect = pygame.Rect(pos_x, pos_y, self.window_size[0], self.window_size[1])
+        if self.image.get_rect().contains(rect):
+            crop = self.image.subsurface(rect).copy()  # Image has the display scale, so crop is not scaled
+        else:
+            crop = self.fallback
+
+        self.crops[key] = crop
+        if len(self.crops) > self.max_crops:
+            self.crops.popitem(last=False)  # Forget the least recently used crop
+        return crop
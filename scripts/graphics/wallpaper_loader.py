@@ -0,0 +1,102 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pygame
+
+from scripts.graphics.wallpaper_cache import WallpaperCache
+
+WALLPAPER_LOADED: int = pygame.event.custom_type()  # Event which is posted when a new wallpaper is decoded
+
+
+class LoadedWallpaper:
+    """
+    Wallpaper decoded and scaled by the worker (it is never changed after creating)
+    """
+    __slots__ = ('path', 'image', 'fallback')
+
+    def __init__(self, path: str, image: pygame.Surface, fallback: pygame.Surface) -> None:
+        self.path: str = path
+        self.image: pygame.Surface = image  # Prescaled to the display size
+        self.fallback: pygame.Surface = fallback  # Whole wallpaper scaled to the window
+
+
+class WallpaperLoader:
+    """
+    This class decodes and scales the wallpaper in the worker thread, so the frame never waits for the file.
+    Only the last requested wallpaper is kept (older results are dropped), the main loop takes it when it is ready.
+    The file is watched by its modification time and size (stat is cheap, it can be called from a timer).
+    """
+
+    def __init__(self, window_size: tuple[int, int]) -> None:
+        self.window_size: tuple[int, int] = tuple(window_size)
+        self.executor: ThreadPoolExecutor | None = None  # Worker starts on the first load
+        self.lock: threading.Lock = threading.Lock()
+        self.generation: int = 0  # Id of the last request (results of older requests are dropped)
+        self.ready: LoadedWallpaper | None = None  # Decoded wallpaper which is not taken yet
+        self.future: Future | None = None
+        self.file_state: tuple[str, int, int] | None = None  # Path, modification time (in ns) and size of the file
+
+    @staticmethod
+    def stat(path: str) -> tuple[str, int, int] | None:
+        try:
+            info = os.stat(path)
+        except OSError:  # File does not exist (yet)
+            return None
+        return path, info.st_mtime_ns, info.st_size
+
+    def is_file_changed(self, path: str) -> bool:
+        """
+        Is the file different from the last loaded one (path, modification time or size)?
+        """
+        return self.stat(path) != self.file_state
+
+    def load(self, path: str, display_size: tuple[int, int]) -> Future | None:
+        """
+        Start loading the wallpaper (it returns immediately, old wallpaper is shown until the new one is ready)
+        :return: future of the work (None if there is no file)
+        """
+        file_state = self.stat(path) if path else None
+        if file_state is None:
+            return None
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            self.file_state = file_state
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wallpaper")
+        self.future = self.executor.submit(self.decode, generation, path, tuple(display_size))
+        return self.future
+
+    def decode(self, generation: int, path: str, display_size: tuple[int, int]) -> LoadedWallpaper | None:
+        """
+        Decode and scale the wallpaper (it is called in the worker)
+        """
+        try:
+            image = WallpaperCache.prescale(pygame.image.load(path), display_size)
+        except (pygame.error, OSError):  # Broken or half-written file (it is loaded again when it changes)
+            return None
+        loaded = LoadedWallpaper(path, image, pygame.transform.smoothscale(image, self.window_size))
+
+        with self.lock:
+            if generation != self.generation:  # Newer wallpaper was requested meanwhile
+                return None
+            self.ready = loaded
+        if pygame.display.get_init():  # Wake up the main loop
+            pygame.event.post(pygame.event.Event(WALLPAPER_LOADED, path=path))
+        return loaded
+
+    def take(self) -> LoadedWallpaper | None:
+        """
+        Decoded wallpaper (only once, then None until the next one is ready)
+        """
+        if self.ready is None:  # Checked without the lock (it is called every frame)
+            return None
+        with self.lock:
+            loaded, self.ready = self.ready, None
+        return loaded
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,99 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+
+import pygame
+
+import scripts.settings as s
+from scripts.functionality.platform_info import PLATFORM_INFO, PlatformInfo
+from scripts.graphics.shared_wallpaper import SharedWallpaperHost
+
+
+def run_instance(index: int, wallpaper_name: str, locations: list[str], window_pos: tuple[int, int]) -> None:
+    """
+    Main loop of one widget window (it is run in a new process)
+    :param index: number of the window
+    :param wallpaper_name: name of the shared wallpaper (see SharedWallpaperHost)
+    :param locations: weather locations of this window
+    """
+    os.environ['SDL_VIDEO_WINDOW_POS'] = f"{window_pos[0]},{window_pos[1]}"
+    s.SHARED_WALLPAPER_NAME = wallpaper_name
+    if s.FRAME_SNAPSHOT_PATH:  # Every window shows its own last frame
+        root, extension = os.path.splitext(s.FRAME_SNAPSHOT_PATH)
+        s.FRAME_SNAPSHOT_PATH = f"{root}_{index}{extension}"
+    s.WEATHER_LOCATIONS = locations
+    s.PLATFORM_POLL_INTERVAL = 0  # Launcher polls the platform for all windows
+
+    from scripts.app import create_app
+    app = create_app()
+    while True:
+        app.update()
+
+
+class Launcher:
+    """
+    This class starts several widget windows (one per location) from one process.
+    Wallpaper is decoded and scaled only here, windows map its pixels from shared memory (memory does not grow
+     with every window). Launcher polls the platform and publishes a new wallpaper for all windows at once.
+    """
+
+    def __init__(self, instances: int, locations: list[str] = None, platform: PlatformInfo = PLATFORM_INFO) -> None:
+        self.instances: int = max(instances, 1)
+        self.locations: list[str] = list(locations if locations is not None else s.WEATHER_LOCATIONS)
+        self.platform: PlatformInfo = platform
+        self.context = multiprocessing.get_context('spawn')  # Windows do not inherit pygame state of the launcher
+        self.host: SharedWallpaperHost = SharedWallpaperHost()
+        self.processes: list[multiprocessing.Process] = []
+
+    def instance_locations(self, index: int) -> list[str]:
+        """
+        Locations of the window (locations are split between windows, every window has at least one)
+        """
+        return self.locations[index::self.instances] or [self.locations[index % len(self.locations)]]
+
+    def window_pos(self, index: int) -> tuple[int, int]:
+        """
+        Windows are placed in a column
+        """
+        return s.LAUNCHER_WINDOW_GAP, s.LAUNCHER_WINDOW_GAP + index * (s.SIZE[1] + s.LAUNCHER_WINDOW_GAP)
+
+    def publish_wallpaper(self) -> bool:
+        """
+        Decode the wallpaper and share it with all windows
+        :return: was the wallpaper published?
+        """
+        path = self.platform.wallpaper_path
+        if not path or not os.path.isfile(path):  # Platform does not know the wallpaper
+            return False
+        self.host.publish(pygame.image.load(path), self.platform.display_size)
+        return True
+
+    def start(self) -> None:
+        self.publish_wallpaper()  # Windows see the wallpaper in their first frame
+        for i in range(self.instances):
+            process = self.context.Process(target=run_instance, name=f"{s.NAME} {i}",
+                                           args=(i, self.host.name, self.instance_locations(i), self.window_pos(i)))
+            process.start()
+            self.processes.append(process)
+
+    def run(self) -> None:
+        """
+        Start windows and wait until all of them are closed (the platform is polled meanwhile)
+        """
+        self.start()
+        timeout = s.PLATFORM_POLL_INTERVAL / 1000 if s.PLATFORM_POLL_INTERVAL > 0 else None
+        try:
+            while self.processes:
+                closed = multiprocessing.connection.wait([process.sentinel for process in self.processes], timeout)
+                self.processes = [process for process in self.processes if process.sentinel not in closed]
+                if not closed and {'display', 'wallpaper'} & set(self.platform.refresh()):  # Wallpaper was changed
+                    self.publish_wallpaper()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        for process in self.processes:
+            process.terminate()
+            process.join()
+        self.processes = []
+        self.host.close()
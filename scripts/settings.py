@@ -1,6 +1,50 @@
+import os
+
 SIZE = [420, 140]  # [width, height]
 NAME = "Empty Pygame Project"  # Name of the window
-FPS = 0  # 0 - unlimited
+FPS = 60  # Frame rate while something is animated (0 - unlimited)
+IDLE_FPS = 10  # Frame rate while nothing is animated, but mouse is inside the app
+POWER_MODE = "auto"  # "normal", "low" (low power preset) or "auto" (low power on battery)
+RENDER_SCALE = 1.0  # Resolution of blurred layers (background and shadow) relative to the window (0.1 - 1)
+LOW_POWER_RENDER_SCALE = 0.5  # Render scale in low power mode
+LOW_POWER_FPS = 30  # Frame rate while something is animated in low power mode
+LOW_POWER_IDLE_FPS = 5  # Frame rate while nothing is animated in low power mode
+MOUSE_FADE_TIME = 5000  # How long buttons fade after mouse leaves the app (in ms)
+WALLPAPER_CACHE_SIZE = 32  # How many wallpaper crops (for different window positions) are remembered
+PLATFORM_POLL_INTERVAL = 10000  # How often display size and wallpaper are checked in background (in ms, 0 - never)
+WALLPAPER_FILE_POLL_INTERVAL = 2000  # How often the wallpaper file is checked for changes (in ms, 0 - never)
+WALLPAPER_FADE_DURATION = 400  # Cross-fade between the old and the new wallpaper (in ms)
+SHARED_WALLPAPER_NAME = ""  # Shared memory with the wallpaper of the launcher ("" - app decodes wallpaper itself)
+SHARED_WALLPAPER_POLL_INTERVAL = 500  # How often instance checks if launcher has a new wallpaper (in ms)
+LAUNCHER_WINDOW_GAP = 10  # Space between windows started by the launcher (in pixels)
+WEATHER_API_URL = "https://api.openweathermap.org/data/2.5"  # Openweathermap API
+WEATHER_API_KEY = os.environ.get("OPENWEATHERMAP_API_KEY", "")  # Without key weather is not requested
+WEATHER_LOCATIONS = ["London", "Warsaw"]  # One weather widget for every location
+WEATHER_FORECAST_POINTS = 0  # Points of the temperature forecast line on the widget (0 - forecast is not requested)
+WEATHER_FORECAST_HOURS = 24  # How far the forecast line goes (in hours)
+TEMPERATURE_UNIT = "°C"  # "°C", "°F" or "K"
+WEATHER_REFRESH_INTERVAL = 600000  # How often weather is requested (in ms)
+WEATHER_CACHE_TTL = 300  # How long response is fresh if server does not say (in seconds)
+WEATHER_BACKOFF_BASE = 2000  # Delay after the first failed request (in ms, it is doubled after every failure)
+WEATHER_BACKOFF_MAX = 300000  # Maximal delay after failed requests (in ms)
+FORECAST_STORE_PATH = os.path.join(os.path.expanduser("~"), ".weather_widget", "forecasts.sqlite3")  # Last weather
+FORECAST_STORE_RETENTION = 48  # How many records are kept for one location
+FORECAST_STORE_MAX_AGE = 7 * 24 * 3600  # Older records are removed (in seconds)
+FRAME_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".weather_widget", "last_frame.bmp")  # "" - disabled
+FRAME_SNAPSHOT_INTERVAL = 30000  # How often the shown frame is saved if it was changed (in ms)
+WIDGET_CACHE_SIZE = 4  # How many off-screen widgets are kept (others are created again when they are shown)
+HIT_GRID_CELL_SIZE = 32  # Size of cells of the grid which finds buttons and widgets under the mouse (in pixels)
+TEXT_CACHE_SIZE = 4 * 1024 * 1024  # Memory limit of rendered texts (in bytes)
+PROFILER_ENABLED = True  # Measure time of every frame stage (see overlay on [F] and trace file on [T])
+PROFILER_HISTORY = 240  # How many last frames are used for percentiles
+PROFILER_EVENTS = 8192  # How many last measured sections are written to the trace file
+PROFILER_OVERLAY_INTERVAL = 250  # How often profiler overlay is changed (in ms)
+PROFILER_TRACE_PATH = "frame_trace.json"  # Trace file (Chrome trace format)
+GPU_RESOURCES_CHECK = False  # Raise an error when GL objects grow after the warmup (debug, see gpu_resources.py)
+GPU_RESOURCES_WARMUP = 120  # Frames after which the number of GL objects must stay the same
+INPUT_RECORD_PATH = ""  # Input of every frame is written to this file ("" - not recorded, see benchmarks/replay.py)
+BACKGROUND_BLUR_STRENGTH = 0.212  # Sum of background blur weights (the less it is, the more gray is in the blur)
+SHADOW_BLUR_WEIGHTS = [0.227027, 0.1945946, 0.1216216, 0.054054, 0.016216]  # Weights of text shadow blur
 COLORS = {
     "background": (164, 221, 215)  # Background color
 }
\ No newline at end of file
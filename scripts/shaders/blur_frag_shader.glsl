@@ -0,0 +1,21 @@
+#version 330 core
+
+// One pass of the separable blur (horizontal or vertical, it depends on direction)
+uniform sampler2D sourceTex;
+uniform vec2 direction;  // Offset between two samples (in uvs)
+uniform float weights[8];  // Precomputed weights (weights[0] is for the center)
+uniform int steps;  // How many weights are used
+
+in vec2 uvs;
+out vec4 color;
+
+void main() {
+    vec4 result = texture(sourceTex, uvs) * weights[0];
+
+    for (int i = 1; i < steps; ++i) {
+        result += texture(sourceTex, uvs + direction * float(i)) * weights[i];
+        result += texture(sourceTex, uvs - direction * float(i)) * weights[i];
+    }
+
+    color = result;
+}
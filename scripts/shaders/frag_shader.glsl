@@ -3,14 +3,16 @@
 uniform sampler2D backgroundTex;
 uniform sampler2D uiTex;
 uniform sampler2D buttonsTex;
-uniform sampler2D shadowTex;
 uniform sampler2D appShadowTex;
+uniform sampler2D overlayTex;  // Profiler overlay (on top of everything, without edge fade)
+uniform sampler2D backgroundBlurTex;  // Background after separable blur (it is blurred only when it changes)
+uniform sampler2D shadowBlurTex;  // Shadow after separable blur
 
 //uniform float time;
 uniform vec3 backgroundColor;
-uniform vec2 resolution;
 uniform vec2 mousePos;
 uniform float mouseOutsideTime;
+uniform float shadowGain;  // Sum of the old cross blur weights (keeps the same shadow strength)
 
 //uniform vec2 resolution;
 //uniform vec2 cameraPos;
@@ -19,15 +21,6 @@ uniform float mouseOutsideTime;
 in vec2 uvs;
 out vec4 color;
 
-const int samples = 15,
-            LOD = 1,
-            sLOD = 1 << LOD;
-const float sigma = float(samples) * .25;
-
-float gaussian(vec2 i) {
-    return exp( -.5* dot(i/=sigma,i) ) / ( 6.28 * sigma*sigma );
-}
-
 float smoothTransition(float value, float alpha) {
     // Smooth transition from 0 to 1 between 0.15 and 0.3
     float lowerTransition = smoothstep(0.05, 0.2, value);
@@ -39,11 +32,7 @@ float smoothTransition(float value, float alpha) {
     return lowerTransition * upperTransition * alpha;
 }
 
-vec4 blur(sampler2D sp, vec2 U, vec2 scale, int samples, int LOD) {
-    int sLOD = 1 << LOD;
-    vec4 O = vec4(0);
-    int s = samples/sLOD;
-
+vec4 blur(sampler2D sp, sampler2D blurred, vec2 U) {
     // Define the rounded rectangle parameters
     vec2 rectSize = vec2(0.96, 0.90);  // Size of the rectangle (width, height)
     vec2 rectPos = vec2(0.02, 0.05);   // Position of the bottom-left corner
@@ -55,18 +44,14 @@ vec4 blur(sampler2D sp, vec2 U, vec2 scale, int samples, int LOD) {
     // Determine if the pixel is inside the rounded rectangle
     float inside = step(max(cornerDist.x, cornerDist.y), 0.0) + step(length(max(cornerDist, 0.0)), radius);
 
-    for ( int i = 0; i < s*s; i++ ) {
-        vec2 d = vec2(i%s, i/s)*float(sLOD) - float(samples)/2.;
-        if (inside < 1.0) {
-            // Just copy the pixel if it's on the edge
-            return textureLod( sp, U, float(LOD) );
-        }
-        else {
-            O += gaussian(d) * textureLod( sp, U + scale * d , float(LOD) );
-        }
-
+    if (inside < 1.0) {
+        // Just copy the pixel if it's on the edge
+        return texture(sp, U);
     }
 
+    // Blurred pixel was computed in the blur passes
+    vec4 O = texture(blurred, U);
+
     // Mixing pixel with 5% of gray color
     O = mix(O, vec4(.5), 0.05);
 
@@ -87,28 +72,13 @@ vec4 mouseDist(sampler2D sp, vec2 U, vec2 mousePos) {
     return vec4(texture(sp, U).rgb, dist);
 }
 
-vec4 blur2(sampler2D sp, vec2 U, float offset, int steps) {
-    float weights[5] = float[](0.227027, 0.1945946, 0.1216216, 0.054054, 0.016216);
-    vec4 result = vec4(0.0);
-
-    for (int i = 0; i < steps; ++i) {
-        result += texture(sp, U + vec2(0.0, offset * i)) * weights[i];
-        result += texture(sp, U + vec2(0.0, -offset * i)) * weights[i];
-        result += texture(sp, U + vec2(offset * i, 0.0)) * weights[i];
-        result += texture(sp, U + vec2(-offset * i, 0.0)) * weights[i];
-    }
-
-    return result;
-}
-
-
 void main() {
     // Getting colors from textures
-    vec4 color1 = blur(backgroundTex, uvs, 1./resolution, 15, 1);
+    vec4 color1 = blur(backgroundTex, backgroundBlurTex, uvs);
     vec4 color2 = texture(uiTex, uvs);
     vec4 color3 = mouseDist(buttonsTex, uvs, mousePos);
 
-    vec4 color4 = blur2(shadowTex, uvs, 0.006, 5);
+    vec4 color4 = texture(shadowBlurTex, uvs) * shadowGain;
     color4.a = 0.25 * color4.a;
     // x value as a smooth transition
     vec4 color5 = texture(appShadowTex, uvs);
@@ -130,6 +100,9 @@ void main() {
 
     // Adding background color
     color = mix(color, vec4(backgroundColor, 1.0), 1.0 - color1.a);
+
+    vec4 color6 = texture(overlayTex, uvs);
+    color = mix(color, color6, color6.a);
 }
 
 
@@ -0,0 +1,17 @@
+import importlib
+import sys
+
+
+def import_pygame() -> None:
+    """
+    Import pygame without pkg_resources (it is the slowest part of the import, ~100 ms). Pygame uses it only to
+     find its own data files, which are found next to the package without it.
+    It must be called before any module imports pygame.
+    """
+    if 'pygame' in sys.modules or 'pkg_resources' in sys.modules:  # Too late or it is used anyway
+        return
+    sys.modules['pkg_resources'] = None  # Import of it fails at once
+    try:
+        importlib.import_module('pygame')  # Only the import itself is needed
+    finally:
+        del sys.modules['pkg_resources']  # Other modules can import it later
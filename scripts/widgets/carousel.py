@@ -0,0 +1,85 @@
+from collections import OrderedDict
+
+import pygame
+
+from scripts.animations.timeline import TIMELINE, Timeline
+from scripts.settings import SIZE
+from scripts.widgets.weather_widget import WeatherWidget
+from scripts.widgets.widget import Widget
+
+
+class WidgetDescriptor:
+    """
+    Class WidgetDescriptor - lightweight description of the widget (the widget is created only when it is needed)
+    """
+    __slots__ = ('name', 'location')
+
+    def __init__(self, name: str, location: str = "") -> None:
+        self.name: str = name
+        self.location: str = location
+
+    def create(self, pos: list[float], timeline: Timeline) -> Widget:
+        return WeatherWidget(self.name, pos, self.location, timeline)
+
+
+class WidgetCarousel:
+    """
+    Class WidgetCarousel - list of widgets which creates widgets lazily (widgets[i] creates the widget on the first
+     use). Only visible or moving widgets are updated and drawn, off-screen widgets are released over the budget
+     (from the least recently shown). The first created widget is shown, next widgets wait outside the screen.
+    """
+    hidden_pos: list[float] = [500, 0]  # Position of new widgets which are not shown yet
+
+    def __init__(self, descriptors: list[WidgetDescriptor], max_hidden: int, timeline: Timeline = TIMELINE) -> None:
+        self.descriptors: list[WidgetDescriptor] = descriptors
+        self.max_hidden: int = max_hidden  # How many off-screen widgets are kept
+        self.timeline: Timeline = timeline
+        self.instances: OrderedDict[int, Widget] = OrderedDict()  # Created widgets (from old to recently shown)
+        self.bounds: pygame.Rect = pygame.Rect((0, 0), SIZE)  # Visible area
+
+    def __len__(self) -> int:
+        return len(self.descriptors)
+
+    def __getitem__(self, index: int) -> Widget:
+        index %= len(self.descriptors)
+        if index not in self.instances:
+            pos = [0, 0] if not self.instances else list(WidgetCarousel.hidden_pos)
+            self.instances[index] = self.descriptors[index].create(pos, self.timeline)
+        return self.instances[index]
+
+    def created(self) -> list[Widget]:
+        """
+        All created widgets
+        """
+        return list(self.instances.values())
+
+    def is_visible(self, widget: Widget) -> bool:
+        """
+        Is the widget on the screen (or was in the last frame, or moves)?
+        """
+        return widget.is_animation_started or widget.last_rect.colliderect(self.bounds) or \
+            widget.get_rect().colliderect(self.bounds)
+
+    def visible(self) -> list[Widget]:
+        """
+        Widgets which must be updated and drawn (they become recently used)
+        """
+        widgets = []
+        for index, widget in list(self.instances.items()):
+            if self.is_visible(widget):
+                self.instances.move_to_end(index)
+                widgets.append(widget)
+        return widgets
+
+    def trim(self) -> list[Widget]:
+        """
+        Release the least recently shown off-screen widgets over the budget
+        :return: released widgets
+        """
+        hidden = [index for index, widget in self.instances.items() if not self.is_visible(widget)]
+        released = []
+        for index in hidden[:max(len(hidden) - self.max_hidden, 0)]:
+            widget = self.instances.pop(index)
+            widget.release()
+            released.append(widget)
+        return released
@@ -1,22 +1,73 @@
+import numpy as np
+
+from scripts import settings
+from scripts.functionality.measurements import TEMPERATURE, ForecastSeries, convert
+from scripts.functionality.weather_api import WEATHER_CLIENT, WeatherSnapshot
 from scripts.UI.text import Text
 from scripts.widgets.widget import Widget
-from scripts.animations import timing_functions
+from scripts.animations.timeline import TIMELINE, Timeline
 
 from scripts.settings import SIZE
 import pygame
 
 
 class WeatherWidget(Widget):
-    def __init__(self, name, pos) -> None:
-        super().__init__(name, pos)
+    forecast_rect: pygame.Rect = pygame.Rect(SIZE[0] * 0.56, SIZE[1] * 0.8, SIZE[0] * 0.26, SIZE[1] * 0.12)  # Line
+
+    def __init__(self, name, pos, location: str = "", timeline: Timeline = TIMELINE) -> None:
+        super().__init__(name, pos, timeline)
+        self.location: str = location
+        self.snapshot: WeatherSnapshot | None = WEATHER_CLIENT.get_snapshot(location)  # Drawn weather
+        self.text: str = self.temperature_text()  # Text is made only when weather changes
+        self.forecast: ForecastSeries | None = WEATHER_CLIENT.get_forecast(location)  # Drawn forecast
+
+    def temperature_text(self) -> str:
+        if self.snapshot is None:  # Weather is unknown yet
+            return f"--{settings.TEMPERATURE_UNIT}"
+        temperature = convert(self.snapshot.temperature, TEMPERATURE.CELSIUS, settings.TEMPERATURE_UNIT)
+        return f"{round(temperature)}{settings.TEMPERATURE_UNIT}"
+
+    def forecast_line(self) -> list[list[float]] | None:
+        """
+        Points of the temperature forecast line (values are resampled and scaled to pixels with whole arrays)
+        """
+        if self.forecast is None or len(self.forecast) < 2 or settings.WEATHER_FORECAST_POINTS < 2:
+            return None
+        start = self.forecast.time[0]
+        points = self.forecast.resample(settings.WEATHER_FORECAST_POINTS, start,
+                                        min(start + settings.WEATHER_FORECAST_HOURS * 3600, self.forecast.time[-1]))
+        temperature = points.temperature
+        if np.isnan(temperature).any():
+            return None
 
-    def draw(self, widget_screen: pygame.Surface, shadow_screen: pygame.Surface) -> None:
-        pygame.draw.circle(widget_screen, [255, 230, 0], [self.pos[0] + SIZE[0] * 0.28, self.pos[1] + SIZE[1] // 2], 50)
-        Text("18°C", [0, 0, 0], 100).print(shadow_screen, [self.pos[0] + SIZE[0] * 0.66 + 3, self.pos[1] + SIZE[1] // 2 + 9], center=True)
-        Text("18°C", [255, 255, 255], 100).print(widget_screen, [self.pos[0] + SIZE[0] * 0.66, self.pos[1] + SIZE[1] // 2 + 8], center=True)
+        rect = WeatherWidget.forecast_rect
+        x = rect.x + np.linspace(1, rect.width - 2, len(temperature))
+        span = float(np.ptp(temperature)) or 1.
+        y = rect.bottom - 2 - (temperature - temperature.min()) / span * (rect.height - 4)
+        return np.column_stack([x, y]).tolist()
+
+    def render(self, content: pygame.Surface, shadow: pygame.Surface) -> None:
+        text = self.text
+        pygame.draw.circle(content, [255, 230, 0], [SIZE[0] * 0.28, SIZE[1] // 2], 50)
+        Text(text, [0, 0, 0], 100).print(shadow, [SIZE[0] * 0.66 + 3, SIZE[1] // 2 + 9], center=True)
+        Text(text, [255, 255, 255], 100).print(content, [SIZE[0] * 0.66, SIZE[1] // 2 + 8], center=True)
+        line = self.forecast_line()
+        if line is not None:
+            pygame.draw.lines(content, [255, 255, 255], False, line, 2)
 
     def start_animation(self, max_time: int, animation_type: int, start_after: int = 0):
         super().start_animation(max_time, animation_type, start_after)
 
     def update(self, dt: int):
         super().update(dt)
+
+        snapshot = WEATHER_CLIENT.get_snapshot(self.location)  # Never waits for the network
+        if snapshot is not self.snapshot:  # New data (widget must be redrawn)
+            self.snapshot = snapshot
+            self.text = self.temperature_text()
+            self.invalidate()
+
+        forecast = WEATHER_CLIENT.get_forecast(self.location)
+        if forecast is not self.forecast:
+            self.forecast = forecast
+            self.invalidate()
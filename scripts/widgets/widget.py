@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
 import pygame
 
-from scripts.animations import timing_functions
+from scripts.animations.timeline import EASING, TIMELINE, Timeline, Track
+from scripts.graphics.damage import Damage
 from scripts.settings import SIZE
 
 
@@ -14,55 +16,124 @@ class ANIMATION:  # Enum for animation types
     OUTSIDE_TO_RIGHT = 4
 
 
+# Start value, end value and easing of x position for every animation type
+ANIMATION_TRACKS: dict[int, tuple[float, float, int]] = {
+    ANIMATION.OUTSIDE_TO_LEFT: (0, -SIZE[0], EASING.EASE_IN),
+    ANIMATION.OUTSIDE_TO_RIGHT: (0, SIZE[0], EASING.EASE_IN),
+    ANIMATION.INSIDE_FROM_LEFT: (-SIZE[0], 0, EASING.EASE_OUT),
+    ANIMATION.INSIDE_FROM_RIGHT: (SIZE[0], 0, EASING.EASE_OUT)
+}
+
+
+def drawn_rects(surface: pygame.Surface, min_gap: int = 8) -> list[pygame.Rect]:
+    """
+    Areas of the surface which are not fully transparent (columns are split where the gap is wider than min_gap,
+     ex. icon and text are two rects), so blits skip empty space between drawn parts
+    """
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    columns = np.flatnonzero(alpha.any(axis=1))
+    rects = []
+    if len(columns):
+        splits = np.flatnonzero(np.diff(columns) > min_gap)
+        for first, last in zip(columns[np.r_[0, splits + 1]], columns[np.r_[splits, len(columns) - 1]]):
+            rows = np.flatnonzero(alpha[first:last + 1].any(axis=0))
+            rects.append(pygame.Rect(first, rows[0], last - first + 1, rows[-1] - rows[0] + 1))
+    del alpha  # Surface is unlocked
+    return rects
+
+
 class Widget(ABC):
+    """
+    Base class of widgets. Content and shadow of the widget are rendered once into retained surfaces (at the
+     widget origin) and only blitted at the current position every frame, so moving costs one blit per layer.
+    Subclasses draw in render and call invalidate when their data changes.
+    """
 
-    def __init__(self, name: str, start_pos: list[float]) -> None:
+    def __init__(self, name: str, start_pos: list[float], timeline: Timeline = TIMELINE) -> None:
         self.name: str = name
-        self.pos: list[float] = start_pos
-        self.is_animation_started: bool = False
-        self.start_animation_time: int = 0
-        self.max_animation_time: int = 0
+        self.x_track: Track = timeline.track(start_pos[0])  # X position is animated by the timeline
+        self.y: float = start_pos[1]
         self.animation_type: int = ANIMATION.IDLE
+        self.damage: Damage = Damage(SIZE, is_full=True)  # Changed area of the widget (in app coordinates)
+        self.last_rect: pygame.Rect = self.get_rect()  # Area of the widget in the last frame
+
+        # Retained layers (created on the first draw, rendered again only after invalidate)
+        self.content: pygame.Surface | None = None
+        self.shadow: pygame.Surface | None = None
+        self.content_rects: list[pygame.Rect] = []  # Drawn areas of the layers (only they are blitted)
+        self.shadow_rects: list[pygame.Rect] = []
+        self.is_rendered: bool = False  # Are the retained layers up to date?
+
+    @property
+    def pos(self) -> tuple[float, float]:
+        return self.x_track.value, self.y
+
+    @property
+    def is_animation_started(self) -> bool:
+        return self.x_track.is_animated
 
     @abstractmethod
-    def draw(self, widget_screen: pygame.Surface, shadow_screen: pygame.Surface) -> None:
+    def render(self, content: pygame.Surface, shadow: pygame.Surface) -> None:
+        """
+        Draw the widget into cleared retained layers (in widget coordinates, the layers have the widget size)
+        """
         pass
 
+    def invalidate(self) -> None:
+        """
+        Data or look of the widget was changed (layers are rendered again in the next draw)
+        """
+        self.is_rendered = False
+        self.damage.add(self.get_rect())
+
+    def draw(self, widget_screen: pygame.Surface, shadow_screen: pygame.Surface) -> None:
+        if not self.is_rendered:
+            if self.content is None:
+                self.content = pygame.Surface(SIZE, pygame.SRCALPHA)
+                self.shadow = pygame.Surface(SIZE, pygame.SRCALPHA)
+            self.content.fill([0, 0, 0, 0])
+            self.shadow.fill([0, 0, 0, 0])
+            self.render(self.content, self.shadow)
+            self.content_rects = drawn_rects(self.content)
+            self.shadow_rects = drawn_rects(self.shadow)
+            self.is_rendered = True
+
+        pos = self.get_rect().topleft  # Same pixels as the damage of the widget
+        widget_screen.blits([(self.content, rect.move(pos), rect) for rect in self.content_rects], False)
+        shadow_screen.blits([(self.shadow, rect.move(pos), rect) for rect in self.shadow_rects], False)
+
     def start_animation(self, max_time: int, animation_type: int, start_after: int = 0) -> None:
-        self.is_animation_started = True
-        self.start_animation_time = -start_after
-        self.max_animation_time = max_time
+        """
+        Start moving animation (widget stays at the start position while it waits)
+        :param max_time: time of animation (in ms)
+        :param animation_type: see ANIMATION
+        :param start_after: delay before the start (in ms)
+        """
+        start_value, end_value, easing = ANIMATION_TRACKS[animation_type]
+        self.x_track.animate(start_value, end_value, max_time, easing, delay=start_after)
         self.animation_type = animation_type
 
-    def default_position(self) -> None:
-        if self.animation_type == ANIMATION.OUTSIDE_TO_LEFT:
-            self.pos[0] = 0
-        elif self.animation_type == ANIMATION.OUTSIDE_TO_RIGHT:
-            self.pos[0] = 0
-        elif self.animation_type == ANIMATION.INSIDE_FROM_LEFT:
-            self.pos[0] = SIZE[0]
-        elif self.animation_type == ANIMATION.INSIDE_FROM_RIGHT:
-            self.pos[0] = -SIZE[0]
+    def release(self) -> None:
+        """
+        Free resources of the widget (it is called when the widget is removed, the widget must not be used after it)
+        """
+        self.x_track.timeline.release(self.x_track)
+        self.content = self.shadow = None
+        self.content_rects, self.shadow_rects = [], []
+        self.is_rendered = False
+
+    def get_rect(self) -> pygame.Rect:
+        """
+        Area which is used by the widget (on the widget and shadow screens)
+        """
+        return pygame.Rect(self.pos[0], self.pos[1], SIZE[0], SIZE[1])
 
     def update(self, dt: int) -> None:
-        if self.is_animation_started:
-            self.start_animation_time += dt
-            progress = self.start_animation_time / self.max_animation_time
-
-            if self.start_animation_time < 0:  # Wait for start (if value is negative)
-                self.default_position()
-                return
-
-            if progress > 1:
-                self.is_animation_started = False
-                self.animation_type = ANIMATION.IDLE
-                return
-
-            if self.animation_type == ANIMATION.OUTSIDE_TO_LEFT:
-                self.pos[0] = timing_functions.ease_in(0, -SIZE[0], progress)
-            elif self.animation_type == ANIMATION.OUTSIDE_TO_RIGHT:
-                self.pos[0] = timing_functions.ease_in(0, SIZE[0], progress)
-            elif self.animation_type == ANIMATION.INSIDE_FROM_LEFT:
-                self.pos[0] = timing_functions.ease_out(-SIZE[0], 0, progress)
-            elif self.animation_type == ANIMATION.INSIDE_FROM_RIGHT:
-                self.pos[0] = timing_functions.ease_out(SIZE[0], 0, progress)
+        if not self.is_animation_started:
+            self.animation_type = ANIMATION.IDLE
+
+        rect = self.get_rect()  # Position is changed by the timeline
+        if rect != self.last_rect:  # Widget was moved (old and new places must be redrawn)
+            self.damage.add(self.last_rect)
+            self.damage.add(rect)
+            self.last_rect = rect